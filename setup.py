@@ -20,6 +20,9 @@ setup(name='tap-google-sheets',
           ],
           'dev': [
               'ipdb',
+          ],
+          'numpy': [
+              'numpy'
           ]
       },
       entry_points='''
@@ -20,10 +20,10 @@ REQUIRED_CONFIG_KEYS = [
     'user_agent'
 ]
 
-def do_discover(client, spreadsheet_id):
+def do_discover(client, spreadsheet_id, config):
 
     LOGGER.info('Starting discover')
-    catalog = discover(client, spreadsheet_id)
+    catalog = discover(client, spreadsheet_id, config)
     json.dump(catalog.to_dict(), sys.stdout, indent=2)
     LOGGER.info('Finished discover')
 
@@ -37,7 +37,12 @@ def main():
                       parsed_args.config['client_secret'],
                       parsed_args.config['refresh_token'],
                       parsed_args.config.get('request_timeout'),
-                      parsed_args.config['user_agent']
+                      parsed_args.config['user_agent'],
+                      parsed_args.config.get('max_requests_per_minute'),
+                      parsed_args.config.get('quota_coordination_dir'),
+                      parsed_args.config.get('max_concurrent_requests'),
+                      parsed_args.config.get('max_request_retry_seconds'),
+                      parsed_args.config.get('max_retry_seconds')
                       ) as client:
 
         state = {}
@@ -48,11 +53,11 @@ def main():
         spreadsheet_id = config.get('spreadsheet_id')
 
         if parsed_args.discover:
-            do_discover(client, spreadsheet_id)
+            do_discover(client, spreadsheet_id, config)
         else:
             sync(client=client,
                  config=config,
-                 catalog=parsed_args.catalog or discover(client, spreadsheet_id),
+                 catalog=parsed_args.catalog or discover(client, spreadsheet_id, config),
                  state=state)
 
 if __name__ == '__main__':
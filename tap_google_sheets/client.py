@@ -1,22 +1,62 @@
-from datetime import datetime, timedelta
+import os
+import json
+import time
+import random
+import hashlib
+import functools
+import threading
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from collections import OrderedDict
 import backoff
 import requests
 import singer
 from singer import metrics
-from singer import utils
 from requests.exceptions import Timeout, ConnectionError
+try:
+    import fcntl
+except ImportError: # not available on Windows
+    fcntl = None
 
 BASE_URL = 'https://www.googleapis.com'
 GOOGLE_TOKEN_URI = 'https://oauth2.googleapis.com/token'
 LOGGER = singer.get_logger()
 REQUEST_TIMEOUT = 300
+# Rate Limit: https://developers.google.com/sheets/api/limits
+#   60 read requests per minute per user
+MAX_REQUESTS_PER_MINUTE = 60
+# Adaptive concurrency: weight of a new latency in its moving average, and spike threshold
+LATENCY_AVERAGE_WEIGHT = 0.2
+LATENCY_SPIKE_FACTOR = 2
+# Retries: decorrelated jitter between RETRY_BASE_SECONDS and RETRY_MAX_SECONDS,
+#   for up to MAX_REQUEST_RETRY_SECONDS of waits per request
+RETRY_BASE_SECONDS = 10
+RETRY_MAX_SECONDS = 60
+MAX_REQUEST_RETRY_SECONDS = 120
+MAX_REQUEST_TRIES = 7
+# Seconds between 2 checks of the stop of the sync while waiting for a concurrent request slot
+STOP_CHECK_SECONDS = 0.1
+
+class SyncInterrupted(Exception):
+    """
+    The sync stopped before its end (run limits or SIGTERM), after writing a resumable State
+    """
+    pass
+
+class RetryableError(Exception):
+    """
+    Error of a request to retry, after retry_after seconds if the API provides a delay
+    """
+    def __init__(self, *args, retry_after=None):
+        super().__init__(*args)
+        self.retry_after = retry_after
+
 
-class Server5xxError(Exception):
+class Server5xxError(RetryableError):
     pass
 
 
-class Server429Error(Exception):
+class Server429Error(RetryableError):
     pass
 
 
@@ -106,6 +146,87 @@ ERROR_CODE_EXCEPTION_MAPPING = {
 def get_exception_for_error_code(error_code):
     return ERROR_CODE_EXCEPTION_MAPPING.get(error_code, GoogleError)
 
+def get_retry_after(response):
+    """
+    Get the seconds to wait before retrying a request, from the Retry-After header (seconds or HTTP date)
+        or the RetryInfo of the error details of the response. None if not provided
+    """
+    retry_after = response.headers.get('Retry-After')
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except (TypeError, ValueError):
+            pass
+        try:
+            retry_date = parsedate_to_datetime(retry_after)
+            return max(0.0, (retry_date - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            pass
+
+    try:
+        details = response.json().get('error', {}).get('details', [])
+    except (ValueError, AttributeError):
+        return None
+    for detail in details:
+        # {"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "30s"}
+        if isinstance(detail, dict) and detail.get('@type', '').endswith('google.rpc.RetryInfo'):
+            try:
+                return max(0.0, float(str(detail.get('retryDelay')).rstrip('s')))
+            except ValueError:
+                pass
+    return None
+
+def retry_wait(base=RETRY_BASE_SECONDS, cap=RETRY_MAX_SECONDS):
+    """
+    Wait generator of the request retries
+        Wait for the retry_after delay of the error if provided (with up to 10% of jitter),
+        else a decorrelated jitter: random between base and 3 times the previous wait, up to cap
+    """
+    previous_wait = base
+    exception = yield
+    while True:
+        retry_after = getattr(exception, 'retry_after', None)
+        if retry_after is not None:
+            wait = retry_after * random.uniform(1, 1.1)
+        else:
+            wait = min(cap, random.uniform(base, previous_wait * 3))
+        previous_wait = max(base, wait)
+        exception = yield wait
+
+def check_stopped(details):
+    """
+    on_backoff handler of the requests: raise SyncInterrupted instead of waiting once the sync is stopped
+    """
+    client = details['args'][0]
+    if client.stop_event is not None and client.stop_event.is_set():
+        raise SyncInterrupted('the sync stopped while waiting to send a request')
+
+def retry_request(request):
+    """
+    Retry the request up to MAX_REQUEST_TRIES times on Server5xxError, ConnectionError and Server429Error,
+        honoring the delay provided by the API or with a decorrelated jitter (retry_wait), within the retry budget.
+        The waits are interrupted by the stop of the sync (see GoogleClient.wait)
+    """
+    @functools.wraps(request)
+    def retry(client, *args, **kwargs):
+        started_at = time.monotonic()
+        waits = retry_wait()
+        next(waits)
+        tries = 0
+        while True:
+            tries += 1
+            elapsed = time.monotonic() - started_at
+            try:
+                return request(client, *args, **kwargs)
+            except (Server5xxError, ConnectionError, Server429Error) as err:
+                wait = waits.send(err)
+                # raise the error instead of waiting beyond the retry budget
+                if tries == MAX_REQUEST_TRIES or not client.spend_retry_budget(elapsed, wait):
+                    raise
+                LOGGER.info('Backing off {}(...) for {:.1f}s ({})'.format(request.__name__, wait, repr(err)))
+                client.wait(wait)
+    return retry
+
 def raise_for_error(response):
     try:
         response.raise_for_status()
@@ -130,13 +251,197 @@ def raise_for_error(response):
         except (ValueError, TypeError):
             raise GoogleError(error)
 
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter shared by the requests of a GoogleClient
+        The bucket holds up to requests_per_minute tokens and is refilled at requests_per_minute tokens per minute,
+        each request takes a token or waits until a token is available
+    """
+    def __init__(self, requests_per_minute):
+        self.capacity = float(requests_per_minute)
+        self.rate = self.capacity / 60 # tokens per second
+        self.tokens = self.capacity
+        self.updated_at = self.clock()
+        self.lock = threading.RLock()
+
+    def clock(self):
+        return time.monotonic()
+
+    def refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self):
+        """
+        Take a token if the bucket is not empty
+            return 0 if a token is taken, else the seconds to wait until a token is available
+        """
+        with self.lock:
+            self.refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self, sleep=None):
+        """
+        Take a token, wait until the bucket is refilled if it is empty (with sleep, default to time.sleep)
+        """
+        wait = self.try_acquire()
+        while wait > 0:
+            (sleep or time.sleep)(wait)
+            wait = self.try_acquire()
+
+    @property
+    def level(self):
+        """
+        Current number of tokens in the bucket
+        """
+        with self.lock:
+            self.refill()
+            return self.tokens
+
+class SharedTokenBucket(TokenBucket):
+    """
+    Token bucket shared by all the tap processes of the local host using the same quota file
+        The tokens are stored in the file, which is locked (fcntl.flock) while a process takes a token
+    """
+    def __init__(self, requests_per_minute, path):
+        super().__init__(requests_per_minute)
+        self.path = path
+
+    def clock(self):
+        # wall clock, comparable between processes
+        return time.time()
+
+    def read(self, file):
+        file.seek(0)
+        try:
+            bucket = json.loads(file.read())
+            self.tokens = float(bucket['tokens'])
+            self.updated_at = float(bucket['updated_at'])
+        except (ValueError, KeyError, TypeError):
+            # new (empty) or corrupted file, start with a full bucket
+            self.tokens = self.capacity
+            self.updated_at = self.clock()
+
+    def write(self, file):
+        file.seek(0)
+        file.truncate()
+        file.write(json.dumps({'tokens': self.tokens, 'updated_at': self.updated_at}))
+        file.flush()
+
+    def try_acquire(self):
+        with self.lock, open(self.path, 'a+') as file:
+            # the lock is released when the file is closed
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            self.read(file)
+            wait = super().try_acquire()
+            self.write(file)
+            return wait
+
+    @property
+    def level(self):
+        with self.lock, open(self.path, 'a+') as file:
+            fcntl.flock(file.fileno(), fcntl.LOCK_SH)
+            self.read(file)
+            return super().level
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD (additive increase, multiplicative decrease) limit of the concurrent requests of a GoogleClient
+        The limit starts at 1 and grows by 1/limit for every successful response (about 1 per "limit" responses), up to max_limit.
+        It is halved on a 429 response or a latency spike (latency above LATENCY_SPIKE_FACTOR times its moving average),
+        once for the requests in flight when the limit is decreased
+    """
+    def __init__(self, max_limit):
+        self.max_limit = max_limit
+        self.current_limit = 1.0
+        self.in_flight = 0
+        self.latency_average = None
+        self.decreased_at = self.clock()
+        self.condition = threading.Condition()
+
+    def clock(self):
+        return time.monotonic()
+
+    @property
+    def limit(self):
+        """
+        Current number of concurrent requests allowed
+        """
+        return int(self.current_limit)
+
+    def acquire(self, stop_event=None):
+        """
+        Wait until a request can be sent, return the start time of the request
+            raise SyncInterrupted once the stop_event is set
+        """
+        with self.condition:
+            while self.in_flight >= self.limit:
+                if stop_event is None:
+                    self.condition.wait()
+                elif stop_event.is_set():
+                    raise SyncInterrupted('the sync stopped while waiting for a concurrent request')
+                else:
+                    self.condition.wait(STOP_CHECK_SECONDS)
+            self.in_flight += 1
+            return self.clock()
+
+    def release(self, started_at, throttled=False):
+        """
+        Update the limit with the response of a request started at started_at
+        """
+        with self.condition:
+            self.in_flight -= 1
+            now = self.clock()
+            latency = now - started_at
+            latency_spike = self.latency_average is not None and \
+                latency > self.latency_average * LATENCY_SPIKE_FACTOR
+            if throttled or latency_spike:
+                # Decrease once for the requests sent before the previous decrease
+                if started_at >= self.decreased_at:
+                    self.current_limit = max(1.0, self.current_limit / 2)
+                    self.decreased_at = now
+                    LOGGER.info('Concurrent requests limit decreased to {} ({})'.format(
+                        self.limit, 'rate limit exceeded' if throttled else 'latency spike'))
+            else:
+                self.current_limit = min(float(self.max_limit), self.current_limit + 1 / self.current_limit)
+            if not throttled:
+                if self.latency_average is None:
+                    self.latency_average = latency
+                else:
+                    self.latency_average += LATENCY_AVERAGE_WEIGHT * (latency - self.latency_average)
+            self.condition.notify_all()
+
+def get_rate_limiter(client_id, requests_per_minute, quota_coordination_dir=None):
+    """
+    Get the token bucket of the client: shared with the other tap processes of the host using the same
+        OAuth client_id if a quota_coordination_dir is provided, else local to the process
+    """
+    if quota_coordination_dir:
+        if fcntl is None:
+            LOGGER.warning('File locks are not supported on this platform, the quota is not coordinated between processes')
+        else:
+            os.makedirs(quota_coordination_dir, exist_ok=True)
+            client_hash = hashlib.sha256(client_id.encode('utf-8')).hexdigest()[:16]
+            path = os.path.join(quota_coordination_dir, 'tap-google-sheets-{}.quota'.format(client_hash))
+            return SharedTokenBucket(requests_per_minute, path)
+    return TokenBucket(requests_per_minute)
+
 class GoogleClient: # pylint: disable=too-many-instance-attributes
     def __init__(self,
                  client_id,
                  client_secret,
                  refresh_token,
                  request_timeout=REQUEST_TIMEOUT,
-                 user_agent=None):
+                 user_agent=None,
+                 max_requests_per_minute=None,
+                 quota_coordination_dir=None,
+                 max_concurrent_requests=None,
+                 max_request_retry_seconds=None,
+                 max_retry_seconds=None):
         self.__client_id = client_id
         self.__client_secret = client_secret
         self.__refresh_token = refresh_token
@@ -153,6 +458,38 @@ class GoogleClient: # pylint: disable=too-many-instance-attributes
             request_timeout = REQUEST_TIMEOUT
         self.request_timeout = request_timeout
 
+        # Read requests quota per minute, default to 60 requests per minute
+        if max_requests_per_minute and float(max_requests_per_minute):
+            max_requests_per_minute = float(max_requests_per_minute)
+        else:
+            max_requests_per_minute = MAX_REQUESTS_PER_MINUTE
+        self.rate_limiter = get_rate_limiter(client_id, max_requests_per_minute, quota_coordination_dir)
+
+        # Adapt the number of concurrent requests up to max_concurrent_requests, if provided
+        self.concurrency_limiter = None
+        if max_concurrent_requests and int(max_concurrent_requests) > 1:
+            self.concurrency_limiter = AdaptiveConcurrencyLimiter(int(max_concurrent_requests))
+
+        # Retry budgets: seconds of waits per request, default to 120 seconds, and per run (all the requests), if provided
+        if max_request_retry_seconds and float(max_request_retry_seconds):
+            max_request_retry_seconds = float(max_request_retry_seconds)
+        else:
+            max_request_retry_seconds = MAX_REQUEST_RETRY_SECONDS
+        self.max_request_retry_seconds = max_request_retry_seconds
+        self.max_retry_seconds = float(max_retry_seconds) if max_retry_seconds else None
+        self.retry_seconds = 0
+        self.retry_lock = threading.Lock()
+
+        # Schema and columns of the sheets, by (spreadsheet_id, sheetId), shared by the discovery and the sync of the run
+        self.sheet_metadata_cache = {}
+
+        # Number of API calls of the run (incl. the retries)
+        self.request_count = 0
+        self.request_lock = threading.Lock()
+
+        # Stop of the sync (set by the RunLimits of the sync), interrupting the waits of the requests
+        self.stop_event = None
+
     # Backoff request for 5 times at an interval of 10 seconds in case of Timeout or Connection error
     @backoff.on_exception(backoff.constant,
                           (Timeout, ConnectionError),
@@ -208,16 +545,15 @@ class GoogleClient: # pylint: disable=too-many-instance-attributes
                           (Timeout), 
                           max_tries=5,
                           interval=10,
+                          on_backoff=check_stopped,
                           jitter=None) # Interval value not consistent if jitter not None
-    # Rate Limit: https://developers.google.com/sheets/api/limits
-    #   100 request per 100 seconds per User
-    @backoff.on_exception(backoff.expo,
-                          (Server5xxError, ConnectionError, Server429Error),
-                          max_tries=7,
-                          factor=5,
-                          jitter=None)
-    @utils.ratelimit(100, 100)
+    # Retry up to 7 times, honoring the delay provided by the API or with a decorrelated jitter, within the retry budget
+    @retry_request
     def request(self, method, path=None, url=None, api=None, **kwargs):
+        # Wait for a token of the rate limiter (shared by the threads using the client)
+        self.rate_limiter.acquire(self.wait)
+        with self.request_lock:
+            self.request_count += 1
         self.get_access_token()
         self.base_url = 'https://sheets.googleapis.com/v4'
         if api == 'files':
@@ -233,6 +569,8 @@ class GoogleClient: # pylint: disable=too-many-instance-attributes
         else:
             endpoint = None
         LOGGER.info('{} URL = {}'.format(endpoint, url))
+        metrics.log(LOGGER, metrics.Point('gauge', 'rate_limit_tokens', round(self.rate_limiter.level, 2),
+                                          {metrics.Tag.endpoint: endpoint}))
 
         if 'headers' not in kwargs:
             kwargs['headers'] = {}
@@ -245,17 +583,27 @@ class GoogleClient: # pylint: disable=too-many-instance-attributes
             kwargs['headers']['Content-Type'] = 'application/json'
 
         with metrics.http_request_timer(endpoint) as timer:
-            
-            response = self.__session.request(method, url, timeout=self.request_timeout, **kwargs)
+            if self.concurrency_limiter:
+                started_at = self.concurrency_limiter.acquire(self.stop_event)
+                response = None
+                try:
+                    response = self.__session.request(method, url, timeout=self.request_timeout, **kwargs)
+                finally:
+                    # Timeouts and connection errors (no response) are congestion signals, as 429 responses
+                    self.concurrency_limiter.release(
+                        started_at, throttled=response is None or response.status_code == 429)
+            else:
+                response = self.__session.request(method, url, timeout=self.request_timeout, **kwargs)
             timer.tags[metrics.Tag.http_status_code] = response.status_code
 
         if response.status_code >= 500:
-            raise Server5xxError()
+            raise Server5xxError(retry_after=get_retry_after(response))
 
         #Use retry functionality in backoff to wait and retry if
         #response code equals 429 because rate limit has been exceeded
         if response.status_code == 429:
-            raise Server429Error(response.json().get("error",{}).get("message", "Rate limit exceeded"))
+            raise Server429Error(response.json().get("error",{}).get("message", "Rate limit exceeded"),
+                                 retry_after=get_retry_after(response))
 
         if response.status_code != 200:
             raise_for_error(response)
@@ -263,6 +611,31 @@ class GoogleClient: # pylint: disable=too-many-instance-attributes
         # Ensure keys and rows are ordered as received from API
         return response.json(object_pairs_hook=OrderedDict)
 
+    def wait(self, seconds):
+        """
+        Wait for seconds, raise SyncInterrupted once the sync is stopped (immediately if it is already stopped)
+        """
+        if self.stop_event is None:
+            time.sleep(seconds)
+        elif self.stop_event.wait(seconds):
+            raise SyncInterrupted('the sync stopped while waiting to send a request')
+
+    def spend_retry_budget(self, elapsed, wait):
+        """
+        Reserve the wait before the next retry of a request, that already waited for elapsed seconds
+            return False if the wait exceeds the budget of the request or of the run
+        """
+        if elapsed + wait > self.max_request_retry_seconds:
+            LOGGER.warning('Retry budget of the request exceeded ({} seconds), giving up'.format(
+                self.max_request_retry_seconds))
+            return False
+        with self.retry_lock:
+            if self.max_retry_seconds is not None and self.retry_seconds + wait > self.max_retry_seconds:
+                LOGGER.warning('Retry budget of the sync exceeded ({} seconds), giving up'.format(self.max_retry_seconds))
+                return False
+            self.retry_seconds += wait
+        return True
+
     def get(self, path, api, **kwargs):
         return self.request(method='GET', path=path, api=api, **kwargs)
 
@@ -0,0 +1,238 @@
+import functools
+from datetime import date, timedelta
+import singer
+import tap_google_sheets.transform as internal_transform
+try:
+    import numpy as np
+except ImportError: # optional: pip install tap-google-sheets[numpy]
+    np = None
+
+LOGGER = singer.get_logger()
+
+# Converted in batches: the serial numbers of the datetimes (seconds exact as float64 integers)
+MAX_DATETIME_SERIAL = 1e9
+# the serial numbers of the times (microseconds exact as float64 integers)
+MAX_TIME_SERIAL = 1e5
+# Seconds since epoch of the first and the last datetime in range (year 1 to 9999)
+MIN_EPOCH_SEC = (1 - internal_transform.EPOCH_ORDINAL) * internal_transform.SEC_PER_DAY
+MAX_EPOCH_SEC = (date.max.toordinal() - internal_transform.EPOCH_ORDINAL + 1) * internal_transform.SEC_PER_DAY - 1
+US_PER_SECOND = 1000000
+# Cell after the end of a row
+ABSENT = object()
+
+
+# Pad a row to the width of the page with ABSENT cells after its row_length first cells
+def pad_row(row, row_length, width):
+    if row_length == width and len(row) == width:
+        return row
+    return list(row[:row_length]) + [ABSENT] * (width - row_length)
+
+# Convert the cells (index of the row, value, unformatted value) one by one with the converter of the column
+def convert_cells(convert, cells, rows, values):
+    for i, value, unformatted_value in cells:
+        row_num, row, _ = rows[i]
+        values[i] = convert(value, unformatted_value, row_num, row)
+
+# Split the cells with an int or float unformatted value (serial cells) from the other cells
+def split_serial_cells(cells):
+    serial_cells = [cell for cell in cells if type(cell[2]) is float or type(cell[2]) is int]
+    if len(serial_cells) == len(cells):
+        return serial_cells, []
+    return serial_cells, [cell for cell in cells if type(cell[2]) is not float and type(cell[2]) is not int]
+
+# Set the values of the batch (mask of the serial cells) and add the other serial cells to the other cells
+def set_batch_values(serial_cells, batch, batch_values, values, other_cells):
+    batch_indexes = np.flatnonzero(batch).tolist()
+    for index, value in zip(batch_indexes, batch_values):
+        values[serial_cells[index][0]] = value
+    if len(batch_indexes) < len(serial_cells):
+        other_cells.extend(serial_cells[index] for index in np.flatnonzero(~batch).tolist())
+
+# DATE-TIME: the datetime strings of the serial numbers, like transform.excel_to_utc_dttm_str
+#   out of range: the string value of the cell, with the converter
+def convert_datetime_cells(convert, cells, rows, values):
+    serial_cells, other_cells = split_serial_cells(cells)
+    if serial_cells:
+        serials = np.array([cell[2] for cell in serial_cells], dtype=np.float64)
+        with np.errstate(all='ignore'):
+            epoch_sec = np.floor((serials - internal_transform.EXCEL_EPOCH) * internal_transform.SEC_PER_DAY)
+            batch = (np.abs(serials) < MAX_DATETIME_SERIAL) & (epoch_sec >= MIN_EPOCH_SEC) & (epoch_sec <= MAX_EPOCH_SEC)
+        dttm_strs = np.datetime_as_string(epoch_sec[batch].astype(np.int64).astype('datetime64[s]'), unit='s')
+        set_batch_values(serial_cells, batch, [dttm_str + '.000000Z' for dttm_str in dttm_strs.tolist()],
+                         values, other_cells)
+    convert_cells(convert, other_cells, rows, values)
+
+# Get the time string of a number of microseconds, like str(timedelta(seconds=total_secs))
+@functools.lru_cache(maxsize=internal_transform.DATETIME_CACHE_SIZE)
+def get_time_str(total_us):
+    return str(timedelta(microseconds=total_us))
+
+# Get the time strings of the numbers of microseconds, the times of a single day (H:MM:SS[.ffffff]) formatted
+#   by numpy, like str(timedelta(microseconds=total_us))
+def get_time_strs(total_us):
+    time_strs = [None] * len(total_us)
+    in_day = (total_us >= 0) & (total_us < internal_transform.SEC_PER_DAY * US_PER_SECOND)
+    whole_seconds = total_us % US_PER_SECOND == 0
+    for mask, unit in ((in_day & whole_seconds, 's'), (in_day & ~whole_seconds, 'us')):
+        dttm_strs = np.datetime_as_string(total_us[mask].astype('datetime64[us]'), unit=unit).tolist()
+        for index, dttm_str in zip(np.flatnonzero(mask).tolist(), dttm_strs):
+            # 1970-01-01THH:MM:SS[.ffffff], without the leading 0 of the hours
+            time_strs[index] = dttm_str[12:] if dttm_str[11] == '0' else dttm_str[11:]
+    for index in np.flatnonzero(~in_day).tolist():
+        time_strs[index] = get_time_str(int(total_us[index]))
+    return time_strs
+
+# TIME ONLY (NO DATE): the microseconds of the serial numbers, rounded like timedelta(seconds=total_secs)
+def convert_time_cells(convert, cells, rows, values):
+    serial_cells, other_cells = split_serial_cells(cells)
+    if serial_cells:
+        serials = np.array([cell[2] for cell in serial_cells], dtype=np.float64)
+        with np.errstate(all='ignore'):
+            batch = np.abs(serials) < MAX_TIME_SERIAL
+        total_secs = serials[batch] * internal_transform.SEC_PER_DAY
+        # whole seconds, then whole microseconds of the fraction of second, then the rounding of the leftover
+        int_secs = np.trunc(total_secs)
+        frac_us = (total_secs - int_secs) * US_PER_SECOND
+        int_us = np.trunc(frac_us)
+        leftover_us = frac_us - int_us
+        total_us = int_secs.astype(np.int64) * US_PER_SECOND + int_us.astype(np.int64)
+        # round half to even (the leftover is in ]-1, 1[)
+        half_up = (np.abs(leftover_us) > 0.5) | ((np.abs(leftover_us) == 0.5) & (total_us % 2 == 1))
+        total_us = total_us + np.where(half_up, np.sign(leftover_us), 0).astype(np.int64)
+        set_batch_values(serial_cells, batch, get_time_strs(total_us), values, other_cells)
+    convert_cells(convert, other_cells, rows, values)
+
+# Check that the formatted value of a number cell is a number, like transform.transform_sheet_decimal_data
+def is_number_string(value):
+    try:
+        # Removing comma to handle US number type format ie. 123,456.10 -> 123456.10
+        float(value.replace(",", ""))
+        return True
+    except ValueError:
+        return False
+
+# NUMBER (INTEGER AND FLOAT): the unformatted value of the cells with a number formatted value, except the floats
+#   that may have more than 15 decimal digits (below 100 and not integral), rounded by the converter
+def convert_number_cells(convert, cells, rows, values):
+    float_cells = []
+    other_cells = []
+    # check the distinct formatted values once
+    formatted_is_number = {}
+    for cell in cells:
+        i, value, unformatted_value = cell
+        unformatted_type = type(unformatted_value)
+        if (unformatted_type is float or unformatted_type is int) and type(value) is str:
+            is_number = formatted_is_number.get(value)
+            if is_number is None:
+                is_number = formatted_is_number[value] = is_number_string(value)
+            if is_number:
+                if unformatted_type is int:
+                    values[i] = unformatted_value
+                else:
+                    float_cells.append(cell)
+                continue
+        other_cells.append(cell)
+    if float_cells:
+        floats = np.array([cell[2] for cell in float_cells], dtype=np.float64)
+        with np.errstate(all='ignore'):
+            batch = (np.abs(floats) >= 100) | (floats == np.floor(floats))
+        set_batch_values(float_cells, batch, floats[batch].tolist(), values, other_cells)
+    convert_cells(convert, other_cells, rows, values)
+
+# BOOLEAN: the boolean value of the distinct strings, the other cells with the converter (logged)
+def convert_boolean_cells(convert, cells, rows, values):
+    boolean_values = {}
+    other_cells = []
+    for cell in cells:
+        value = cell[1]
+        if type(value) is str:
+            if value not in boolean_values:
+                boolean_values[value] = internal_transform.get_boolean_string_value(value)
+            if boolean_values[value] is not None:
+                values[cell[0]] = boolean_values[value]
+                continue
+        other_cells.append(cell)
+    convert_cells(convert, other_cells, rows, values)
+
+# STRING
+def convert_string_cells(convert, cells, rows, values):
+    for i, value, _ in cells:
+        values[i] = str(value)
+
+COLUMN_CONVERTERS = {
+    'numberType.DATE_TIME': convert_datetime_cells,
+    'numberType.TIME': convert_time_cells,
+    'numberType': convert_number_cells,
+    'boolValue': convert_boolean_cells,
+    'stringValue': convert_string_cells
+}
+
+# Transform sheet_data by columns: like transform.transform_sheet_data, with the cells of each column
+#   converted in batches with numpy, then the rows reassembled in the order of their columns
+def transform_sheet_data(spreadsheet_id, sheet_id, sheet_title, from_row, columns, sheet_data_rows, unformatted_rows,
+                         selected_columns=None, key_columns=None, row_keys=None, transform_plan=None):
+    if transform_plan is None:
+        transform_plan = internal_transform.get_transform_plan(sheet_title, columns, selected_columns)
+    # A row longer than the columns raises an error in the transform by rows
+    if any(min(len(row), len(unformatted_row)) > len(transform_plan)
+           for row, unformatted_row in zip(sheet_data_rows, unformatted_rows)):
+        return internal_transform.transform_sheet_data(
+            spreadsheet_id, sheet_id, sheet_title, from_row, columns, sheet_data_rows, unformatted_rows,
+            selected_columns=selected_columns, key_columns=key_columns, row_keys=row_keys, transform_plan=transform_plan)
+    if row_keys is None:
+        row_keys = set()
+
+    # (row number, row, unformatted row) of the rows not empty
+    rows = []
+    row_num = from_row
+    for (row, unformatted_row) in zip(sheet_data_rows, unformatted_rows):
+        # If empty row, SKIP
+        if row == []:
+            LOGGER.info('EMPTY ROW: {}, SKIPPING'.format(row_num))
+        else:
+            rows.append((row_num, row, unformatted_row))
+        row_num = row_num + 1
+    if not rows:
+        return [], row_num
+
+    # Columns of the page, the cells of a row are the cells of both its rows (like zip in the transform by rows)
+    width = len(transform_plan)
+    row_lengths = [min(len(row), len(unformatted_row)) for _, row, unformatted_row in rows]
+    formatted_columns = list(zip(*[pad_row(row, row_length, width)
+                                   for (_, row, _), row_length in zip(rows, row_lengths)]))
+    unformatted_columns = list(zip(*[pad_row(unformatted_row, row_length, width)
+                                     for (_, _, unformatted_row), row_length in zip(rows, row_lengths)]))
+
+    # Values of each selected column, by row
+    selected_names = []
+    selected_values = []
+    # names of the selected columns of a row of each length
+    row_length_names = [()]
+    for col_position, col_plan in enumerate(transform_plan):
+        if col_plan is not None:
+            col_name, convert, col_type = col_plan
+            # NULL values are None, the cells after the end of a row are not in the record
+            cells = [(i, value, unformatted_value) for i, value, unformatted_value
+                     in zip(range(len(rows)), formatted_columns[col_position], unformatted_columns[col_position])
+                     if value is not ABSENT and value is not None and value != '']
+            values = [None] * len(rows)
+            COLUMN_CONVERTERS.get(col_type, convert_cells)(convert, cells, rows, values)
+            selected_names.append(col_name)
+            selected_values.append(values)
+        row_length_names.append(tuple(selected_names))
+
+    sheet_data_tf = []
+    rows_values = zip(*selected_values) if selected_values else [()] * len(rows)
+    for (record_row_num, _, _), row_length, row_values in zip(rows, row_lengths, rows_values):
+        # Add spreadsheet_id, sheet_id, and row
+        sheet_data_row_tf = {
+            '__sdc_spreadsheet_id': spreadsheet_id,
+            '__sdc_sheet_id': sheet_id,
+            '__sdc_row': record_row_num
+        }
+        sheet_data_row_tf.update(zip(row_length_names[row_length], row_values))
+        if key_columns:
+            internal_transform.add_row_key(sheet_title, key_columns, sheet_data_row_tf, record_row_num, row_keys)
+        # APPEND non-empty row
+        sheet_data_tf.append(sheet_data_row_tf)
+    return sheet_data_tf, row_num
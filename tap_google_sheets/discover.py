@@ -2,11 +2,11 @@ from singer.catalog import Catalog, CatalogEntry, Schema
 from tap_google_sheets.schema import STREAMS
 
 
-def discover(client, spreadsheet_id):
+def discover(client, spreadsheet_id, config=None):
     catalog = Catalog([])
 
     for stream, stream_obj in STREAMS.items():
-        stream_object = stream_obj(client, spreadsheet_id)
+        stream_object = stream_obj(client, spreadsheet_id, config=config)
         schemas, field_metadata = stream_object.get_schemas()
 
         # loop over the schema and prepare catalog
@@ -0,0 +1,74 @@
+import os
+import json
+import sqlite3
+import hashlib
+import singer
+
+LOGGER = singer.get_logger()
+
+# Number of row keys in an "IN (...)" query, below the default SQLITE_MAX_VARIABLE_NUMBER of older sqlite versions
+MAX_KEYS_PER_QUERY = 500
+
+
+class RowHashIndex:
+    """
+    Hash of each row of a sheet written by the last syncs, by row key, in a sqlite database file of the sheet
+        The rows seen by a sync are marked with its version, the rows not seen are the deleted rows
+        The changes of a sync are only committed once the records and the State of the sheet are written,
+        by the main thread (the sync of the sheet may run in a worker thread)
+    """
+    def __init__(self, row_index_dir, spreadsheet_id, sheet_id):
+        os.makedirs(row_index_dir, exist_ok=True)
+        self.path = os.path.join(row_index_dir, 'tap-google-sheets-{}-{}.sqlite'.format(spreadsheet_id, sheet_id))
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS row_hashes ('
+            'row_key TEXT PRIMARY KEY, row_hash TEXT NOT NULL, sync_version INTEGER NOT NULL)')
+
+    def close(self):
+        # the changes not committed (failed sync) are rolled back
+        self.connection.close()
+
+    def commit(self):
+        self.connection.commit()
+
+    def get_hashes(self, row_keys):
+        """
+        Return the hashes of the rows of the row_keys in the index
+        """
+        row_hashes = {}
+        for i in range(0, len(row_keys), MAX_KEYS_PER_QUERY):
+            chunk = row_keys[i:i + MAX_KEYS_PER_QUERY]
+            cursor = self.connection.execute(
+                'SELECT row_key, row_hash FROM row_hashes WHERE row_key IN ({})'.format(','.join('?' * len(chunk))),
+                chunk)
+            row_hashes.update(cursor.fetchall())
+        return row_hashes
+
+    def get_changed_records(self, records, key_properties, sync_version):
+        """
+        Return the records inserted or changed since the last sync, and mark all the records as seen by the sync
+            With key columns, a row moved by the insert or the delete of the rows above it is unchanged
+        """
+        rows = {}
+        for record in records:
+            row_key = json.dumps([record.get(key) for key in key_properties])
+            hashed_record = record if '__sdc_row' in key_properties else \
+                {key: value for key, value in record.items() if key != '__sdc_row'}
+            row_hash = hashlib.sha256(json.dumps(hashed_record, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+            rows[row_key] = (row_hash, record)
+
+        row_hashes = self.get_hashes(list(rows))
+        self.connection.executemany(
+            'INSERT OR REPLACE INTO row_hashes (row_key, row_hash, sync_version) VALUES (?, ?, ?)',
+            [(row_key, row_hash, sync_version) for row_key, (row_hash, _) in rows.items()])
+        return [record for row_key, (row_hash, record) in rows.items() if row_hashes.get(row_key) != row_hash]
+
+    def pop_deleted_keys(self, key_properties, sync_version):
+        """
+        Remove the rows not seen by the sync from the index, and return their keys (dict of the key_properties)
+        """
+        cursor = self.connection.execute('SELECT row_key FROM row_hashes WHERE sync_version <> ?', (sync_version,))
+        row_keys = [row_key for (row_key,) in cursor.fetchall()]
+        self.connection.execute('DELETE FROM row_hashes WHERE sync_version <> ?', (sync_version,))
+        return [dict(zip(key_properties, json.loads(row_key))) for row_key in row_keys]
@@ -1,11 +1,16 @@
+import os
 import re
+import json
 import urllib.parse
 from collections import OrderedDict
 import singer
-from tap_google_sheets.streams import STREAMS
+from tap_google_sheets.streams import STREAMS, MAX_RANGES_URL_LENGTH
 
 LOGGER = singer.get_logger()
 
+# Number of sheets of which the header row and the first data row are requested in a single spreadsheets.get call
+MAX_SHEETS_PER_REQUEST = 50
+
 # Reference:
 # https://github.com/singer-io/getting-started/blob/master/docs/DISCOVERY_MODE.md#Metadata
 
@@ -229,9 +234,14 @@ def get_sheet_schema_columns(sheet):
 #   endpoint: spreadsheets/{spreadsheet_id}
 #   params: includeGridData = true, ranges = '{sheet_title}'!1:2
 # This endpoint includes detailed metadata about each cell - incl. data type, formatting, etc.
+# The schema and columns already fetched during the run are returned from the sheet_metadata_cache of the client
 def get_sheet_metadata(sheet, spreadsheet_id, client):
     sheet_id = sheet.get('properties', {}).get('sheetId')
     sheet_title = sheet.get('properties', {}).get('title')
+    sheet_metadata_cache = getattr(client, 'sheet_metadata_cache', {})
+    if (spreadsheet_id, sheet_id) in sheet_metadata_cache:
+        LOGGER.info('sheet_id = {}, sheet_title = {}: cached sheet metadata'.format(sheet_id, sheet_title))
+        return sheet_metadata_cache[(spreadsheet_id, sheet_id)]
     LOGGER.info('sheet_id = {}, sheet_title = {}'.format(sheet_id, sheet_title))
 
     stream_name = 'sheet_metadata'
@@ -245,7 +255,13 @@ def get_sheet_metadata(sheet, spreadsheet_id, client):
     # sheet_metadata: 1st `sheets` node in results
     sheet_metadata = sheet_md_results.get('sheets')[0]
 
-    # Create sheet_json_schema (for discovery/catalog) and columns (for sheet_metadata results)
+    sheet_metadata_cache[(spreadsheet_id, sheet_id)] = get_schema_columns(sheet_metadata, sheet_title)
+    return sheet_metadata_cache[(spreadsheet_id, sheet_id)]
+
+
+# Create sheet_json_schema (for discovery/catalog) and columns (for sheet_metadata results)
+#   None, None for a malformed sheet
+def get_schema_columns(sheet_metadata, sheet_title):
     try:
         sheet_json_schema, columns = get_sheet_schema_columns(sheet_metadata)
     except Exception as err:
@@ -254,3 +270,129 @@ def get_sheet_metadata(sheet, spreadsheet_id, client):
         sheet_json_schema, columns = None, None
 
     return sheet_json_schema, columns
+
+
+# Split the sheet titles into batches of up to MAX_SHEETS_PER_REQUEST sheets,
+#   of which the URL encoded ranges are up to MAX_RANGES_URL_LENGTH long (a URL too long is rejected with a 414 error)
+def get_sheet_title_batches(sheet_titles):
+    batches = []
+    batch_length = 0
+    for sheet_title in sheet_titles:
+        range_length = len("&ranges='{}'!1:2".format(urllib.parse.quote_plus(sheet_title)))
+        if not batches or len(batches[-1]) >= MAX_SHEETS_PER_REQUEST or \
+                batch_length + range_length > MAX_RANGES_URL_LENGTH:
+            batches.append([])
+            batch_length = 0
+        batches[-1].append(sheet_title)
+        batch_length += range_length
+    return batches
+
+
+# Get Header Row and 1st data row (Rows 1 & 2) of several Sheets in a single sheet_metadata query
+#   endpoint: spreadsheets/{spreadsheet_id}
+#   params: includeGridData = true, ranges = '{sheet_title}'!1:2 for each sheet of a batch (get_sheet_title_batches)
+# Return the sheet_json_schema and the columns of each sheet, by sheetId (also kept in the sheet_metadata_cache of the client)
+def get_sheets_metadata(sheets, spreadsheet_id, client):
+    stream_obj = STREAMS.get('sheet_metadata')(client, spreadsheet_id)
+    sheet_metadata_cache = getattr(client, 'sheet_metadata_cache', {})
+    sheets_metadata = {}
+    for sheet in sheets:
+        sheet_id = sheet.get('properties', {}).get('sheetId')
+        if (spreadsheet_id, sheet_id) in sheet_metadata_cache:
+            sheets_metadata[sheet_id] = sheet_metadata_cache[(spreadsheet_id, sheet_id)]
+    sheets = [sheet for sheet in sheets if sheet.get('properties', {}).get('sheetId') not in sheets_metadata]
+
+    for sheet_titles in get_sheet_title_batches([sheet.get('properties', {}).get('title') for sheet in sheets]):
+        LOGGER.info('sheet_titles = {}'.format(sheet_titles))
+        stream_obj.params = {
+            'includeGridData': 'true',
+            'ranges': ["'{}'!1:2".format(urllib.parse.quote_plus(sheet_title)) for sheet_title in sheet_titles]
+        }
+        path, _ = stream_obj.get_path()
+
+        sheet_md_results = client.get(path=path, api=stream_obj.api, endpoint=stream_obj.stream_name)
+        # a `sheets` node for each requested sheet, with its properties and the grid data of its range
+        for sheet_metadata in sheet_md_results.get('sheets', []):
+            sheet_id = sheet_metadata.get('properties', {}).get('sheetId')
+            sheet_title = sheet_metadata.get('properties', {}).get('title')
+            sheets_metadata[sheet_id] = get_schema_columns(sheet_metadata, sheet_title)
+            sheet_metadata_cache[(spreadsheet_id, sheet_id)] = sheets_metadata[sheet_id]
+
+    return sheets_metadata
+
+
+# Rebuild the columns of a sheet from the json schema of its catalog stream,
+#   the properties of the discovered schema being in the order of the columns
+def get_catalog_columns(sheet_json_schema):
+    columns = []
+    column_names = [column_name for column_name in sheet_json_schema.get('properties', {})
+                    if column_name not in ('__sdc_spreadsheet_id', '__sdc_sheet_id', '__sdc_row')]
+    for i, column_name in enumerate(column_names):
+        col_properties = sheet_json_schema['properties'][column_name]
+        # numbers, dates and times: 1st schema of the anyOf
+        col_properties = next(iter(col_properties.get('anyOf', [])), col_properties)
+        column_format = col_properties.get('format')
+        if column_format == 'date-time':
+            column_gs_type = 'numberType.DATE_TIME'
+        elif column_format == 'time':
+            column_gs_type = 'numberType.TIME'
+        elif column_format == 'singer.decimal':
+            column_gs_type = 'numberType'
+        elif 'boolean' in col_properties.get('type', []):
+            column_gs_type = 'boolValue'
+        else:
+            column_gs_type = 'stringValue'
+        columns.append({
+            'columnIndex': i + 1,
+            'columnLetter': colnum_string(i + 1),
+            'columnName': column_name,
+            'columnType': column_gs_type,
+            'columnSkipped': column_name.startswith('__sdc_skip_col_')
+        })
+    return columns
+
+
+# Schema cache file of a spreadsheet: {"file_version": [version, modifiedTime], "sheets": [...],
+#   "sheets_metadata": [[sheetId, sheet_json_schema, columns], ...]}
+def get_schema_cache_path(schema_cache_dir, spreadsheet_id):
+    return os.path.join(schema_cache_dir, 'tap-google-sheets-{}.json'.format(spreadsheet_id))
+
+
+# Return the cached sheets and the schema and columns of each sheet (by sheetId), None, None if the cache file is
+#   missing, unreadable or of another version of the spreadsheet
+def read_schema_cache(schema_cache_dir, spreadsheet_id, file_version, client):
+    path = get_schema_cache_path(schema_cache_dir, spreadsheet_id)
+    try:
+        with open(path) as file:
+            schema_cache = json.load(file)
+    except (OSError, ValueError) as err:
+        LOGGER.info('Schema cache not used: {}'.format(err))
+        return None, None
+    if schema_cache.get('file_version') != file_version:
+        LOGGER.info('Schema cache not used: spreadsheet version {} changed to {}'.format(
+            schema_cache.get('file_version'), file_version))
+        return None, None
+
+    LOGGER.info('Schema cache used: spreadsheet version {}'.format(file_version))
+    sheets_metadata = {}
+    sheet_metadata_cache = getattr(client, 'sheet_metadata_cache', {})
+    for sheet_id, sheet_json_schema, columns in schema_cache.get('sheets_metadata', []):
+        sheets_metadata[sheet_id] = sheet_json_schema, columns
+        sheet_metadata_cache[(spreadsheet_id, sheet_id)] = sheets_metadata[sheet_id]
+    return schema_cache.get('sheets'), sheets_metadata
+
+
+# Write the sheets and the schema and columns of each sheet to the cache file of the spreadsheet version
+def write_schema_cache(schema_cache_dir, spreadsheet_id, file_version, sheets, sheets_metadata):
+    path = get_schema_cache_path(schema_cache_dir, spreadsheet_id)
+    schema_cache = {
+        'file_version': file_version,
+        'sheets': sheets,
+        'sheets_metadata': [[sheet_id, sheet_json_schema, columns]
+                            for sheet_id, (sheet_json_schema, columns) in sheets_metadata.items()]
+    }
+    os.makedirs(schema_cache_dir, exist_ok=True)
+    # write a temporary file then rename it, the cache file is never partially written
+    with open(path + '.tmp', 'w') as file:
+        json.dump(schema_cache, file)
+    os.replace(path + '.tmp', path)
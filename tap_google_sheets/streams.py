@@ -1,21 +1,171 @@
 import json
 import os
+import sys
 import time
 import re
+import queue
+import threading
 import simplejson as json
-from collections import OrderedDict
+from collections import OrderedDict, deque
 import urllib.parse
 import singer
 import decimal
+import functools
+import hashlib
+import tempfile
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor, wait
+from requests.exceptions import Timeout, ConnectionError
 from singer import metrics, metadata, Transformer, utils, messages
 from singer.utils import strptime_to_utc, strftime
 from singer.messages import RecordMessage
 from singer.transform import SchemaKey
+from singer.schema import Schema
 import tap_google_sheets.transform as internal_transform
+import tap_google_sheets.columnar as columnar
 import tap_google_sheets.schema as schema
+from tap_google_sheets.client import Server5xxError, Server429Error, SyncInterrupted
+from tap_google_sheets.row_index import RowHashIndex
 
 LOGGER = singer.get_logger()
 
+# Number of rows in a page of sheet data
+BATCH_ROWS = 200
+# Maximum number of ranges in a single API call, keeps the URL length reasonable
+MAX_RANGES_PER_REQUEST = 100
+# Maximum length of the ranges in the URL of a single API call (a URL too long is rejected with a 414 error),
+#   each range repeats the URL encoded sheet title
+MAX_RANGES_URL_LENGTH = 8000
+# Last row of a range of the largest sheets (10 million cells), to bound the length of a range
+MAX_RANGE_ROW = 10000000
+# Message queue of the worker thread syncing a sheet, when the sheets are synced in parallel
+MESSAGE_QUEUE = threading.local()
+# Maximum number of messages buffered by a worker thread (backpressure on the sheets not written yet),
+#   and seconds between 2 checks of the stop of the sync while the queue is full
+MAX_QUEUED_MESSAGES = 2000
+QUEUE_WAIT_SECONDS = 0.1
+# Errors of the page requests retried once the other pages of the sheet are written,
+# when the retries of the request are exhausted (up to "max_deferred_requests" requests per sheet)
+DEFERRABLE_ERRORS = (Server5xxError, Server429Error, ConnectionError, Timeout)
+MAX_DEFERRED_REQUESTS = 10
+# Number of pages of a sheet between 2 checkpoints of the sheet in the State
+CHECKPOINT_PAGES = 100
+# Time kept to write the State before the max_runtime_seconds, at most 10% of the runtime
+RUNTIME_RESERVE_SECONDS = 60
+# Characters of RECORD messages buffered before they are written to stdout (default of the "record_buffer_size")
+RECORD_BUFFER_SIZE = 1048576
+# Bytes of the pages of a sheet kept in memory until its fingerprint is compared, the next pages spill to a temporary file
+MAX_SPOOLED_PAGES_SIZE = 10485760
+
+
+class RunLimits:
+    """
+    Limits of the run: the runtime, the number of API calls of the client, and a stop request (ie. SIGTERM)
+    """
+    def __init__(self, client, max_runtime_seconds=None, max_api_calls=None):
+        self.client = client
+        self.started_at = time.monotonic()
+        self.max_runtime_seconds = float(max_runtime_seconds) if max_runtime_seconds else None
+        self.max_api_calls = int(max_api_calls) if max_api_calls else None
+        self.stop_event = threading.Event()
+        self.reason = None
+        # the waits of the requests of the client (rate limit, retries, concurrency) are interrupted by the stop
+        if client is not None:
+            client.stop_event = self.stop_event
+
+    def stop(self, reason):
+        """
+        Request the sync to stop fetching pages
+        """
+        if not self.stop_event.is_set():
+            LOGGER.warning('Stopping the sync: {}'.format(reason))
+            self.reason = reason
+            self.stop_event.set()
+
+    def is_reached(self):
+        """
+        Return True once the sync must stop: a limit is near or a stop was requested
+        """
+        if self.max_runtime_seconds:
+            reserve = min(RUNTIME_RESERVE_SECONDS, self.max_runtime_seconds / 10)
+            if time.monotonic() - self.started_at >= self.max_runtime_seconds - reserve:
+                self.stop('max_runtime_seconds ({}) reached'.format(self.max_runtime_seconds))
+        if self.max_api_calls and getattr(self.client, 'request_count', 0) >= self.max_api_calls:
+            self.stop('max_api_calls ({}) reached'.format(self.max_api_calls))
+        return self.stop_event.is_set()
+
+
+class RecordSerializer:
+    """
+    Serialize the RECORD messages of a stream like new_format_message: the envelope of the messages
+        (stream, version and time_extracted) is rendered once, only the records are encoded
+    """
+    # encoder of new_format_message (json.dumps creates an encoder for each call with these params)
+    encoder = json.JSONEncoder(ensure_ascii=False, use_decimal=True)
+
+    def __init__(self, stream_name, time_extracted, version=None):
+        envelope = messages.format_message(RecordMessage(
+            stream=stream_name,
+            record=None,
+            version=version,
+            time_extracted=time_extracted))
+        # the record is after the type and the stream (a JSON string, its quotes are escaped)
+        self.prefix, self.suffix = envelope.split('"record": null', 1)
+        self.prefix = self.prefix + '"record": '
+        self.suffix = self.suffix + '\n'
+
+    def serialize(self, record):
+        """
+        Return the line of the RECORD message of the record
+        """
+        return self.prefix + self.encoder.encode(record) + self.suffix
+
+
+class RecordWriter:
+    """
+    Write the lines of the RECORD messages to stdout in batches of "buffer_size" characters, instead of
+        a write and a flush of stdout for each message: the buffered lines are written and stdout is flushed
+        before any other message (the STATE messages), and at the end of the sync
+    """
+    def __init__(self, buffer_size=RECORD_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self.lines = []
+        self.size = 0
+
+    def write(self, line):
+        """
+        Buffer the line of a RECORD message, the lines are written once the buffer_size is reached
+        """
+        self.lines.append(line)
+        self.size += len(line)
+        if self.size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the buffered lines to stdout and flush it
+        """
+        if self.lines:
+            lines = ''.join(self.lines)
+            self.lines = []
+            self.size = 0
+            sys.stdout.write(lines)
+            sys.stdout.flush()
+
+# Writer of the RECORD messages of the sync, in the main thread (the worker threads buffer the lines in their message queue)
+RECORD_WRITER = RecordWriter()
+
+@functools.lru_cache(maxsize=128)
+def get_record_serializer(stream_name, time_extracted, version=None):
+    """
+    Get the RecordSerializer of the RECORD messages of a stream, with the same time_extracted and version
+    """
+    return RecordSerializer(stream_name, time_extracted, version)
+
+# Column types transformed from the unformatted value (serial number), and from the unformatted value only
+UNFORMATTED_COLUMN_TYPES = ('numberType', 'numberType.DATE_TIME', 'numberType.TIME')
+UNFORMATTED_ONLY_COLUMN_TYPES = ('numberType.DATE_TIME', 'numberType.TIME')
+
 def update_currently_syncing(state, stream_name):
     """
     Currently syncing sets the stream currently being delivered in the state.
@@ -27,8 +177,41 @@ def update_currently_syncing(state, stream_name):
         del state["currently_syncing"]
     else:
         singer.set_currently_syncing(state, stream_name)
+    write_state(state)
+
+def write_state(state):
+    """
+    Write the State, after the buffered RECORD messages
+    """
+    RECORD_WRITER.flush()
     singer.write_state(state)
 
+def queue_message(message_queue, message):
+    """
+    Buffer a message in the message queue of the current worker thread, waiting while the queue is full
+        raise SyncInterrupted if the sync is stopped meanwhile (the messages of the sheet are not written)
+    """
+    while True:
+        try:
+            message_queue.put(message, timeout=QUEUE_WAIT_SECONDS)
+            return
+        except queue.Full:
+            stop_event = getattr(MESSAGE_QUEUE, 'stop_event', None)
+            if stop_event is not None and stop_event.is_set():
+                raise SyncInterrupted('the sync stopped, the messages of the sheet are not written')
+
+def write_message(message):
+    """
+    Write a Singer message, or buffer it in the message queue of the current worker thread
+        (see SheetsLoadData.sync_sheets)
+    """
+    message_queue = getattr(MESSAGE_QUEUE, 'queue', None)
+    if message_queue is not None:
+        queue_message(message_queue, message)
+    else:
+        RECORD_WRITER.flush()
+        singer.write_message(message)
+
 def write_schema(catalog, stream_name):
     """
     Write schema from the stream
@@ -36,7 +219,10 @@ def write_schema(catalog, stream_name):
     stream = catalog.get_stream(stream_name)
     schema = stream.schema.to_dict()
     try:
-        singer.write_schema(stream_name, schema, stream.key_properties)
+        write_message(singer.SchemaMessage(
+            stream=stream_name,
+            schema=schema,
+            key_properties=stream.key_properties))
         LOGGER.info('Writing schema for: {}'.format(stream_name))
     except OSError as err:
         LOGGER.info('OS Error writing schema for: {}'.format(stream_name))
@@ -45,22 +231,16 @@ def write_schema(catalog, stream_name):
 def write_record(stream_name, record, time_extracted, version=None):
     """
     Write records for the stream with extracted time
+        serialized by the RecordSerializer of the stream, and buffered by the RECORD_WRITER
+        or in the message queue of the current worker thread
     """
     try:
-        # use "write_message" if version is found as
-        # "write_record" params does not contain "version"
-        if version:
-            singer.messages.write_message(
-                RecordMessage(
-                    stream=stream_name,
-                    record=record,
-                    version=version,
-                    time_extracted=time_extracted))
+        line = get_record_serializer(stream_name, time_extracted, version).serialize(record)
+        message_queue = getattr(MESSAGE_QUEUE, 'queue', None)
+        if message_queue is not None:
+            queue_message(message_queue, line)
         else:
-            singer.messages.write_record(
-                stream_name=stream_name,
-                record=record,
-                time_extracted=time_extracted)
+            RECORD_WRITER.write(line)
     except OSError as err:
         LOGGER.info('OS Error writing record for: {}'.format(stream_name))
         raise err
@@ -85,7 +265,69 @@ def write_bookmark(state, stream, value):
         state['bookmarks'] = {}
     state['bookmarks'][stream] = value
     LOGGER.info('Write state for stream: {}, value: {}'.format(stream, value))
-    singer.write_state(state)
+    write_state(state)
+
+def get_fingerprint(state, sheet_title):
+    """
+    Get the fingerprint of the sheet's data written by the last sync
+    """
+    return (state or {}).get('fingerprints', {}).get(sheet_title)
+
+def get_checkpoint(state, sheet_title):
+    """
+    Get the checkpoint (from_row and activate_version) of the sheet written by an interrupted sync
+    """
+    return (state or {}).get('checkpoints', {}).get(sheet_title)
+
+def get_last_row(state, sheet_title):
+    """
+    Get the last row (number and hash) of the sheet's data written by the last syncs of an INCREMENTAL sheet
+    """
+    return (state or {}).get('last_rows', {}).get(sheet_title)
+
+def get_row_hash(row, unformatted_row):
+    """
+    Get the hash of the formatted and unformatted values of a row
+    """
+    return hashlib.sha256(json.dumps([row, unformatted_row]).encode('utf-8')).hexdigest()
+
+def fingerprint_pages(pages, fingerprint):
+    """
+    Yield the pages, updating the fingerprint (hash) with each page
+    """
+    for page in pages:
+        fingerprint.update(json.dumps(page).encode('utf-8'))
+        yield page
+
+def spool_pages(sheet_title, pages, fingerprint, run_limits=None):
+    """
+    Fetch all the pages of the sheet, updating the fingerprint (hash) with each page, into a temporary file
+        kept in memory up to MAX_SPOOLED_PAGES_SIZE bytes
+        raise SyncInterrupted once the run_limits are reached (no record of the sheet is written yet)
+    """
+    spooled_pages = tempfile.SpooledTemporaryFile(max_size=MAX_SPOOLED_PAGES_SIZE, mode='w+', encoding='utf-8')
+    try:
+        for page in pages:
+            page_json = json.dumps(page)
+            fingerprint.update(page_json.encode('utf-8'))
+            spooled_pages.write(page_json + '\n')
+            # Stop fetching the next pages, the next sync starts the sheet again
+            if run_limits and run_limits.is_reached():
+                raise SyncInterrupted('Sheet: {}, interrupted after row {} before the fingerprint is compared'.format(
+                    sheet_title, page[0] + len(page[1]) - 1))
+    except BaseException:
+        spooled_pages.close()
+        raise
+    spooled_pages.seek(0)
+    return spooled_pages
+
+def read_spooled_pages(spooled_pages):
+    """
+    Yield the pages of the temporary file of spool_pages, closed once read
+    """
+    with spooled_pages:
+        for page_json in spooled_pages:
+            yield json.loads(page_json)
 
 def get_abs_path(path):
     return os.path.join(os.path.dirname(os.path.realpath(__file__)), path)
@@ -108,6 +350,103 @@ def get_selected_fields(catalog, stream_name):
             pass
     return selected_fields
 
+def get_replication_method(catalog, stream_name):
+    """
+    Get the replication method of a stream, from the metadata of the catalog
+    """
+    stream = catalog.get_stream(stream_name)
+    return metadata.get(metadata.to_map(stream.metadata), (), 'replication-method')
+
+def get_key_properties(catalog, stream_name):
+    """
+    Get the key properties of a stream: the table-key-properties of the catalog metadata (ie. key columns of a sheet),
+        else the key_properties of the stream, default to the row number
+    """
+    stream = catalog.get_stream(stream_name)
+    key_properties = metadata.get(metadata.to_map(stream.metadata), (), 'table-key-properties')
+    return key_properties or stream.key_properties or ['__sdc_row']
+
+def get_key_columns(sheet_title, key_properties, columns):
+    """
+    Get the key columns of a sheet, None if the rows are identified by the row number
+    """
+    key_columns = [key for key in key_properties if key != '__sdc_row']
+    if not key_columns:
+        return None
+    column_names = [col.get('columnName') for col in columns if not col.get('columnSkipped')]
+    for key_column in key_columns:
+        if key_column not in column_names:
+            raise Exception('KEY COLUMN NOT FOUND ERROR: SHEET: {}, KEY COLUMN: {}'.format(sheet_title, key_column))
+    return key_columns
+
+def get_page_ranges(sheet_max_row, batch_rows=BATCH_ROWS, from_row=2):
+    """
+    Get the (from_row, to_row) ranges of rows for "paging" through the data of a sheet
+        1st page: rows from_row (default 2, after the header row) to the next multiple of batch_rows,
+        next pages: batch_rows rows each, up to the last row of the grid (sheet_max_row)
+    """
+    page_ranges = []
+    to_row = min(sheet_max_row, ((from_row - 1) // batch_rows + 1) * batch_rows)
+    while from_row <= sheet_max_row:
+        page_ranges.append((from_row, to_row))
+        # Update paging from/to_row for next batch
+        from_row = to_row + 1
+        to_row = min(to_row + batch_rows, sheet_max_row)
+    return page_ranges
+
+def get_range_url_length(sheet_title):
+    """
+    Get the maximum length of a range of the sheet in the URL of a request: &ranges='{sheet_title}'!A1:B2
+        the sheet title is URL encoded (up to 9 characters for each non-ASCII character)
+    """
+    return len("&ranges='{}'!ZZZ{}:ZZZ{}".format(urllib.parse.quote_plus(sheet_title), MAX_RANGE_ROW, MAX_RANGE_ROW))
+
+def get_projected_columns(catalog, stream_name, columns):
+    """
+    Get the columns of a sheet not deselected in the catalog (selected: false), like the Transformer
+        the columns with automatic inclusion and the key columns are always kept
+    """
+    stream = catalog.get_stream(stream_name)
+    mdata = metadata.to_map(stream.metadata)
+    key_properties = get_key_properties(catalog, stream_name)
+    projected_columns = []
+    for col in columns:
+        breadcrumb = ('properties', col.get('columnName'))
+        if col.get('columnName') not in key_properties and \
+                metadata.get(mdata, breadcrumb, 'inclusion') != 'automatic' and \
+                metadata.get(mdata, breadcrumb, 'selected') is False:
+            continue
+        projected_columns.append(col)
+    return projected_columns
+
+def get_column_blocks(columns):
+    """
+    Group the columns into blocks of contiguous columns: (first_col_index, first_col_letter, last_col_letter)
+    """
+    column_blocks = []
+    last_col_index = None
+    for col in sorted(columns, key=lambda col: col['columnIndex']):
+        if column_blocks and col['columnIndex'] == last_col_index + 1:
+            first_col_index, first_col_letter, _ = column_blocks[-1]
+            column_blocks[-1] = (first_col_index, first_col_letter, col['columnLetter'])
+        else:
+            column_blocks.append((col['columnIndex'], col['columnLetter'], col['columnLetter']))
+        last_col_index = col['columnIndex']
+    return column_blocks
+
+def get_render_plan(columns):
+    """
+    Get the column blocks to request with each value render option, to transform the columns of a sheet
+        FORMATTED_VALUE: all the columns but the dates and times (strings, booleans, numbers validation, skipped columns)
+        UNFORMATTED_VALUE: the numbers, dates and times (serial numbers)
+    """
+    return {
+        "FORMATTED_VALUE": get_column_blocks(
+            [col for col in columns if col.get('columnType') not in UNFORMATTED_ONLY_COLUMN_TYPES]),
+        "UNFORMATTED_VALUE": get_column_blocks(
+            [col for col in columns if col.get('columnType') in UNFORMATTED_COLUMN_TYPES])
+    }
+
 def new_format_message(message):
     """To override the ensure_ascii param, overwitten this function"""
     return json.dumps(message.asdict(), ensure_ascii=False, use_decimal=True)
@@ -126,19 +465,23 @@ class GoogleSheets:
     params = None
     state = None
 
-    def __init__(self, client, spreadsheet_id, start_date=None):
+    def __init__(self, client, spreadsheet_id, start_date=None, config=None):
         self.client = client
         self.config_start_date = start_date
         self.spreadsheet_id = spreadsheet_id
+        self.config = config or {}
 
-    def get_path(self, sheet_title_encoded=""):
+    def get_path(self, sheet_title_encoded="", range_rows=""):
         """
         return path and query string for API Call
         """
         # Add in querystring parameters and replace {placeholder} variables
         # querystring function ensures parameters are added but not encoded causing API errors
         # create querystring for preparing the request
-        querystring = '&'.join(['%s=%s' % (key, value) for (key, value) in self.params.items()]).replace('{sheet_title}', sheet_title_encoded)
+        # a list of values adds the parameter once for each value, ie. ranges=...&ranges=...
+        querystring = '&'.join(['%s=%s' % (key, value) for (key, values) in self.params.items()
+                                for value in (values if isinstance(values, list) else [values])]).replace(
+            '{sheet_title}', sheet_title_encoded).replace('{range_rows}', range_rows)
         # create path for preparing the request
         path = '{}?{}'.format(self.path.replace('{spreadsheet_id}', self.spreadsheet_id), querystring)
         # return path and query string
@@ -171,31 +514,42 @@ class GoogleSheets:
 
         return schemas, field_metadata
 
+    def get_record_projector(self, stream_name, schema, stream_metadata):
+        """
+        Get the record projector of the stream: no record is projected, the records are transformed
+            by the singer Transformer
+        """
+        return internal_transform.project_no_record
+
     def process_records(self, catalog, stream_name, records, time_extracted, version=None):
         """
         Transform/validate batch of records with schema and sent to target
+            the records projected by the record projector of the stream are not transformed by the Transformer
         """
         stream = catalog.get_stream(stream_name)
         schema = stream.schema.to_dict()
         stream_metadata = metadata.to_map(stream.metadata)
+        project_record = self.get_record_projector(stream_name, schema, stream_metadata)
         with metrics.record_counter(stream_name) as counter:
             for record in records:
-                # Transform record for Singer.io
-                with Transformer() as transformer:
-                    try:
-                        transformed_record = transformer.transform(
-                            record,
-                            schema,
-                            stream_metadata)
-                    except Exception as err:
-                        LOGGER.error('{}'.format(err))
-                        raise RuntimeError(err)
-                    write_record(
-                        stream_name=stream_name,
-                        record=transformed_record,
-                        time_extracted=time_extracted,
-                        version=version)
-                    counter.increment()
+                transformed_record = project_record(record)
+                if transformed_record is internal_transform.NOT_PROJECTED:
+                    # Transform record for Singer.io
+                    with Transformer() as transformer:
+                        try:
+                            transformed_record = transformer.transform(
+                                record,
+                                schema,
+                                stream_metadata)
+                        except Exception as err:
+                            LOGGER.error('{}'.format(err))
+                            raise RuntimeError(err)
+                write_record(
+                    stream_name=stream_name,
+                    record=transformed_record,
+                    time_extracted=time_extracted,
+                    version=version)
+                counter.increment()
             return counter.value
 
     def get_data(self, stream_name, range_rows=None):
@@ -212,7 +566,7 @@ class GoogleSheets:
             '{spreadsheet_id}', self.spreadsheet_id).replace('{sheet_title}', stream_name_encoded).replace(
                 '{range_rows}', range_rows)
         api = self.api
-        _, querystring = self.get_path(stream_name_encoded)
+        _, querystring = self.get_path(stream_name_encoded, range_rows)
         LOGGER.info('URL: {}/{}?{}'.format(self.client.base_url, path, querystring))
         data = {}
         time_extracted = utils.now()
@@ -260,19 +614,33 @@ class SpreadSheetMetadata(GoogleSheets):
         # get schema of spreadsheet metadata
         schemas, field_metadata = super().get_schemas()
 
-        # prepare schema for sheets in the spreadsheet
-        api = self.api
-        path, querystring = self.get_path()
+        # with a schema_cache_dir, the sheets and their schemas are reused until the Drive file version changes
+        schema_cache_dir = self.config.get('schema_cache_dir')
+        sheets, sheets_metadata = None, None
+        if schema_cache_dir:
+            file_metadata, _ = FileMetadata(self.client, self.spreadsheet_id).get_data(stream_name=FileMetadata.stream_name)
+            file_version = [file_metadata.get('version'), file_metadata.get('modifiedTime')]
+            sheets, sheets_metadata = schema.read_schema_cache(schema_cache_dir, self.spreadsheet_id, file_version, self.client)
+
+        if sheets is None:
+            # prepare schema for sheets in the spreadsheet
+            api = self.api
+            path, querystring = self.get_path()
 
-        # GET spreadsheet_metadata, which incl. sheets (basic metadata for each worksheet)
-        spreadsheet_md_results = self.client.get(path=path, params=querystring, api=api, endpoint=self.stream_name)
+            # GET spreadsheet_metadata, which incl. sheets (basic metadata for each worksheet)
+            spreadsheet_md_results = self.client.get(path=path, params=querystring, api=api, endpoint=self.stream_name)
+
+            sheets = spreadsheet_md_results.get('sheets')
+            # GET sheet_json_schema and columns of the worksheets, several worksheets per request
+            sheets_metadata = schema.get_sheets_metadata(sheets, self.spreadsheet_id, self.client) if sheets else {}
+            if schema_cache_dir:
+                schema.write_schema_cache(schema_cache_dir, self.spreadsheet_id, file_version, sheets, sheets_metadata)
 
-        sheets = spreadsheet_md_results.get('sheets')
         if sheets:
             # Loop thru each worksheet in spreadsheet
             for sheet in sheets:
-                # GET sheet_json_schema for each worksheet (from function above)
-                sheet_json_schema, columns = schema.get_sheet_metadata(sheet, self.spreadsheet_id, self.client)
+                sheet_id = sheet.get('properties', {}).get('sheetId')
+                sheet_json_schema, columns = sheets_metadata.get(sheet_id, (None, None))
 
                 # SKIP empty sheets (where sheet_json_schema and columns are None)
                 if sheet_json_schema and columns:
@@ -281,7 +649,7 @@ class SpreadSheetMetadata(GoogleSheets):
                     sheet_mdata = metadata.new()
                     sheet_mdata = metadata.get_standard_metadata(
                         schema=sheet_json_schema,
-                        key_properties=['__sdc_row'],
+                        key_properties=self.get_sheet_key_properties(sheet_title, columns),
                         valid_replication_keys=None,
                         replication_method='FULL_TABLE'
                     )
@@ -297,6 +665,19 @@ class SpreadSheetMetadata(GoogleSheets):
 
         return schemas, field_metadata
 
+    def get_sheet_key_properties(self, sheet_title, columns):
+        """
+        Get the key properties of a sheet: the key columns of the sheet in the "key_columns" config
+            ({sheet title: [column names]}), else the row number
+        """
+        key_columns = self.config.get('key_columns', {}).get(sheet_title)
+        if key_columns:
+            try:
+                return get_key_columns(sheet_title, key_columns, columns)
+            except Exception as err:
+                LOGGER.warning('{}'.format(err))
+        return ['__sdc_row']
+
     def sync(self, catalog, state, spreadsheet_metadata, time_extracted):
         """
         sync spreadsheet's metadata
@@ -400,7 +781,124 @@ def new_transform(self, data, typ, schema, path):
 # the singer module
 Transformer._transform = new_transform
 
+class SheetGridData(GoogleSheets):
+    api = "sheets"
+    path = "spreadsheets/{spreadsheet_id}"
+    params = {}
+
+    def get_pages_data(self, sheet_title, sheet_last_col_letter, page_ranges):
+        """
+        Get the formatted and the unformatted rows of each page with a single spreadsheets.get call
+        """
+        self.params = {
+            "includeGridData": "true",
+            "ranges": ["'{{sheet_title}}'!A{}:{}{}".format(from_row, sheet_last_col_letter, to_row)
+                       for from_row, to_row in page_ranges],
+            # only request the cell values (and the start row of each range), not the formats and the sheet properties
+            "fields": "sheets.data(startRow,rowData.values(formattedValue,effectiveValue))"
+        }
+        grid_data, _ = self.get_data(stream_name=sheet_title)
+        # grid data of the ranges: `data` nodes of the 1st `sheets` node in results
+        sheet = next(iter(grid_data.get('sheets', [])), {})
+        # startRow is zero-based, match each range of grid data with its page
+        data_by_from_row = {data.get('startRow', 0) + 1: data for data in sheet.get('data', [])}
+        return [internal_transform.transform_grid_data_rows(data_by_from_row.get(from_row, {}))
+                for from_row, _ in page_ranges]
+
+class SheetsBatchGetData(GoogleSheets):
+    api = "sheets"
+    path = "spreadsheets/{spreadsheet_id}/values:batchGet"
+    params = {}
+
+    def get_pages_data(self, sheet_title, sheet_last_col_letter, page_ranges):
+        """
+        Get the formatted and the unformatted rows of each page with a spreadsheets.values:batchGet call
+            for each value render option
+        """
+        pages_rows = []
+        for value_render_option in ["FORMATTED_VALUE", "UNFORMATTED_VALUE"]:
+            self.params = {
+                "dateTimeRenderOption": "SERIAL_NUMBER",
+                "valueRenderOption": value_render_option,
+                "majorDimension": "ROWS",
+                "ranges": ["'{{sheet_title}}'!A{}:{}{}".format(from_row, sheet_last_col_letter, to_row)
+                           for from_row, to_row in page_ranges]
+            }
+            batch_data, _ = self.get_data(stream_name=sheet_title)
+            # valueRanges are returned in the order of the requested ranges
+            value_ranges = batch_data.get('valueRanges', [])
+            rows = [value_range.get('values', []) for value_range in value_ranges]
+            # pad missing ranges as blank pages
+            rows.extend([[]] * (len(page_ranges) - len(rows)))
+            pages_rows.append(rows)
+        return list(zip(*pages_rows))
+
+class SheetsColumnBlocksData(GoogleSheets):
+    api = "sheets"
+    path = "spreadsheets/{spreadsheet_id}/values:batchGet"
+    params = {}
+
+    def get_pages_data(self, sheet_title, page_ranges, render_plan):
+        """
+        Get the formatted and the unformatted rows of each page with a spreadsheets.values:batchGet call
+            for each value render option of the render plan, requesting only its column blocks
+        """
+        pages_blocks = {}
+        for value_render_option, column_blocks in render_plan.items():
+            pages_blocks[value_render_option] = [[] for _ in page_ranges]
+            if not column_blocks:
+                continue
+            self.params = {
+                "dateTimeRenderOption": "SERIAL_NUMBER",
+                "valueRenderOption": value_render_option,
+                "majorDimension": "ROWS",
+                "ranges": ["'{{sheet_title}}'!{}{}:{}{}".format(first_col_letter, from_row, last_col_letter, to_row)
+                           for from_row, to_row in page_ranges
+                           for _, first_col_letter, last_col_letter in column_blocks]
+            }
+            batch_data, _ = self.get_data(stream_name=sheet_title)
+            # valueRanges are returned in the order of the requested ranges: the blocks of each page
+            for i, value_range in enumerate(batch_data.get('valueRanges', [])):
+                first_col_index = column_blocks[i % len(column_blocks)][0]
+                pages_blocks[value_render_option][i // len(column_blocks)].append(
+                    (first_col_index, value_range.get('values', [])))
+        return [internal_transform.transform_column_blocks_rows(formatted_blocks, unformatted_blocks)
+                for formatted_blocks, unformatted_blocks in zip(
+                    pages_blocks["FORMATTED_VALUE"], pages_blocks["UNFORMATTED_VALUE"])]
+
+class SheetValuesData(GoogleSheets):
+    api = "sheets"
+    path = "spreadsheets/{spreadsheet_id}/values/'{sheet_title}'!{range_rows}"
+    params = {}
+
+    def get_pages_data(self, sheet_title, sheet_last_col_letter, page_ranges):
+        """
+        Get the formatted and the unformatted rows of a page with a spreadsheets.values call
+            for each value render option
+        """
+        from_row, to_row = page_ranges[0]
+        range_rows = 'A{}:{}{}'.format(from_row, sheet_last_col_letter, to_row)
+        self.params = {
+            "dateTimeRenderOption": "SERIAL_NUMBER",
+            "valueRenderOption": "FORMATTED_VALUE",
+            "majorDimension": "ROWS"
+        }
+        sheet_data, _ = self.get_data(stream_name=sheet_title, range_rows=range_rows)
+        # Data is returned as a list of arrays, an array of values for each row
+        sheet_data_rows = sheet_data.get('values', [])
+        self.params = {
+            "dateTimeRenderOption": "SERIAL_NUMBER",
+            "valueRenderOption": "UNFORMATTED_VALUE",
+            "majorDimension": "ROWS"
+        }
+        unformatted_sheet_data, _ = self.get_data(stream_name=sheet_title, range_rows=range_rows)
+        unformatted_sheet_data_rows = unformatted_sheet_data.get('values', [])
+        return [(sheet_data_rows, unformatted_sheet_data_rows)]
+
 class SheetsLoadData(GoogleSheets):
+    # RunLimits of the sync, if any
+    run_limits = None
+
     api = "sheets"
     path = "spreadsheets/{spreadsheet_id}/values/'{sheet_title}'!{range_rows}"
     data_key = "values"
@@ -408,21 +906,637 @@ class SheetsLoadData(GoogleSheets):
     replication_method = "FULL_TABLE"
     params = {}
 
+    def __init__(self, client, spreadsheet_id, start_date=None, config=None):
+        super().__init__(client, spreadsheet_id, start_date=start_date, config=config)
+        # record projector of each sheet stream, with the schema and the metadata it is compiled from
+        self.record_projectors = {}
+        # row index of each LOG_BASED sheet synced, committed once the State of the sheet is written
+        self.pending_row_indexes = {}
+
+    def get_record_projector(self, stream_name, schema, stream_metadata):
+        """
+        Get the record projector of a sheet stream (transform.get_record_projector), the same records as the singer
+            Transformer, compiled once unless the schema or the metadata of the stream changed
+        """
+        cached = self.record_projectors.get(stream_name)
+        if cached is None or cached[0] != schema or cached[1] != stream_metadata:
+            project_record = internal_transform.get_record_projector(schema, stream_metadata)
+            cached = (schema, stream_metadata, project_record or internal_transform.project_no_record)
+            self.record_projectors[stream_name] = cached
+        return cached[2]
+
+    def get_column_plan(self, catalog, sheet_title, columns):
+        """
+        Get the render plan and the columns to transform of a sheet with the "column_plan" fetch mode:
+            only the columns not deselected in the catalog are requested and transformed
+            return None, columns with the other fetch modes
+        """
+        if self.config.get('fetch_mode') != 'column_plan':
+            return None, columns
+        projected_columns = get_projected_columns(catalog, sheet_title, columns)
+        return get_render_plan(projected_columns), projected_columns
+
+    def get_sheet_data_transform(self):
+        """
+        Get the function transforming the pages of the sheets: by columns with numpy with the "numpy" transform_engine,
+            else by rows
+        """
+        if self.config.get('transform_engine') == 'numpy':
+            if columnar.np is not None:
+                return columnar.transform_sheet_data
+            LOGGER.warning('numpy is not installed, the "numpy" transform_engine is not used')
+        return internal_transform.transform_sheet_data
+
+    def get_pages_per_request(self, sheet_title, sheet_last_col_index, render_plan=None):
+        """
+        Get the number of pages to request in a single API call
+            based on the "max_cells_per_request" response-size budget, and the length of the URL of the ranges
+        """
+        max_cells_per_request = self.config.get('max_cells_per_request')
+        if not max_cells_per_request:
+            return 1
+        pages_per_request = int(max_cells_per_request) // (BATCH_ROWS * sheet_last_col_index)
+        # a range for each column block of a page with a render plan
+        ranges_per_page = max([len(column_blocks) for column_blocks in (render_plan or {}).values()] or [1])
+        max_ranges = min(MAX_RANGES_PER_REQUEST, MAX_RANGES_URL_LENGTH // get_range_url_length(sheet_title))
+        return max(1, min(pages_per_request, max_ranges // ranges_per_page))
+
+    def get_pages_data(self, sheet_title, sheet_last_col_letter, page_ranges, render_plan=None):
+        """
+        Get the formatted and the unformatted rows of each page (from_row, to_row) of the sheet
+            "values" fetch mode (default): 2 spreadsheets.values calls, one for each value render option
+                (spreadsheets.values:batchGet calls when requesting multiple pages)
+            "grid_data" fetch mode: 1 spreadsheets.get call returning both values of every cell
+            "column_plan" fetch mode: a spreadsheets.values:batchGet call for each value render option of the
+                render plan, requesting only the columns transformed from this render option
+        """
+        if render_plan:
+            return SheetsColumnBlocksData(self.client, self.spreadsheet_id).get_pages_data(
+                sheet_title, page_ranges, render_plan)
+
+        if self.config.get('fetch_mode') == 'grid_data':
+            return SheetGridData(self.client, self.spreadsheet_id).get_pages_data(
+                sheet_title, sheet_last_col_letter, page_ranges)
+
+        if len(page_ranges) > 1:
+            return SheetsBatchGetData(self.client, self.spreadsheet_id).get_pages_data(
+                sheet_title, sheet_last_col_letter, page_ranges)
+
+        return SheetValuesData(self.client, self.spreadsheet_id).get_pages_data(
+            sheet_title, sheet_last_col_letter, page_ranges)
+
+    def get_concurrency_limit(self, max_concurrency):
+        """
+        Get the number of requests to keep in flight: the current limit of the adaptive concurrency limiter
+            of the client (if "max_concurrent_requests" is configured), up to max_concurrency
+        """
+        concurrency_limiter = getattr(self.client, 'concurrency_limiter', None)
+        if concurrency_limiter is None:
+            return max_concurrency
+        return min(max_concurrency, concurrency_limiter.limit)
+
+    def fetch_requests(self, sheet_title, sheet_last_col_letter, requests_page_ranges, render_plan=None):
+        """
+        Yield the page ranges of each request with a function returning its pages data, in order
+            With a "prefetch_depth" greater than 1, keep up to prefetch_depth requests in flight on a thread pool
+            while the pages already received are processed. The prefetch_depth defaults to "max_concurrent_requests",
+            the requests in flight are limited by the adaptive concurrency limit of the client
+        """
+        prefetch_depth = int(self.config.get('prefetch_depth') or self.config.get('max_concurrent_requests') or 1)
+
+        if prefetch_depth <= 1:
+            for request_page_ranges in requests_page_ranges:
+                yield request_page_ranges, functools.partial(
+                    self.get_pages_data, sheet_title, sheet_last_col_letter, request_page_ranges, render_plan)
+            return
+
+        pending_requests = iter(requests_page_ranges)
+        in_flight = deque()
+        with ThreadPoolExecutor(max_workers=prefetch_depth) as executor:
+            def submit_next_requests():
+                # Submit requests up to the current concurrency limit
+                while len(in_flight) < max(1, self.get_concurrency_limit(prefetch_depth)):
+                    request_page_ranges = next(pending_requests, None)
+                    if not request_page_ranges:
+                        return
+                    future = executor.submit(self.get_pages_data, sheet_title, sheet_last_col_letter,
+                                             request_page_ranges, render_plan)
+                    in_flight.append((request_page_ranges, future))
+
+            try:
+                submit_next_requests()
+                # Wait for the oldest request to keep the pages in order (__sdc_row),
+                # and submit the next requests to keep the limit of requests in flight
+                while in_flight:
+                    request_page_ranges, future = in_flight.popleft()
+                    # Wait for the response before submitting the next requests
+                    wait([future])
+                    submit_next_requests()
+                    yield request_page_ranges, future.result
+            finally:
+                # Stop fetching when the loop stops early (ie. a blank page is found) or on error
+                for _, future in in_flight:
+                    future.cancel()
+
+    def get_pages(self, sheet_title, sheet_last_col_letter, page_ranges, pages_per_request, render_plan=None,
+                  stop_at_blank_page=True):
+        """
+        Yield the from_row, formatted rows and unformatted rows of each page of the sheet, in order, until a blank page
+            (or every page if not stop_at_blank_page)
+            The requests failing after their retries are deferred: retried after the other pages
+        """
+        requests_page_ranges = [page_ranges[i:i + pages_per_request]
+                                for i in range(0, len(page_ranges), pages_per_request)]
+        max_deferred_requests = int(self.config.get('max_deferred_requests', MAX_DEFERRED_REQUESTS))
+        deferred_requests = []
+
+        with closing(self.fetch_requests(
+                sheet_title, sheet_last_col_letter, requests_page_ranges, render_plan)) as sheet_requests:
+            for request_page_ranges, get_pages_data in sheet_requests:
+                try:
+                    pages_data = get_pages_data()
+                except DEFERRABLE_ERRORS as err:
+                    if len(deferred_requests) >= max_deferred_requests:
+                        raise
+                    LOGGER.warning('Sheet: {}, rows {} to {} deferred: {}'.format(
+                        sheet_title, request_page_ranges[0][0], request_page_ranges[-1][1], repr(err)))
+                    deferred_requests.append(request_page_ranges)
+                    continue
+
+                blank_page_found = False
+                for (from_row, _), (sheet_data_rows, unformatted_rows) in zip(request_page_ranges, pages_data):
+                    yield from_row, sheet_data_rows, unformatted_rows
+                    # Here row_num is the addition of from_row and total records get in response(per batch).
+                    # Condition row_num < to_row was checking that if records on the current page are less than expected(to_row) or not.
+                    # If the condition returns true then it was breaking the loop.
+                    # API does not return the last empty rows in response.
+                    # For example, rows 199 and 200 are empty, and a total of 400 rows are there in the sheet. So, in 1st iteration,
+                    # to_row = 200, from_row = 2, row_num = 2(from_row) + 197 = 199(1st row contain header value)
+                    # So, the above condition become true and breaks the loop without syncing records from 201 to 400.
+                    # sheet_data_rows is no of records return in the current page. If it's a whole blank page then stop looping.
+                    # So, in the above case, it syncs records 201 to 400 also even if rows 199 and 200 are blank.
+                    # Then when the next batch 401 to 600 is empty, it breaks the loop.
+                    if not sheet_data_rows and stop_at_blank_page: # If a whole blank page found, then stop looping.
+                        blank_page_found = True
+                        break
+                if blank_page_found:
+                    break
+
+        # Retry the deferred requests, the pages before the blank page
+        for request_page_ranges in deferred_requests:
+            LOGGER.info('Sheet: {}, retrying rows {} to {}'.format(
+                sheet_title, request_page_ranges[0][0], request_page_ranges[-1][1]))
+            pages_data = self.get_pages_data(sheet_title, sheet_last_col_letter, request_page_ranges, render_plan)
+            for (from_row, _), (sheet_data_rows, unformatted_rows) in zip(request_page_ranges, pages_data):
+                yield from_row, sheet_data_rows, unformatted_rows
+
+    def sync_sheet_data(self, catalog, sheet, columns, spreadsheet_time_extracted):
+        """
+        Write the schema, the records and the ACTIVATE_VERSION messages of a sheet
+            return the activate_version, the last row number and the state of the sheet to write once its
+            messages are written ({state key: value of the sheet}, ie. the fingerprint of the sheet)
+            With "skip_unchanged_sheets", the records and the ACTIVATE_VERSION messages are not written
+            if the fingerprint of the sheet is unchanged, and the activate_version and the last row number are None
+        """
+        sheet_title = sheet.get('properties', {}).get('title')
+        sheet_id = sheet.get('properties', {}).get('sheetId')
+        # Do not start a sheet once the run limits are reached
+        if self.run_limits and self.run_limits.is_reached():
+            raise SyncInterrupted('Sheet: {}, not started'.format(sheet_title))
+        selected_fields = get_selected_fields(catalog, sheet_title) # --------------------
+        LOGGER.info('Stream: {}, selected_fields: {}'.format(sheet_title, selected_fields))
+
+        # LOG_BASED: only the inserted and changed rows are written, and a record with the _sdc_deleted_at
+        #   of each deleted row, comparing the rows with the hash of each row in the row index of the sheet
+        replication_method = get_replication_method(catalog, sheet_title)
+        row_index_dir = None
+        if replication_method == 'LOG_BASED':
+            row_index_dir = self.config.get('row_index_dir')
+            if not row_index_dir:
+                LOGGER.warning('Stream: {}, LOG_BASED replication requires a row_index_dir, FULL_TABLE sync'.format(sheet_title))
+        # INCREMENTAL (append-only sheets): only the rows after the last row of the last sync are written
+        incremental = replication_method == 'INCREMENTAL'
+        # Rows identified by key columns (table-key-properties of the catalog metadata), else by row number
+        key_properties = get_key_properties(catalog, sheet_title)
+        key_columns = get_key_columns(sheet_title, key_properties, columns)
+        if key_columns:
+            catalog.get_stream(sheet_title).key_properties = key_properties
+        if row_index_dir:
+            stream = catalog.get_stream(sheet_title)
+            stream.schema.properties = stream.schema.properties or {}
+            stream.schema.properties['_sdc_deleted_at'] = Schema(type=['null', 'string'], format='date-time')
+        write_schema(catalog, sheet_title)
+
+        # Emit a Singer ACTIVATE_VERSION message before initial sync (but not subsequent syncs)
+        # everytime after each sheet sync is complete.
+        # This forces hard deletes on the data downstream if fewer records are sent.
+        # https://github.com/singer-io/singer-python/blob/master/singer/messages.py#L137
+        last_integer = int(get_bookmark(self.state, sheet_title, 0))
+        activate_version = int(time.time() * 1000)
+        # Resume the sync interrupted after the checkpoint, with the same version
+        #   (the LOG_BASED row index is only committed once the sheet is complete)
+        checkpoint = get_checkpoint(self.state, sheet_title) if not row_index_dir else None
+        if checkpoint:
+            activate_version = checkpoint['activate_version']
+            LOGGER.info('RESUME SYNC, Stream: {}, from row: {}, Activate Version: {}'.format(
+                sheet_title, checkpoint['from_row'], activate_version))
+        activate_version_message = singer.ActivateVersionMessage(
+                stream=sheet_title,
+                version=activate_version)
+        if last_integer == 0 and not row_index_dir and not incremental and not checkpoint:
+            # initial load, send activate_version before AND after data sync
+            write_message(activate_version_message)
+            LOGGER.info('INITIAL SYNC, Stream: {}, Activate Version: {}'.format(sheet_title, activate_version))
+
+        # Determine max range of columns and rows for "paging" through the data
+        sheet_last_col_index = 1
+        sheet_last_col_letter = 'A'
+        for col in columns:
+            col_index = col.get('columnIndex')
+            col_letter = col.get('columnLetter')
+            if col_index > sheet_last_col_index:
+                sheet_last_col_index = col_index
+                sheet_last_col_letter = col_letter
+        sheet_max_row = sheet.get('properties').get('gridProperties', {}).get('rowCount')
+        render_plan, projected_columns = self.get_column_plan(catalog, sheet_title, columns)
+        from_row = 2
+        if checkpoint:
+            from_row = checkpoint['from_row']
+        elif incremental:
+            from_row = self.get_incremental_from_row(sheet, sheet_last_col_letter, render_plan)
+        page_ranges = get_page_ranges(sheet_max_row, from_row=from_row)
+        pages_per_request = self.get_pages_per_request(sheet_title, sheet_last_col_index, render_plan)
+        # When columns are not requested, a blank page is not the end of the data: they may have values in the next pages
+        all_columns_requested = len(projected_columns) == len(columns)
+        selected_columns = None if all_columns_requested else {col.get('columnName') for col in projected_columns}
+        transform_plan = internal_transform.get_transform_plan(sheet_title, columns, selected_columns)
+        transform_sheet_data = self.get_sheet_data_transform()
+
+        pages = self.get_pages(sheet_title, sheet_last_col_letter, page_ranges, pages_per_request, render_plan,
+                               stop_at_blank_page=all_columns_requested)
+
+        # Fingerprint of the grid properties, the columns and the fields selected, and the data of the pages
+        sheet_state = {}
+        fingerprint = None
+        # the fingerprint of a resumed sync would only include the pages after the checkpoint
+        if str(self.config.get('skip_unchanged_sheets')).lower() == 'true' and not checkpoint:
+            fingerprint = hashlib.sha256(json.dumps(
+                [sheet.get('properties').get('gridProperties', {}), columns, selected_fields], sort_keys=True).encode('utf-8'))
+            last_fingerprint = get_fingerprint(self.state, sheet_title)
+            if last_integer != 0 and last_fingerprint:
+                # Fetch all the pages before writing the records, to compare the fingerprints
+                spooled_pages = spool_pages(sheet_title, pages, fingerprint, self.run_limits)
+                if fingerprint.hexdigest() == last_fingerprint:
+                    spooled_pages.close()
+                    LOGGER.info('UNCHANGED SHEET, Stream: {}, fingerprint: {}'.format(sheet_title, last_fingerprint))
+                    return None, None, sheet_state
+                pages = read_spooled_pages(spooled_pages)
+            else:
+                pages = fingerprint_pages(pages, fingerprint)
+
+        if row_index_dir:
+            row_index = RowHashIndex(row_index_dir, self.spreadsheet_id, sheet_id)
+            try:
+                row_num = self.write_sheet_changes(catalog, sheet, columns, selected_columns, all_columns_requested,
+                                                   key_columns, pages, row_index, activate_version, spreadsheet_time_extracted)
+            except BaseException:
+                row_index.close()
+                raise
+            # committed by write_sheets after the records and the State of the sheet
+            self.pending_row_indexes[sheet_title] = row_index
+            if fingerprint:
+                sheet_state['fingerprints'] = fingerprint.hexdigest()
+            return activate_version, row_num, sheet_state
+
+        # Loop thru batches (each having 200 rows of data)
+        row_num = from_row
+        last_row = get_last_row(self.state, sheet_title) if incremental and from_row > 2 else None
+        row_keys = set()
+        # Checkpoint every "checkpoint_pages" pages the 1st page not written yet,
+        #   the pages before it are written (the deferred pages are written after the next pages)
+        checkpoint_pages = int(self.config.get('checkpoint_pages', CHECKPOINT_PAGES))
+        written_pages = set()
+        written_count = 0
+        next_page = 0
+        for from_row, sheet_data_rows, unformatted_sheet_data_rows in pages:
+
+            # Transform batch of rows to JSON with keys for each column
+            sheet_data_transformed, page_row_num = transform_sheet_data(
+                spreadsheet_id=self.spreadsheet_id,
+                sheet_id=sheet_id,
+                sheet_title=sheet_title,
+                from_row=from_row,
+                columns=columns,
+                sheet_data_rows=sheet_data_rows, 
+                unformatted_rows = unformatted_sheet_data_rows,
+                selected_columns=selected_columns,
+                key_columns=key_columns,
+                row_keys=row_keys,
+                transform_plan=transform_plan)
+            # The deferred pages are received after the next pages,
+            # the blank pages only end the data when stopping at the first blank page
+            if sheet_data_rows or all_columns_requested:
+                row_num = max(row_num, page_row_num)
+            # the last row with values, to check that it is unchanged before resuming after it
+            if incremental and sheet_data_rows and (not last_row or from_row + len(sheet_data_rows) - 1 > last_row['row']):
+                last_row = {
+                    'row': from_row + len(sheet_data_rows) - 1,
+                    'row_hash': get_row_hash(sheet_data_rows[-1], (unformatted_sheet_data_rows[len(sheet_data_rows) - 1:] or [[]])[0])
+                }
+
+            # Process records, send batch of records to target
+            record_count = self.process_records(
+                catalog=catalog,
+                stream_name=sheet_title,
+                records=sheet_data_transformed,
+                time_extracted=spreadsheet_time_extracted,
+                version=None if incremental else activate_version)
+            LOGGER.info('Sheet: {}, records processed: {}'.format(
+                sheet_title, record_count))
+
+            written_pages.add(from_row)
+            written_count = written_count + 1
+            while next_page < len(page_ranges) and page_ranges[next_page][0] in written_pages:
+                written_pages.remove(page_ranges[next_page][0])
+                next_page = next_page + 1
+            if checkpoint_pages and written_count % checkpoint_pages == 0 and next_page < len(page_ranges):
+                self.write_checkpoint(sheet_title, {
+                    'from_row': page_ranges[next_page][0],
+                    'activate_version': activate_version
+                })
+
+            # Stop fetching the next pages, the next sync resumes at the 1st page not written
+            if self.run_limits and self.run_limits.is_reached() and next_page < len(page_ranges):
+                self.write_checkpoint(sheet_title, {
+                    'from_row': page_ranges[next_page][0],
+                    'activate_version': activate_version
+                })
+                raise SyncInterrupted('Sheet: {}, interrupted before row {}'.format(sheet_title, page_ranges[next_page][0]))
+
+        if fingerprint:
+            sheet_state['fingerprints'] = fingerprint.hexdigest()
+        if last_row:
+            sheet_state['last_rows'] = last_row
+        # End of Stream: Send Activate Version (the rows of an INCREMENTAL sheet are never deleted)
+        if not incremental:
+            write_message(activate_version_message)
+        return activate_version, row_num, sheet_state
+
+    def write_checkpoint(self, sheet_title, checkpoint):
+        """
+        Write the checkpoint of the sheet in the State, after the messages of the pages before the checkpoint
+            A worker thread buffers the checkpoint in its message queue, written by the main thread (see write_sheets)
+        """
+        message_queue = getattr(MESSAGE_QUEUE, 'queue', None)
+        if message_queue is not None:
+            queue_message(message_queue, checkpoint)
+        else:
+            self.state.setdefault('checkpoints', {})[sheet_title] = checkpoint
+            write_state(self.state)
+
+    def get_incremental_from_row(self, sheet, sheet_last_col_letter, render_plan):
+        """
+        Get the row after the last row written by the last syncs of an INCREMENTAL sheet,
+            or 2 (all the rows) if this last row changed
+        """
+        sheet_title = sheet.get('properties', {}).get('title')
+        sheet_max_row = sheet.get('properties').get('gridProperties', {}).get('rowCount')
+        last_row = get_last_row(self.state, sheet_title)
+        if not last_row:
+            return 2
+        if last_row['row'] <= sheet_max_row:
+            [(rows, unformatted_rows)] = self.get_pages_data(
+                sheet_title, sheet_last_col_letter, [(last_row['row'], last_row['row'])], render_plan)
+            if get_row_hash((rows or [[]])[0], (unformatted_rows or [[]])[0]) == last_row['row_hash']:
+                LOGGER.info('Stream: {}, INCREMENTAL sync after row {}'.format(sheet_title, last_row['row']))
+                return last_row['row'] + 1
+        LOGGER.warning('Stream: {}, the last synced row {} changed, syncing all the rows'.format(sheet_title, last_row['row']))
+        return 2
+
+    def write_sheet_changes(self, catalog, sheet, columns, selected_columns, all_columns_requested,
+                            key_columns, pages, row_index, sync_version, spreadsheet_time_extracted):
+        """
+        Write the records of the rows inserted or changed since the last sync, then a record with the
+            _sdc_deleted_at of each row deleted, the changes of the row index are not committed
+            return the last row number of the sheet
+        """
+        sheet_title = sheet.get('properties', {}).get('title')
+        sheet_id = sheet.get('properties', {}).get('sheetId')
+        key_properties = get_key_properties(catalog, sheet_title)
+        row_num = 2
+        row_keys = set()
+        transform_plan = internal_transform.get_transform_plan(sheet_title, columns, selected_columns)
+        transform_sheet_data = self.get_sheet_data_transform()
+        for from_row, sheet_data_rows, unformatted_sheet_data_rows in pages:
+            sheet_data_transformed, page_row_num = transform_sheet_data(
+                spreadsheet_id=self.spreadsheet_id,
+                sheet_id=sheet_id,
+                sheet_title=sheet_title,
+                from_row=from_row,
+                columns=columns,
+                sheet_data_rows=sheet_data_rows,
+                unformatted_rows=unformatted_sheet_data_rows,
+                selected_columns=selected_columns,
+                key_columns=key_columns,
+                row_keys=row_keys,
+                transform_plan=transform_plan)
+            if sheet_data_rows or all_columns_requested:
+                row_num = max(row_num, page_row_num)
+
+            # The row index is not committed: the next sync writes the changes of the sheet again
+            if self.run_limits and self.run_limits.is_reached():
+                raise SyncInterrupted('Sheet: {}, interrupted before row {}'.format(sheet_title, from_row))
+
+            changed_records = row_index.get_changed_records(sheet_data_transformed, key_properties, sync_version)
+            record_count = self.process_records(
+                catalog=catalog,
+                stream_name=sheet_title,
+                records=changed_records,
+                time_extracted=spreadsheet_time_extracted)
+            LOGGER.info('Sheet: {}, records changed: {} of {}'.format(
+                sheet_title, record_count, len(sheet_data_transformed)))
+
+        deleted_at = strftime(utils.now())
+        deleted_records = [dict(row_key, __sdc_spreadsheet_id=self.spreadsheet_id, __sdc_sheet_id=sheet_id,
+                                _sdc_deleted_at=deleted_at)
+                           for row_key in row_index.pop_deleted_keys(key_properties, sync_version)]
+        record_count = self.process_records(
+            catalog=catalog,
+            stream_name=sheet_title,
+            records=deleted_records,
+            time_extracted=spreadsheet_time_extracted)
+        LOGGER.info('Sheet: {}, records deleted: {}'.format(sheet_title, record_count))
+        return row_num
+
+    def commit_row_index(self, sheet_title):
+        """
+        Commit the row index of a LOG_BASED sheet, once its records and its State are written
+        """
+        row_index = self.pending_row_indexes.pop(sheet_title, None)
+        if row_index is not None:
+            with closing(row_index):
+                row_index.commit()
+
+    def close_row_indexes(self):
+        """
+        Close the row indexes not committed (the sync failed or was interrupted): their changes are rolled back,
+            the next sync writes the changes of these sheets again
+        """
+        while self.pending_row_indexes:
+            _, row_index = self.pending_row_indexes.popitem()
+            row_index.close()
+
+    def buffer_sheet_data(self, message_queue, catalog, sheet, columns, spreadsheet_time_extracted):
+        """
+        Sync the data of a sheet in a worker thread, buffering its messages in the message_queue
+            None is put in the queue when the sheet is complete (or failed)
+            The worker stops at the next page once the run limits are reached or stopped (ie. a sheet failed)
+        """
+        MESSAGE_QUEUE.queue = message_queue
+        MESSAGE_QUEUE.stop_event = self.run_limits.stop_event
+        try:
+            return self.sync_sheet_data(catalog, sheet, columns, spreadsheet_time_extracted)
+        finally:
+            MESSAGE_QUEUE.queue = None
+            try:
+                queue_message(message_queue, None)
+            except SyncInterrupted:
+                # the queue is not read anymore
+                pass
+            MESSAGE_QUEUE.stop_event = None
+
+    def sync_sheets(self, catalog, sheets_to_sync, spreadsheet_time_extracted):
+        """
+        Sync the selected sheets, one after another or with a pool of "max_sheet_workers" worker threads
+            With worker threads, the messages of each sheet are buffered and written in the order of the sheets,
+            so the messages of a stream stay contiguous and the STATE is updated as in a sequential sync
+            return the sheets loaded records
+        """
+        max_sheet_workers = int(self.config.get('max_sheet_workers') or 1)
+        # the worker threads stop with the run limits of the sync
+        if self.run_limits is None:
+            self.run_limits = RunLimits(self.client)
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_sheet_workers) as executor:
+                sheet_futures = []
+                if max_sheet_workers > 1:
+                    for sheet, columns in sheets_to_sync:
+                        message_queue = queue.Queue(maxsize=MAX_QUEUED_MESSAGES)
+                        future = executor.submit(self.buffer_sheet_data, message_queue, catalog,
+                                                 sheet, columns, spreadsheet_time_extracted)
+                        sheet_futures.append((message_queue, future))
+
+                try:
+                    sheets_loaded = self.write_sheets(catalog, sheets_to_sync, sheet_futures, spreadsheet_time_extracted)
+                except BaseException:
+                    # Stop the running workers at their next page, their messages are not written
+                    self.run_limits.stop('the sync of the sheets failed')
+                    raise
+                finally:
+                    # Do not start the remaining sheets if a sheet failed
+                    for _, future in sheet_futures:
+                        future.cancel()
+                    # Write the records of a sheet failed or interrupted
+                    RECORD_WRITER.flush()
+        finally:
+            # once the worker threads are done
+            self.close_row_indexes()
+
+        return sheets_loaded
+
+    def write_sheets(self, catalog, sheets_to_sync, sheet_futures, spreadsheet_time_extracted):
+        """
+        Write the messages of the sheets, synced by the worker threads (sheet_futures) or in the current thread,
+            and update the State after each sheet
+        """
+        sheets_loaded = []
+        for i, (sheet, columns) in enumerate(sheets_to_sync):
+            sheet_title = sheet.get('properties', {}).get('title')
+            LOGGER.info('STARTED Syncing Sheet {}'.format(sheet_title))
+            update_currently_syncing(self.state, sheet_title)
+
+            if sheet_futures:
+                # Write the buffered messages of the sheet until the worker is done
+                message_queue, future = sheet_futures[i]
+                for message in iter(message_queue.get, None):
+                    # a checkpoint of the sheet (dict), the line of a RECORD message (str) or a Singer message
+                    if isinstance(message, dict):
+                        self.write_checkpoint(sheet_title, message)
+                    elif isinstance(message, str):
+                        RECORD_WRITER.write(message)
+                    else:
+                        write_message(message)
+                activate_version, row_num, sheet_state = future.result()
+            else:
+                activate_version, row_num, sheet_state = self.sync_sheet_data(
+                    catalog, sheet, columns, spreadsheet_time_extracted)
+
+            # The sheet is complete, the next sync does not resume it
+            self.state.get('checkpoints', {}).pop(sheet_title, None)
+
+            # Unchanged sheet: the records of the last sync are still the current version
+            if activate_version is None:
+                LOGGER.info('SKIPPED Syncing Sheet {}, unchanged since the last sync'.format(sheet_title))
+                update_currently_syncing(self.state, None)
+                continue
+
+            # Update State, the fingerprint of the last sync is replaced or cleared
+            #   (a resumed sync does not compute the fingerprint of the sheet)
+            self.state.get('fingerprints', {}).pop(sheet_title, None)
+            for state_key, value in sheet_state.items():
+                self.state.setdefault(state_key, {})[sheet_title] = value
+            write_bookmark(self.state, sheet_title, activate_version)
+            self.commit_row_index(sheet_title)
+            LOGGER.info('COMPLETE SYNC, Stream: {}, Activate Version: {}'.format(sheet_title, activate_version))
+            LOGGER.info('FINISHED Syncing Sheet {}, Total Rows: {}'.format(
+                sheet_title, row_num - 2)) # subtract 1 for header row
+            update_currently_syncing(self.state, None)
+
+            # SHEETS_LOADED
+            # Add sheet to sheets_loaded
+            sheet_loaded = {}
+            sheet_loaded['spreadsheetId'] = self.spreadsheet_id
+            sheet_loaded['sheetId'] = sheet.get('properties', {}).get('sheetId')
+            sheet_loaded['title'] = sheet_title
+            sheet_loaded['loadDate'] = strftime(utils.now())
+            sheet_loaded['lastRowNumber'] = row_num
+            sheets_loaded.append(sheet_loaded)
+
+        return sheets_loaded
+
+    def get_sheet_columns(self, catalog, sheet, selected_streams):
+        """
+        Get the schema and the columns of the sheet, from the catalog of the selected sheet with the "catalog"
+            sheet_columns config, else from the sheet metadata
+        """
+        sheet_title = sheet.get('properties', {}).get('title')
+        if self.config.get('sheet_columns') == 'catalog' and sheet_title in selected_streams:
+            sheet_schema = catalog.get_stream(sheet_title).schema.to_dict()
+            columns = schema.get_catalog_columns(sheet_schema)
+            if columns:
+                return sheet_schema, columns
+        return schema.get_sheet_metadata(sheet, self.spreadsheet_id, self.client)
+
     def load_data(self, catalog, state, selected_streams, sheets, spreadsheet_time_extracted):
         """
         Load sheet's records if that sheet is selected for sync
         """
         self.state = state
         sheet_metadata = []
-        sheets_loaded = []
+        sheets_to_sync = []
         if sheets:
             # Loop through sheets (worksheet tabs) in spreadsheet
             for sheet in sheets:
                 sheet_title = sheet.get('properties', {}).get('title')
-                sheet_id = sheet.get('properties', {}).get('sheetId')
+
+                # The columns of the unselected sheets are only needed for the "sheet_metadata" records
+                if sheet_title not in selected_streams and 'sheet_metadata' not in selected_streams:
+                    LOGGER.info('SKIPPING Unselected Sheet: {}'.format(sheet_title))
+                    continue
 
                 # GET sheet_metadata and columns
-                sheet_schema, columns = schema.get_sheet_metadata(sheet, self.spreadsheet_id, self.client)
+                sheet_schema, columns = self.get_sheet_columns(catalog, sheet, selected_streams)
                 # LOGGER.info('sheet_schema: {}'.format(sheet_schema))
 
                 # SKIP empty sheets (where sheet_schema and columns are None)
@@ -437,127 +1551,22 @@ class SheetsLoadData(GoogleSheets):
                     # SHEET_DATA
                     # Should this worksheet tab be synced?
                     if sheet_title in selected_streams:
-                        LOGGER.info('STARTED Syncing Sheet {}'.format(sheet_title))
-                        update_currently_syncing(self.state, sheet_title)
-                        selected_fields = get_selected_fields(catalog, sheet_title) # --------------------
-                        LOGGER.info('Stream: {}, selected_fields: {}'.format(sheet_title, selected_fields))
-                        write_schema(catalog, sheet_title)
-
-                        # Emit a Singer ACTIVATE_VERSION message before initial sync (but not subsequent syncs)
-                        # everytime after each sheet sync is complete.
-                        # This forces hard deletes on the data downstream if fewer records are sent.
-                        # https://github.com/singer-io/singer-python/blob/master/singer/messages.py#L137
-                        last_integer = int(get_bookmark(self.state, sheet_title, 0))
-                        activate_version = int(time.time() * 1000)
-                        activate_version_message = singer.ActivateVersionMessage(
-                                stream=sheet_title,
-                                version=activate_version)
-                        if last_integer == 0:
-                            # initial load, send activate_version before AND after data sync
-                            singer.write_message(activate_version_message)
-                            LOGGER.info('INITIAL SYNC, Stream: {}, Activate Version: {}'.format(sheet_title, activate_version))
-
-                        # Determine max range of columns and rows for "paging" through the data
-                        sheet_last_col_index = 1
-                        sheet_last_col_letter = 'A'
-                        for col in columns:
-                            col_index = col.get('columnIndex')
-                            col_letter = col.get('columnLetter')
-                            if col_index > sheet_last_col_index:
-                                sheet_last_col_index = col_index
-                                sheet_last_col_letter = col_letter
-                        sheet_max_row = sheet.get('properties').get('gridProperties', {}).get('rowCount')
-
-                        # Initialize paging for 1st batch
-                        is_last_row = False
-                        batch_rows = 200
-                        from_row = 2
-                        if sheet_max_row < batch_rows:
-                            to_row = sheet_max_row
-                        else:
-                            to_row = batch_rows
-
-                        # Loop thru batches (each having 200 rows of data)
-                        while not is_last_row and from_row < sheet_max_row and to_row <= sheet_max_row:
-                            range_rows = 'A{}:{}{}'.format(from_row, sheet_last_col_letter, to_row)
-
-                            self.params = {
-                                "dateTimeRenderOption": "SERIAL_NUMBER",
-                                "valueRenderOption": "FORMATTED_VALUE",
-                                "majorDimension": "ROWS"
-                            }
-                            # GET sheet_data for a worksheet tab
-                            sheet_data, time_extracted = self.get_data(stream_name=sheet_title, range_rows=range_rows)
-                            # Data is returned as a list of arrays, an array of values for each row
-                            sheet_data_rows = sheet_data.get('values', [])
-                            self.params = {
-                                "dateTimeRenderOption": "SERIAL_NUMBER",
-                                "valueRenderOption": "UNFORMATTED_VALUE",
-                                "majorDimension": "ROWS"
-                            }
-                            unformatted_sheet_data, _ = self.get_data(stream_name=sheet_title, range_rows=range_rows)
-                            unformatted_sheet_data_rows = unformatted_sheet_data.get('values', [])
-
-                            # Transform batch of rows to JSON with keys for each column
-                            sheet_data_transformed, row_num = internal_transform.transform_sheet_data(
-                                spreadsheet_id=self.spreadsheet_id,
-                                sheet_id=sheet_id,
-                                sheet_title=sheet_title,
-                                from_row=from_row,
-                                columns=columns,
-                                sheet_data_rows=sheet_data_rows, 
-                                unformatted_rows = unformatted_sheet_data_rows)
-
-                            # Here row_num is the addition of from_row and total records get in response(per batch).
-                            # Condition row_num < to_row was checking that if records on the current page are less than expected(to_row) or not.
-                            # If the condition returns true then it was breaking the loop.
-                            # API does not return the last empty rows in response.
-                            # For example, rows 199 and 200 are empty, and a total of 400 rows are there in the sheet. So, in 1st iteration,
-                            # to_row = 200, from_row = 2, row_num = 2(from_row) + 197 = 199(1st row contain header value)
-                            # So, the above condition become true and breaks the loop without syncing records from 201 to 400.
-                            # sheet_data_rows is no of records return in the current page. If it's a whole blank page then stop looping.
-                            # So, in the above case, it syncs records 201 to 400 also even if rows 199 and 200 are blank.
-                            # Then when the next batch 401 to 600 is empty, it breaks the loop.
-                            if not sheet_data_rows: # If a whole blank page found, then stop looping.
-                                is_last_row = True
-
-                            # Process records, send batch of records to target
-                            record_count = self.process_records(
-                                catalog=catalog,
-                                stream_name=sheet_title,
-                                records=sheet_data_transformed,
-                                time_extracted=spreadsheet_time_extracted,
-                                version=activate_version)
-                            LOGGER.info('Sheet: {}, records processed: {}'.format(
-                                sheet_title, record_count))
-
-                            # Update paging from/to_row for next batch
-                            from_row = to_row + 1
-                            if to_row + batch_rows > sheet_max_row:
-                                to_row = sheet_max_row
-                            else:
-                                to_row = to_row + batch_rows
-
-                        # End of Stream: Send Activate Version and update State
-                        singer.write_message(activate_version_message)
-                        write_bookmark(self.state, sheet_title, activate_version)
-                        LOGGER.info('COMPLETE SYNC, Stream: {}, Activate Version: {}'.format(sheet_title, activate_version))
-                        LOGGER.info('FINISHED Syncing Sheet {}, Total Rows: {}'.format(
-                            sheet_title, row_num - 2)) # subtract 1 for header row
-                        update_currently_syncing(self.state, None)
-
-                        # SHEETS_LOADED
-                        # Add sheet to sheets_loaded
-                        sheet_loaded = {}
-                        sheet_loaded['spreadsheetId'] = self.spreadsheet_id
-                        sheet_loaded['sheetId'] = sheet_id
-                        sheet_loaded['title'] = sheet_title
-                        sheet_loaded['loadDate'] = strftime(utils.now())
-                        sheet_loaded['lastRowNumber'] = row_num
-                        sheets_loaded.append(sheet_loaded)
+                        sheets_to_sync.append((sheet, columns))
 
+        sheets_loaded = self.sync_sheets(catalog, sheets_to_sync, spreadsheet_time_extracted)
         return sheet_metadata, sheets_loaded
 
+class FileMetadata(GoogleSheets):
+    stream_name = "file_metadata"
+    api = "files"
+    path = "files/{spreadsheet_id}"
+    key_properties = ["id"]
+    replication_method = "FULL_TABLE"
+    params = {
+        "fields": "id,name,version,createdTime,modifiedTime,teamDriveId,driveId,lastModifyingUser",
+        "supportsAllDrives": "true"
+    }
+
 class SheetMetadata(GoogleSheets):
     stream_name = "sheet_metadata"
     api = "sheets"
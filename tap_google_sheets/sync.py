@@ -1,30 +1,32 @@
+import sys
+import json
+import signal
+import hashlib
+import threading
 import singer
-from tap_google_sheets.streams import STREAMS, SheetsLoadData, write_bookmark, strftime
+from tap_google_sheets.streams import STREAMS, SheetsLoadData, FileMetadata, RunLimits, SyncInterrupted, \
+    RECORD_WRITER, RECORD_BUFFER_SIZE, write_state, strftime
 
 LOGGER = singer.get_logger()
 
-def sync(client, config, catalog, state):
+def get_file_version(client, config, catalog):
     """
-    Sync the streams, loop over STREAMS
-        "spreadsheet_metadata" -> get the spreadsheet's metadata
-            - sync the spreadsheet_metadata stream if selected
-            - get the sheets in the spreadsheet and loop over the sheets and sync the sheet's records if selected
-                - create 2 lists containing the data related the sheet's metadata and sheets loaded/synced during the sync
-        "sheets_loaded" & "sheet_metadata" -> get the data lists from the "spreadsheet_metadata" stream and sync the records if selected
+    Get the Drive version and modifiedTime of the spreadsheet, with a hash of the selected streams of the catalog:
+        the sync of the same spreadsheet version with the same selection writes the same records
     """
-    last_stream = singer.get_currently_syncing(state)
-    LOGGER.info("last/currently syncing stream: %s", last_stream)
-
-    selected_streams = []
-    for stream in catalog.get_selected_streams(state):
-        selected_streams.append(stream.stream)
-    LOGGER.info("selected_streams: %s", selected_streams)
-
-    if not selected_streams:
-        # return if no stream is selected
-        LOGGER.info("No stream is selected.")
-        return
+    file_metadata, _ = FileMetadata(client, config.get("spreadsheet_id")).get_data(stream_name=FileMetadata.stream_name)
+    selected_streams = [stream.to_dict() for stream in catalog.get_selected_streams({})]
+    return {
+        "version": file_metadata.get("version"),
+        "modifiedTime": file_metadata.get("modifiedTime"),
+        "catalog_hash": hashlib.sha256(json.dumps(selected_streams, sort_keys=True).encode()).hexdigest()
+    }
 
+def sync_streams(client, config, catalog, state, selected_streams, run_limits):
+    """
+    Sync the selected streams, loop over STREAMS
+        raise SyncInterrupted when the run_limits are reached
+    """
     # loop through main streams
     for stream_name, stream_obj in STREAMS.items():
 
@@ -43,7 +45,8 @@ def sync(client, config, catalog, state):
             # get sheets from the metadata
             sheets = spreadsheet_metadata.get("sheets")
             # class to load sheet's data
-            sheets_load_data = SheetsLoadData(client, config.get("spreadsheet_id"), config.get("start_date"))
+            sheets_load_data = SheetsLoadData(client, config.get("spreadsheet_id"), config.get("start_date"), config)
+            sheets_load_data.run_limits = run_limits
 
             # perform sheet's sync and get sheet's metadata and sheet loaded records for "sheet_metadata" and "sheets_loaded" streams
             sheet_metadata_records, sheets_loaded_records = sheets_load_data.load_data(catalog=catalog,
@@ -60,3 +63,63 @@ def sync(client, config, catalog, state):
                 stream_obj.sync(catalog, state, sheets_loaded_records)
 
         LOGGER.info("FINISHED Syncing: %s", stream_name)
+
+
+def sync(client, config, catalog, state):
+    """
+    Sync the streams, loop over STREAMS
+        "spreadsheet_metadata" -> get the spreadsheet's metadata
+            - sync the spreadsheet_metadata stream if selected
+            - get the sheets in the spreadsheet and loop over the sheets and sync the sheet's records if selected
+                - create 2 lists containing the data related the sheet's metadata and sheets loaded/synced during the sync
+        "sheets_loaded" & "sheet_metadata" -> get the data lists from the "spreadsheet_metadata" stream and sync the records if selected
+    """
+    last_stream = singer.get_currently_syncing(state)
+    LOGGER.info("last/currently syncing stream: %s", last_stream)
+
+    selected_streams = []
+    for stream in catalog.get_selected_streams(state):
+        selected_streams.append(stream.stream)
+    LOGGER.info("selected_streams: %s", selected_streams)
+
+    if not selected_streams:
+        # return if no stream is selected
+        LOGGER.info("No stream is selected.")
+        return
+
+    # skip the sync when the spreadsheet is unchanged since the last complete sync (not interrupted),
+    #   the file version is kept at the top level of the State (not in the bookmarks of the sheets)
+    file_version = None
+    if str(config.get("skip_unchanged_spreadsheet")).lower() == "true":
+        file_version = get_file_version(client, config, catalog)
+        if not last_stream and state.get("file_version") == file_version:
+            LOGGER.info("Spreadsheet unchanged since the last sync, version: %s, SKIPPING sync", file_version["version"])
+            write_state(state)
+            return
+
+    # the RECORD messages are written to stdout in batches of "record_buffer_size" characters (0: one by one)
+    RECORD_WRITER.buffer_size = int(config.get("record_buffer_size", RECORD_BUFFER_SIZE))
+    # stop the sync before the "max_runtime_seconds" or the "max_api_calls", or on SIGTERM, with a resumable State
+    run_limits = RunLimits(client, config.get("max_runtime_seconds"), config.get("max_api_calls"))
+    previous_sigterm_handler = None
+    # signal handlers can only be set in the main thread
+    if threading.current_thread() is threading.main_thread():
+        previous_sigterm_handler = signal.signal(
+            signal.SIGTERM, lambda signum, frame: run_limits.stop("SIGTERM received"))
+    try:
+        sync_streams(client, config, catalog, state, selected_streams, run_limits)
+    except SyncInterrupted as err:
+        # the completed sheets are bookmarked and the interrupted sheet is checkpointed: the next sync resumes it
+        LOGGER.warning("Sync interrupted (%s): %s, writing the State", run_limits.reason, err)
+        write_state(state)
+        sys.stdout.flush()
+        return
+    finally:
+        RECORD_WRITER.flush()
+        if previous_sigterm_handler is not None:
+            signal.signal(signal.SIGTERM, previous_sigterm_handler)
+
+    if file_version:
+        state["file_version"] = file_version
+        LOGGER.info("Write state for file version: %s", file_version)
+        write_state(state)
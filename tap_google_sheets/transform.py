@@ -1,12 +1,33 @@
+import re
 import math
 import json
-from datetime import datetime, timedelta
+import decimal
+import functools
+from datetime import date, datetime, timedelta
 import pytz
 import singer
 from singer.utils import strftime
 
 LOGGER = singer.get_logger()
 
+SEC_PER_DAY = 86400
+EXCEL_EPOCH = 25569 # 1970-01-01T00:00:00Z, Lotus Notes Serial Number for Epoch Start Date
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+# Number of datetime strings memoized by serial number (the dates repeat in the date columns)
+DATETIME_CACHE_SIZE = 65536
+# Strings of the boolValue cells converted to True or False
+TRUE_STRINGS = ('true', 't', 'yes', 'y')
+FALSE_STRINGS = ('false', 'f', 'no', 'n')
+# As the float and the int values would be now returned as string itself, we need to check for the special
+# values as a string match rather than the integer/float match
+TRUE_NUMBER_STRINGS = ('1', '-1', '1.00', '-1.00')
+FALSE_NUMBER_STRINGS = ('0', '0.00')
+# Datetime strings returned unchanged by the date-time format of the singer Transformer (strftime of strptime_to_utc):
+#   a valid datetime is formatted to the same string, an invalid one is kept as a string by the string subschema
+DATETIME_STRING_RE = re.compile(r'\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])T([01]\d|2[0-3]):[0-5]\d:[0-5]\d\.\d{6}Z')
+# Value or record not projected, the record is transformed by the singer Transformer
+NOT_PROJECTED = object()
+
 # Tranform spreadsheet_metadata: add spreadsheetId, sheetUrl, and columns metadata
 def transform_sheet_metadata(spreadsheet_id, sheet, columns):
     # Convert to properties to dict
@@ -33,15 +54,118 @@ def transform_spreadsheet_metadata(spreadsheet_metadata):
     spreadsheet_metadata_arr.append(spreadsheet_metadata_tf)
     return spreadsheet_metadata_arr
 
+# Transform grid data (spreadsheets.get w/ includeGridData) to the rows returned by spreadsheets.values
+#   formatted rows: formattedValue of each cell, like valueRenderOption = FORMATTED_VALUE
+#   unformatted rows: effectiveValue of each cell, like valueRenderOption = UNFORMATTED_VALUE
+# Like spreadsheets.values, empty cells are returned as '' and trailing empty cells and rows are removed
+def transform_grid_data_rows(grid_data):
+    sheet_data_rows = []
+    unformatted_rows = []
+    for row_data in grid_data.get('rowData', []):
+        row = []
+        unformatted_row = []
+        for cell in row_data.get('values', []):
+            formatted_value = cell.get('formattedValue', '')
+            effective_value = cell.get('effectiveValue', {})
+            # effectiveValue has a single key: numberValue, stringValue, boolValue or errorValue
+            # Error cells are rendered as their error string (ie. #DIV/0!) in both value render options
+            if not effective_value or 'errorValue' in effective_value:
+                unformatted_value = formatted_value
+            else:
+                unformatted_value = next(iter(effective_value.values()))
+            row.append(formatted_value)
+            unformatted_row.append(unformatted_value)
+        while row and row[-1] == '' and unformatted_row[-1] == '':
+            row.pop()
+            unformatted_row.pop()
+        sheet_data_rows.append(row)
+        unformatted_rows.append(unformatted_row)
+    while sheet_data_rows and sheet_data_rows[-1] == []:
+        sheet_data_rows.pop()
+        unformatted_rows.pop()
+    return sheet_data_rows, unformatted_rows
+
+# Merge the rows of column blocks (first_col_index, block_rows) into rows of the whole range
+#   the cells of the columns not in a block are None
+def merge_column_blocks(column_blocks):
+    rows = []
+    for first_col_index, block_rows in column_blocks:
+        for row_index, block_row in enumerate(block_rows):
+            if row_index >= len(rows):
+                rows.extend([] for _ in range(row_index + 1 - len(rows)))
+            row = rows[row_index]
+            last_col_index = first_col_index - 1 + len(block_row)
+            if len(row) < last_col_index:
+                row.extend([None] * (last_col_index - len(row)))
+            row[first_col_index - 1:last_col_index] = block_row
+    return rows
+
+# Transform the column blocks of a page, requested with a single value render option each (spreadsheets.values:batchGet),
+# to the rows returned by spreadsheets.values for the whole range with both value render options
+#   the cell of a column not requested with a value render option takes the value of the other render option
+# Like spreadsheets.values, empty cells are returned as '' and trailing empty cells and rows are removed
+def transform_column_blocks_rows(formatted_blocks, unformatted_blocks):
+    formatted_rows = merge_column_blocks(formatted_blocks)
+    unformatted_rows = merge_column_blocks(unformatted_blocks)
+    sheet_data_rows = []
+    unformatted_sheet_data_rows = []
+    for row_index in range(max(len(formatted_rows), len(unformatted_rows))):
+        formatted_row = formatted_rows[row_index] if row_index < len(formatted_rows) else []
+        unformatted_row = unformatted_rows[row_index] if row_index < len(unformatted_rows) else []
+        row = []
+        unformatted_sheet_data_row = []
+        for col_index in range(max(len(formatted_row), len(unformatted_row))):
+            value = formatted_row[col_index] if col_index < len(formatted_row) else None
+            unformatted_value = unformatted_row[col_index] if col_index < len(unformatted_row) else None
+            if value is None:
+                value = '' if unformatted_value is None else str(unformatted_value)
+            if unformatted_value is None:
+                unformatted_value = value
+            row.append(value)
+            unformatted_sheet_data_row.append(unformatted_value)
+        while row and row[-1] == '' and unformatted_sheet_data_row[-1] == '':
+            row.pop()
+            unformatted_sheet_data_row.pop()
+        sheet_data_rows.append(row)
+        unformatted_sheet_data_rows.append(unformatted_sheet_data_row)
+    while sheet_data_rows and sheet_data_rows[-1] == []:
+        sheet_data_rows.pop()
+        unformatted_sheet_data_rows.pop()
+    return sheet_data_rows, unformatted_sheet_data_rows
+
+# Get the pytz timezone of timezone_str, resolved once
+@functools.lru_cache(maxsize=None)
+def get_timezone(timezone_str):
+    return pytz.timezone(timezone_str)
+
+# Convert Excel Date Serial Number (excel_date_sn) of a UTC datetime to datetime string, without timezone conversion
+#   None for the out of range values (before year 1 or after year 9999)
+@functools.lru_cache(maxsize=DATETIME_CACHE_SIZE)
+def excel_to_utc_dttm_str(excel_date_sn):
+    epoch_sec = math.floor((excel_date_sn - EXCEL_EPOCH) * SEC_PER_DAY)
+    epoch_days, day_sec = divmod(epoch_sec, SEC_PER_DAY)
+    ordinal = EPOCH_ORDINAL + epoch_days
+    if ordinal < 1 or ordinal > date.max.toordinal():
+        return None
+    dttm_date = date.fromordinal(ordinal)
+    hours, hour_sec = divmod(day_sec, 3600)
+    minutes, seconds = divmod(hour_sec, 60)
+    # Like singer strftime of the datetime (no microseconds, the seconds are floored)
+    return '{:04d}-{:02d}-{:02d}T{:02d}:{:02d}:{:02d}.000000Z'.format(
+        dttm_date.year, dttm_date.month, dttm_date.day, hours, minutes, seconds)
+
 # Convert Excel Date Serial Number (excel_date_sn) to datetime string
 # timezone_str: defaults to UTC (which we assume is the timezone for ALL datetimes)
 def excel_to_dttm_str(string_value, excel_date_sn, timezone_str=None):
-    if not timezone_str:
-        timezone_str = 'UTC'
-    tzn = pytz.timezone(timezone_str)
-    sec_per_day = 86400
-    excel_epoch = 25569 # 1970-01-01T00:00:00Z, Lotus Notes Serial Number for Epoch Start Date
-    epoch_sec = math.floor((excel_date_sn - excel_epoch) * sec_per_day)
+    if not timezone_str or timezone_str == 'UTC':
+        utc_dttm_str = excel_to_utc_dttm_str(excel_date_sn)
+        # For out of range values, return the string value as passed in the sheets without any conversion
+        if utc_dttm_str is None:
+            return str(string_value), True
+        return utc_dttm_str, False
+
+    tzn = get_timezone(timezone_str)
+    epoch_sec = math.floor((excel_date_sn - EXCEL_EPOCH) * SEC_PER_DAY)
     epoch_dttm = datetime(1970, 1, 1)
     # For out of range values, it will throw OverflowError and it would return the string value
     # as passed in the sheets without any conversion
@@ -81,22 +205,21 @@ def transform_sheet_time_data(value, unformatted_value, sheet_title, col_name, c
     else:
         return str(value)
 
+# Get the boolean value of a string, None if the string is not a boolean
+def get_boolean_string_value(value):
+    if value.lower() in TRUE_STRINGS or value in TRUE_NUMBER_STRINGS:
+        return True
+    elif value.lower() in FALSE_STRINGS or value in FALSE_NUMBER_STRINGS:
+        return False
+    return None
+
 # transform boolean values in the sheet
 def transform_sheet_boolean_data(value, unformatted_value, sheet_title, col_name, col_letter, col_type, row):
     if isinstance(value, bool):
         return unformatted_value
     elif isinstance(value, str):
-        if value.lower() in ('true', 't', 'yes', 'y'):
-            col_val = True
-        elif value.lower() in ('false', 'f', 'no', 'n'):
-            col_val = False
-        # As the float and the int values would be now returned as string itself, we need to check for the special
-        # values as a string match rather than the integer/float match
-        elif value in ('1', '-1', '1.00', '-1.00'):
-            col_val = True
-        elif value in ('0', '0.00'):
-            col_val = False
-        else:
+        col_val = get_boolean_string_value(value)
+        if col_val is None:
             col_val = str(value)
             LOGGER.info('WARNING: POSSIBLE DATA TYPE ERROR; SHEET: {}, COL: {}, CELL: {}{}, TYPE: {}'.format(
                 sheet_title, col_name, col_letter, row, col_type))
@@ -195,44 +318,83 @@ def transform_sheet_number_data(formatted_value, unformatted_value, sheet_title,
 
 # return transformed column the values based on the datatype
 def get_column_value(value, unformatted_value, sheet_title, col_name, col_letter, row_num, col_type, row):
-        # NULL values
+    # NULL values
     if value is None or value == '':
         return None
+    return get_column_converter(sheet_title, col_name, col_letter, col_type)(value, unformatted_value, row_num, row)
 
-    # Convert dates/times from Lotus Notes Serial Numbers
+# Get the converter of a column: function(value, unformatted_value, row_num, row) returning the column value
+#   of a cell not empty, like get_column_value with the column type resolved once
+def get_column_converter(sheet_title, col_name, col_letter, col_type):
     # DATE-TIME
-    elif col_type == 'numberType.DATE_TIME':
-        return transform_sheet_datetime_data(value, unformatted_value, sheet_title, col_name, col_letter, row_num, col_type)
-
+    if col_type == 'numberType.DATE_TIME':
+        def convert(value, unformatted_value, row_num, row):
+            return transform_sheet_datetime_data(value, unformatted_value, sheet_title, col_name, col_letter, row_num, col_type)
     # TIME ONLY (NO DATE)
     elif col_type == 'numberType.TIME':
-        return transform_sheet_time_data(value, unformatted_value, sheet_title, col_name, col_letter, row_num, col_type)
-
+        def convert(value, unformatted_value, row_num, row):
+            return transform_sheet_time_data(value, unformatted_value, sheet_title, col_name, col_letter, row_num, col_type)
     # NUMBER (INTEGER AND FLOAT)
     elif col_type == 'numberType':
-        return transform_sheet_number_data(value, unformatted_value, sheet_title, col_name, col_letter, row_num, col_type)
-
+        def convert(value, unformatted_value, row_num, row):
+            return transform_sheet_number_data(value, unformatted_value, sheet_title, col_name, col_letter, row_num, col_type)
     # STRING
     elif col_type == 'stringValue':
-        return str(value)
-
+        def convert(value, unformatted_value, row_num, row):
+            return str(value)
     # BOOLEAN
     elif col_type == 'boolValue':
-        return transform_sheet_boolean_data(value, unformatted_value, sheet_title, col_name, col_letter, col_type, row)
-
+        def convert(value, unformatted_value, row_num, row):
+            return transform_sheet_boolean_data(value, unformatted_value, sheet_title, col_name, col_letter, col_type, row)
     # OTHER: Convert everything else to a string
     else:
-        LOGGER.info('WARNING: POSSIBLE DATA TYPE ERROR; SHEET: {}, COL: {}, CELL: {}{}, TYPE: {}'.format(
-            sheet_title, col_name, col_letter, row, col_type))
-        return str(value)
+        def convert(value, unformatted_value, row_num, row):
+            LOGGER.info('WARNING: POSSIBLE DATA TYPE ERROR; SHEET: {}, COL: {}, CELL: {}{}, TYPE: {}'.format(
+                sheet_title, col_name, col_letter, row, col_type))
+            return str(value)
+    return convert
+
+# Compile the transform plan of a sheet, once for all its pages: a tuple indexed by the position of the columns
+#   (sorted by columnIndex) of (column name, converter, column type), or None for the skipped columns
+#  selected_columns: names of the columns to transform (the other columns are skipped), all the columns if None
+def get_transform_plan(sheet_title, columns, selected_columns=None):
+    transform_plan = []
+    for col in sorted(columns, key=lambda i: i['columnIndex']):
+        col_name = col.get('columnName')
+        if col.get('columnSkipped') or (selected_columns is not None and col_name not in selected_columns):
+            transform_plan.append(None)
+        else:
+            col_type = col.get('columnType')
+            transform_plan.append((col_name, get_column_converter(
+                sheet_title, col_name, col.get('columnLetter'), col_type), col_type))
+    return tuple(transform_plan)
+
+# Add the key of a record (values of the key_columns) to the row_keys of the sheet,
+#  a blank key or a duplicate key raises an error naming the row
+def add_row_key(sheet_title, key_columns, record, row_num, row_keys):
+    row_key = tuple(record.get(key_column) for key_column in key_columns)
+    if None in row_key:
+        raise Exception('NULL KEY ERROR: SHEET: {}, KEY: {}, ROW: {}'.format(
+            sheet_title, dict(zip(key_columns, row_key)), row_num))
+    if row_key in row_keys:
+        raise Exception('DUPLICATE KEY ERROR: SHEET: {}, KEY: {}, ROW: {}'.format(
+            sheet_title, dict(zip(key_columns, row_key)), row_num))
+    row_keys.add(row_key)
 
 # Transform sheet_data: add spreadsheet_id, sheet_id, and row, convert dates/times
 #  Convert from array of values to JSON with column names as keys
-def transform_sheet_data(spreadsheet_id, sheet_id, sheet_title, from_row, columns, sheet_data_rows, unformatted_rows):
+#  selected_columns: names of the columns to transform (the other columns are skipped), all the columns if None
+#  key_columns: names of the columns identifying the rows, row_keys: set of the keys of the rows of the previous pages,
+#   a blank or duplicate key raises an error (add_row_key)
+#  transform_plan: plan of the sheet (get_transform_plan), compiled from the columns and selected_columns if None
+def transform_sheet_data(spreadsheet_id, sheet_id, sheet_title, from_row, columns, sheet_data_rows, unformatted_rows,
+                         selected_columns=None, key_columns=None, row_keys=None, transform_plan=None):
     sheet_data_tf = []
+    if row_keys is None:
+        row_keys = set()
     row_num = from_row
-    # Create sorted list of columns based on columnIndex
-    cols = sorted(columns, key=lambda i: i['columnIndex'])
+    if transform_plan is None:
+        transform_plan = get_transform_plan(sheet_title, columns, selected_columns)
 
     for (row, unformatted_row) in zip(sheet_data_rows, unformatted_rows):
         # If empty row, SKIP
@@ -244,23 +406,132 @@ def transform_sheet_data(spreadsheet_id, sheet_id, sheet_title, from_row, column
             sheet_data_row_tf['__sdc_spreadsheet_id'] = spreadsheet_id
             sheet_data_row_tf['__sdc_sheet_id'] = sheet_id
             sheet_data_row_tf['__sdc_row'] = row_num
-            col_num = 1
-            for (value, unformatted_value) in zip(row, unformatted_row):
-                # Select column metadata based on column index
-                col = cols[col_num - 1]
-                col_skipped = col.get('columnSkipped')
-                if not col_skipped:
-                    # Get column metadata
-                    col_name = col.get('columnName')
-                    col_type = col.get('columnType')
-                    col_letter = col.get('columnLetter')
-
-                    # get column value based on the type of the value
-                    col_val = get_column_value(value, unformatted_value, sheet_title, col_name, col_letter, row_num, col_type, row)
-
-                    sheet_data_row_tf[col_name] = col_val
-                col_num = col_num + 1
+            for col_position, (value, unformatted_value) in enumerate(zip(row, unformatted_row)):
+                # Select column plan based on column position
+                col_plan = transform_plan[col_position]
+                if col_plan is not None:
+                    col_name, convert, _ = col_plan
+                    # NULL values
+                    if value is None or value == '':
+                        sheet_data_row_tf[col_name] = None
+                    else:
+                        sheet_data_row_tf[col_name] = convert(value, unformatted_value, row_num, row)
+            if key_columns:
+                add_row_key(sheet_title, key_columns, sheet_data_row_tf, row_num, row_keys)
             # APPEND non-empty row
             sheet_data_tf.append(sheet_data_row_tf)
         row_num = row_num + 1
     return sheet_data_tf, row_num
+
+
+# Project the values of the ['null', 'string'] fields and of the 'time' fields (no format in the Transformer)
+def project_string_value(value):
+    if value is None or type(value) is str:
+        return value
+    return NOT_PROJECTED
+
+# Project the values of the ['null', 'integer'] fields (__sdc_sheet_id, __sdc_row)
+def project_integer_value(value):
+    if value is None or type(value) is int:
+        return value
+    return NOT_PROJECTED
+
+# Project the values of the ['null', 'boolean', 'string'] fields (boolValue): the booleans, None and the strings
+#   are unchanged, like the boolean type of the Transformer (streams.new_transform)
+def project_boolean_value(value):
+    if value is None or type(value) is bool or type(value) is str:
+        return value
+    return NOT_PROJECTED
+
+# Project the values of the date-time fields (anyOf date-time or string): the datetime strings of the sheets are unchanged
+def project_datetime_value(value):
+    if value is None or value == '':
+        return None
+    if type(value) is str and DATETIME_STRING_RE.fullmatch(value):
+        return value
+    return NOT_PROJECTED
+
+# Project the values of the ['null', 'string'] date-time fields (_sdc_deleted_at): an invalid datetime is an error,
+#   the datetimes are validated by the Transformer
+def project_null_datetime_value(value):
+    if value is None or value == '':
+        return None
+    return NOT_PROJECTED
+
+# Project the values of the singer.decimal fields (numberType): the decimal string of the numbers,
+#   the strings not a decimal are kept by the string subschema
+def project_decimal_value(value):
+    if value is None or value == '':
+        return None
+    value_type = type(value)
+    if value_type is int or value_type is float or value_type is str:
+        try:
+            return str(decimal.Decimal(str(value)))
+        except (ArithmeticError, ValueError):
+            return value if value_type is str else NOT_PROJECTED
+    return NOT_PROJECTED
+
+# Get the projector of the values of a field schema generated by the discovery of the sheets, None for other schemas
+def get_value_projector(field_schema):
+    field_schema = {key: value for key, value in field_schema.items() if key != 'description'}
+    string_types = (['null', 'string'], ['string', 'null'])
+    if 'anyOf' in field_schema:
+        subschemas = field_schema['anyOf']
+        if len(field_schema) == 1 and len(subschemas) == 2 and subschemas[1].get('type') in string_types \
+                and len(subschemas[1]) == 1 and subschemas[0].get('type') in string_types and len(subschemas[0]) == 2:
+            return {
+                'date-time': project_datetime_value,
+                'time': project_string_value,
+                'singer.decimal': project_decimal_value
+            }.get(subschemas[0].get('format'))
+        return None
+    field_type = field_schema.get('type')
+    field_format = field_schema.get('format')
+    if len(field_schema) != (1 if field_format is None else 2) or not isinstance(field_type, list):
+        return None
+    if field_type in string_types:
+        return {None: project_string_value, 'date-time': project_null_datetime_value}.get(field_format)
+    if field_format is not None:
+        return None
+    if field_type in (['null', 'integer'], ['integer', 'null']):
+        return project_integer_value
+    if [typ for typ in field_type if typ != 'null'] == ['boolean', 'string'] and len(field_type) == 3:
+        return project_boolean_value
+    return None
+
+# Record projector of the streams not projected: the records are transformed by the singer Transformer
+def project_no_record(record):
+    return NOT_PROJECTED
+
+# Get the record projector of a sheet stream, compiled once from its schema and metadata: function(record) returning
+#   the record transformed like singer Transformer().transform(record, schema, stream_metadata), with the fields
+#   not selected or not in the schema removed, or NOT_PROJECTED if a value is not projected (transform it with the Transformer)
+#  None if a field schema was not generated by the discovery of the sheets
+def get_record_projector(schema, stream_metadata):
+    properties = schema.get('properties')
+    if schema.get('type') not in ('object', ['object']) or not properties or \
+            set(schema) - {'type', 'properties', 'additionalProperties'}:
+        return None
+    value_projectors = {}
+    for field_name, field_schema in properties.items():
+        if stream_metadata:
+            field_metadata = stream_metadata.get(('properties', field_name), {})
+            if field_metadata.get('inclusion') != 'automatic' and \
+                    (field_metadata.get('selected') is False or field_metadata.get('inclusion') == 'unsupported'):
+                continue
+        project_value = get_value_projector(field_schema)
+        if project_value is None:
+            return None
+        value_projectors[field_name] = project_value
+
+    def project_record(record):
+        projected_record = {}
+        for field_name, value in record.items():
+            project_value = value_projectors.get(field_name)
+            if project_value is not None:
+                value = project_value(value)
+                if value is NOT_PROJECTED:
+                    return NOT_PROJECTED
+                projected_record[field_name] = value
+        return projected_record
+    return project_record
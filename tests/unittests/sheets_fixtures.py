@@ -0,0 +1,50 @@
+import io
+import json
+from unittest import mock
+from singer.catalog import Catalog, CatalogEntry, Schema
+
+def get_sheet_schema(column_names):
+    """Return the json schema of a sheet with string columns"""
+    properties = {'__sdc_spreadsheet_id': {'type': ['null', 'string']}, '__sdc_sheet_id': {'type': ['null', 'integer']},
+                  '__sdc_row': {'type': ['null', 'integer']}}
+    properties.update({column_name: {'type': ['null', 'string']} for column_name in column_names})
+    return {'type': 'object', 'additionalProperties': False, 'properties': properties}
+
+def get_columns(column_names):
+    """Return the string columns of a sheet, from column A"""
+    return [{'columnIndex': i, 'columnLetter': chr(64 + i), 'columnName': column_name, 'columnType': 'stringValue',
+             'columnSkipped': False} for i, column_name in enumerate(column_names, 1)]
+
+def get_sheets(sheet_count, row_count, column_count=1):
+    """Return the sheets Sheet1 to Sheet{sheet_count} of the spreadsheet metadata"""
+    return [{"properties": {"sheetId": i, "title": "Sheet{}".format(i),
+                            "gridProperties": {"rowCount": row_count, "columnCount": column_count}}}
+            for i in range(1, sheet_count + 1)]
+
+def get_catalog(sheets, sheet_schema, mdata=None, key_properties=None):
+    """Return the catalog of the sheets, with the same schema and metadata"""
+    return Catalog([CatalogEntry(stream=sheet['properties']['title'], tap_stream_id=sheet['properties']['title'],
+                                 key_properties=key_properties or ['__sdc_row'], schema=Schema.from_dict(sheet_schema),
+                                 metadata=mdata or []) for sheet in sheets])
+
+# A sheet with a single "name" column
+sheet_schema = get_sheet_schema(['name'])
+columns = get_columns(['name'])
+
+def load_data(sheets_load_data, catalog, state, sheets, get_pages_data, sheet_metadata=(sheet_schema, columns),
+              expected_errors=()):
+    """
+    Sync the sheets with the pages of get_pages_data and the sheet_metadata (json schema and columns) of each sheet,
+        the expected errors are ignored
+    Return the messages written to stdout and the sheets loaded (None if an expected error was raised)
+    """
+    sheets_loaded = None
+    with mock.patch('sys.stdout', new_callable=io.StringIO) as mocked_stdout, \
+         mock.patch('tap_google_sheets.streams.SheetsLoadData.get_pages_data', side_effect = get_pages_data), \
+         mock.patch('tap_google_sheets.streams.schema.get_sheet_metadata', return_value = list(sheet_metadata)):
+        try:
+            _, sheets_loaded = sheets_load_data.load_data(
+                catalog, state, [sheet['properties']['title'] for sheet in sheets], sheets, None)
+        except expected_errors:
+            pass
+    return [json.loads(line) for line in mocked_stdout.getvalue().splitlines()], sheets_loaded
@@ -0,0 +1,109 @@
+import unittest
+from unittest import mock
+from tap_google_sheets.client import GoogleClient, AdaptiveConcurrencyLimiter, Server429Error
+from tap_google_sheets.streams import SheetsLoadData, get_page_ranges
+
+class MockedClock:
+    """Clock advancing only when set"""
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+class TestAdaptiveConcurrencyLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = MockedClock()
+        patcher = mock.patch('tap_google_sheets.client.time.monotonic', side_effect=self.clock.monotonic)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def send_requests(self, limiter, count, latency=1.0, throttled=False):
+        started_at = [limiter.acquire() for _ in range(count)]
+        self.clock.now += latency
+        for start in started_at:
+            limiter.release(start, throttled)
+
+    def test_additive_increase(self):
+        """
+        Verify that the limit grows by about 1 for every "limit" successful responses, up to the max limit
+        """
+        limiter = AdaptiveConcurrencyLimiter(4)
+        self.assertEqual(limiter.limit, 1)
+        self.send_requests(limiter, 1)
+        self.assertEqual(limiter.limit, 2)
+        self.send_requests(limiter, 2)
+        self.send_requests(limiter, 1)
+        self.assertEqual(limiter.limit, 3)
+        for _ in range(10):
+            self.send_requests(limiter, limiter.limit)
+        self.assertEqual(limiter.limit, 4)
+
+    def test_multiplicative_decrease_on_429(self):
+        """
+        Verify that the limit is halved once for the requests in flight when 429 responses are received
+        """
+        limiter = AdaptiveConcurrencyLimiter(16)
+        limiter.current_limit = 8.0
+        self.send_requests(limiter, 8, throttled=True)
+        self.assertEqual(limiter.limit, 4)
+        self.send_requests(limiter, 4, throttled=True)
+        self.assertEqual(limiter.limit, 2)
+        self.send_requests(limiter, 2, throttled=True)
+        self.send_requests(limiter, 1, throttled=True)
+        # the limit is never lower than 1
+        self.assertEqual(limiter.limit, 1)
+
+    def test_decrease_on_latency_spike(self):
+        """
+        Verify that the limit is halved when the latency is above twice its moving average
+        """
+        limiter = AdaptiveConcurrencyLimiter(16)
+        limiter.current_limit = 8.0
+        self.send_requests(limiter, 1, latency=1.0)
+        self.send_requests(limiter, 1, latency=1.5)
+        self.assertEqual(limiter.limit, 8)
+        self.send_requests(limiter, 1, latency=5.0)
+        self.assertEqual(limiter.limit, 4)
+
+class TestClientConcurrency(unittest.TestCase):
+    def test_no_limiter_by_default(self):
+        """
+        Verify that the concurrency is adapted only if max_concurrent_requests is greater than 1
+        """
+        client = GoogleClient("dummy_client_id", "dummy_client_secret", "dummy_refresh_token", 300)
+        self.assertIsNone(client.concurrency_limiter)
+        client = GoogleClient("dummy_client_id", "dummy_client_secret", "dummy_refresh_token", 300, None, None, None, "8")
+        self.assertEqual(client.concurrency_limiter.max_limit, 8)
+
+    @mock.patch('tap_google_sheets.client.requests.Session.request')
+    @mock.patch('tap_google_sheets.client.GoogleClient.get_access_token')
+    def test_429_response_decreases_limit(self, mock_get_token, mock_request):
+        """
+        Verify that the limit is decreased by the 429 responses of the retried request
+        """
+        mock_request.return_value.status_code = 429
+        mock_request.return_value.json.return_value = {}
+        client = GoogleClient("dummy_client_id", "dummy_client_secret", "dummy_refresh_token", 300, None, None, None, 8)
+        client.concurrency_limiter.current_limit = 8.0
+        # skip the backoff waits
+        with mock.patch('tap_google_sheets.client.time.sleep'):
+            with self.assertRaises(Server429Error):
+                client.request("GET", "dummy_path")
+        self.assertEqual(client.concurrency_limiter.limit, 1)
+        self.assertEqual(client.concurrency_limiter.in_flight, 0)
+
+    @mock.patch('tap_google_sheets.streams.SheetsLoadData.get_pages_data', return_value=[([['a']], [['a']])])
+    def test_prefetch_limited_by_concurrency(self, mocked_get_pages_data):
+        """
+        Verify that the pages prefetched are limited by the current concurrency limit of the client
+        """
+        client = GoogleClient("dummy_client_id", "dummy_client_secret", "dummy_refresh_token", 300, None, None, None, 8)
+        sheets_load_data = SheetsLoadData(client, "id", config={"max_concurrent_requests": 8})
+        self.assertEqual(sheets_load_data.get_concurrency_limit(8), 1)
+        client.concurrency_limiter.current_limit = 3.0
+        self.assertEqual(sheets_load_data.get_concurrency_limit(8), 3)
+        self.assertEqual(sheets_load_data.get_concurrency_limit(2), 2)
+
+        pages = list(sheets_load_data.get_pages("Sheet1", "A", get_page_ranges(1000), 1))
+        self.assertEqual([from_row for from_row, _, _ in pages], [from_row for from_row, _ in get_page_ranges(1000)])
@@ -0,0 +1,82 @@
+import unittest
+from unittest import mock
+from tap_google_sheets.streams import SheetsLoadData, get_page_ranges
+from tap_google_sheets.client import GoogleClient
+
+sheet_schema = {'type': 'object', 'additionalProperties': False, 'properties': {'__sdc_spreadsheet_id': {'type': ['null', 'string']}, '__sdc_sheet_id': {'type': ['null', 'integer']}, '__sdc_row': {'type': ['null', 'integer']}, 'name': {'type': ['null', 'string']}, 'value': {'type': ['null', 'string']}}}
+columns = [{'columnIndex': 1, 'columnLetter': 'A', 'columnName': 'name', 'columnType': 'stringValue', 'columnSkipped': False}, {'columnIndex': 2, 'columnLetter': 'B', 'columnName': 'value', 'columnType': 'stringValue', 'columnSkipped': False}]
+sheets = [{
+    "properties": {
+        "sheetId": 1260142713,
+        "title": "Sheet13",
+        "gridProperties": {
+            "rowCount": 1000,
+            "columnCount": 2
+        }
+    }
+}]
+
+def get_batch_data(path, api, params, endpoint):
+    """Return the values of the 1st and 3rd requested ranges, the 2nd range has a single row and the 4th is blank"""
+    return {
+        "valueRanges": [
+            {"range": "'Sheet13'!A2:B200", "values": [["a", "1"], ["b", "2"]]},
+            {"range": "'Sheet13'!A201:B400", "values": [["c", "3"]]},
+            {"range": "'Sheet13'!A401:B600", "values": [["d", "4"]]},
+            {"range": "'Sheet13'!A601:B800"}
+        ]
+    }
+
+class TestBatchGetPaging(unittest.TestCase):
+    @mock.patch('tap_google_sheets.streams.get_key_properties', return_value = ['__sdc_row'])
+    @mock.patch('tap_google_sheets.streams.get_replication_method', return_value = 'FULL_TABLE')
+    @mock.patch('tap_google_sheets.client.GoogleClient.get', side_effect = get_batch_data)
+    @mock.patch('tap_google_sheets.streams.schema.get_sheet_metadata', return_value = [sheet_schema, columns])
+    @mock.patch('tap_google_sheets.streams.get_selected_fields', return_value = [])
+    @mock.patch('tap_google_sheets.streams.write_schema')
+    @mock.patch('tap_google_sheets.streams.GoogleSheets.process_records')
+    def test_batch_get_pages(self, mock_process_records, mock_write_schema, mocked_get_selected_fields, mocked_sheet_metadata, mocked_get, mocked_replication_method, mocked_key_properties):
+        """
+        Verify that multiple pages are requested with 1 batchGet call for each value render option
+            and the result is split into a batch of records for each page, up to the first blank page
+        """
+        config = {
+            "spreadsheet_id": "id",
+            "start_date": "2019-01-01T00:00:00Z",
+            "max_cells_per_request": 1600
+        }
+        client = GoogleClient("dummy_client_id", "dummy_client_secret", "dummy_refresh_token", 300)
+        sheets_load_data = SheetsLoadData(client, config.get("spreadsheet_id"), config.get("start_date"), config)
+        _, sheets_loaded = sheets_load_data.load_data({}, {}, ["Sheet13"], sheets, "time")
+
+        # 1600 cells / (200 rows * 2 columns) = 4 pages per request
+        ranges = "ranges='Sheet13'!A2:B200&ranges='Sheet13'!A201:B400&ranges='Sheet13'!A401:B600&ranges='Sheet13'!A601:B800"
+        self.assertEqual(mocked_get.call_count, 2)
+        self.assertEqual(mock.call(api='sheets', endpoint='Sheet13', params='dateTimeRenderOption=SERIAL_NUMBER&valueRenderOption=FORMATTED_VALUE&majorDimension=ROWS&' + ranges, path="spreadsheets/id/values:batchGet"), mocked_get.mock_calls[0])
+        self.assertEqual(mock.call(api='sheets', endpoint='Sheet13', params='dateTimeRenderOption=SERIAL_NUMBER&valueRenderOption=UNFORMATTED_VALUE&majorDimension=ROWS&' + ranges, path="spreadsheets/id/values:batchGet"), mocked_get.mock_calls[1])
+
+        # Verify a batch of records is processed for each page, including the blank page
+        pages_rows = [[record['__sdc_row'] for record in call.kwargs['records']] for call in mock_process_records.call_args_list]
+        self.assertEqual(pages_rows, [[2, 3], [201], [401], []])
+        self.assertEqual(sheets_loaded[0]['lastRowNumber'], 601)
+
+    def test_get_page_ranges(self):
+        """
+        Verify the pages of rows of a sheet
+        """
+        self.assertEqual(get_page_ranges(100), [(2, 100)])
+        self.assertEqual(get_page_ranges(450), [(2, 200), (201, 400), (401, 450)])
+        self.assertEqual(get_page_ranges(401), [(2, 200), (201, 400), (401, 401)])
+        self.assertEqual(get_page_ranges(2), [(2, 2)])
+        self.assertEqual(get_page_ranges(1), [])
+
+    def test_pages_per_request_url_length(self):
+        """
+        Verify that the pages of a request are bounded by the length of the URL encoded ranges of a long sheet title
+        """
+        sheets_load_data = SheetsLoadData(None, "id", config={"max_cells_per_request": 10000000})
+        self.assertEqual(sheets_load_data.get_pages_per_request("Sheet13", 2), 100)
+        # Each non-ASCII character is URL encoded with 6 characters: 8000 // 394 characters per range = 20 ranges
+        self.assertEqual(sheets_load_data.get_pages_per_request("é" * 60, 2), 20)
+        self.assertEqual(sheets_load_data.get_pages_per_request("é" * 60, 2, {'UNFORMATTED_VALUE': [1, 2, 3]}), 6)
+        self.assertEqual(sheets_load_data.get_pages_per_request("é" * 2000, 2), 1)
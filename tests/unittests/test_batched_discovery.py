@@ -0,0 +1,62 @@
+import unittest
+from unittest import mock
+from tap_google_sheets import schema
+from tap_google_sheets.client import GoogleClient
+from tap_google_sheets.streams import SpreadSheetMetadata
+
+def get_sheet(sheet_id, title):
+    return {
+        "properties": {"sheetId": sheet_id, "title": title, "gridProperties": {"rowCount": 100, "columnCount": 1}},
+        "data": [{"rowData": [{"values": [{"formattedValue": "name"}]}, {"values": [{"effectiveValue": {"stringValue": "a"}}]}]}]
+    }
+
+sheets = [get_sheet(sheet_id, "Sheet{}".format(sheet_id)) for sheet_id in range(60)]
+
+def sheets_get(path, api, endpoint):
+    """Return the requested sheets, in the order of the ranges"""
+    titles = [param.split("'")[1] for param in path.split('&') if param.startswith('ranges=')]
+    return {"sheets": [sheet for sheet in sheets if sheet["properties"]["title"] in titles]}
+
+class TestBatchedDiscovery(unittest.TestCase):
+    @mock.patch('tap_google_sheets.client.GoogleClient.get', side_effect = sheets_get)
+    def test_sheets_per_request(self, mocked_get):
+        """
+        Verify that the header row and the first data row of several sheets are requested in each request
+        """
+        client = GoogleClient("dummy_client_id", "dummy_client_secret", "dummy_refresh_token", 300)
+        sheets_metadata = schema.get_sheets_metadata(sheets, "id", client)
+
+        self.assertEqual(mocked_get.call_count, 2)
+        self.assertIn("includeGridData=true&ranges='Sheet0'!1:2&ranges='Sheet1'!1:2", mocked_get.mock_calls[0].kwargs['path'])
+        self.assertIn("ranges='Sheet50'!1:2", mocked_get.mock_calls[1].kwargs['path'])
+        self.assertEqual(sorted(sheets_metadata), list(range(60)))
+        sheet_json_schema, columns = sheets_metadata[59]
+        self.assertIn("name", sheet_json_schema["properties"])
+        self.assertEqual(columns[0]["columnName"], "name")
+
+    @mock.patch('tap_google_sheets.client.GoogleClient.get')
+    def test_schemas(self, mocked_get):
+        """
+        Verify that the schemas of all the sheets are discovered with the spreadsheet metadata request and one
+            sheet metadata request, and the sheets missing in the response are skipped
+        """
+        mocked_get.side_effect = [{"sheets": sheets[:3]}, {"sheets": sheets[:2]}]
+        client = GoogleClient("dummy_client_id", "dummy_client_secret", "dummy_refresh_token", 300)
+        schemas, _ = SpreadSheetMetadata(client, "id").get_schemas()
+
+        self.assertEqual(mocked_get.call_count, 2)
+        self.assertIn("Sheet0", schemas)
+        self.assertIn("Sheet1", schemas)
+        self.assertNotIn("Sheet2", schemas)
+
+    def test_long_sheet_titles(self):
+        """
+        Verify that the sheets of a request are bounded by the length of the URL encoded ranges of long sheet titles
+        """
+        # Each non-ASCII character is URL encoded with 6 characters: 8000 // 604 characters per range = 13 ranges
+        sheet_titles = ["{}{}".format("é" * 98, i) for i in range(10, 40)]
+        batches = schema.get_sheet_title_batches(sheet_titles)
+        self.assertEqual([len(batch) for batch in batches], [13, 13, 4])
+        self.assertEqual(sum(batches, []), sheet_titles)
+        self.assertEqual([len(batch) for batch in schema.get_sheet_title_batches(["Sheet1"] * 120)], [50, 50, 20])
+        self.assertEqual(schema.get_sheet_title_batches(["é" * 2000]), [["é" * 2000]])
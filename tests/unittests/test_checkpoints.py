@@ -0,0 +1,72 @@
+import unittest
+from tap_google_sheets.streams import SheetsLoadData
+from sheets_fixtures import sheet_schema, get_sheets, get_catalog, load_data
+
+sheets = get_sheets(1, 1000)
+catalog = get_catalog(sheets, sheet_schema)
+
+class TestCheckpoints(unittest.TestCase):
+    def setUp(self):
+        self.fail_at_row = None
+
+    def get_pages_data(self, sheet_title, sheet_last_col_letter, page_ranges, render_plan=None):
+        """Return a row for each page, fail at the page of fail_at_row"""
+        from_row, _ = page_ranges[0]
+        if from_row == self.fail_at_row:
+            raise RuntimeError('interrupted')
+        return [([[str(from_row)]], [[str(from_row)]])]
+
+    def sync(self, state, config):
+        messages, _ = load_data(SheetsLoadData(None, "id", config=config), catalog, state, sheets, self.get_pages_data,
+                                expected_errors=RuntimeError)
+        return messages
+
+    def test_resume_at_checkpoint(self):
+        """
+        Verify that the sync interrupted in the middle of a sheet resumes at the last checkpoint with the same version
+        """
+        state = {"bookmarks": {"Sheet1": 1}}
+        self.fail_at_row = 601
+        messages = self.sync(state, {"checkpoint_pages": 2})
+        self.assertEqual(state["checkpoints"]["Sheet1"]["from_row"], 401)
+        version = state["checkpoints"]["Sheet1"]["activate_version"]
+        self.assertEqual([message['record']['name'] for message in messages if message['type'] == 'RECORD'], ['2', '201', '401'])
+
+        self.fail_at_row = None
+        messages = self.sync(state, {"checkpoint_pages": 2})
+        self.assertEqual([message['record']['name'] for message in messages if message['type'] == 'RECORD'], ['401', '601', '801'])
+        self.assertEqual([message['version'] for message in messages if message['type'] == 'ACTIVATE_VERSION'], [version])
+        self.assertEqual(state["bookmarks"]["Sheet1"], version)
+        self.assertEqual(state["checkpoints"], {})
+
+    def test_parallel_checkpoints(self):
+        """
+        Verify that the checkpoints of the sheets synced by worker threads are written after the messages of their pages
+        """
+        state = {}
+        messages = self.sync(state, {"checkpoint_pages": 1, "max_sheet_workers": 2})
+        checkpoints = [(i, message['value']['checkpoints']['Sheet1']['from_row']) for i, message in enumerate(messages)
+                       if message['type'] == 'STATE' and message['value'].get('checkpoints', {}).get('Sheet1')]
+        records = {message['record']['__sdc_row']: i for i, message in enumerate(messages) if message['type'] == 'RECORD'}
+        self.assertEqual([from_row for _, from_row in checkpoints], [201, 401, 601, 801])
+        for i, from_row in checkpoints:
+            self.assertLess(records[from_row - 200 if from_row > 201 else 2], i)
+        self.assertEqual(state["checkpoints"], {})
+
+    def test_fingerprint_cleared_on_resume(self):
+        """
+        Verify that the fingerprint of the last sync is cleared by a resumed sync, the next sync writes the sheet
+        """
+        config = {"checkpoint_pages": 2, "skip_unchanged_sheets": "true"}
+        state = {}
+        self.sync(state, config)
+        self.assertIn("Sheet1", state["fingerprints"])
+        # the sheet changed and its sync was interrupted
+        state["checkpoints"] = {"Sheet1": {"from_row": 401, "activate_version": 2}}
+        self.sync(state, config)
+        self.assertNotIn("Sheet1", state["fingerprints"])
+        # the sheet is changed back: written again, then unchanged
+        messages = self.sync(state, config)
+        self.assertEqual(len([message for message in messages if message['type'] == 'RECORD']), 5)
+        messages = self.sync(state, config)
+        self.assertEqual([message for message in messages if message['type'] == 'RECORD'], [])
@@ -0,0 +1,71 @@
+import unittest
+from unittest import mock
+from singer.catalog import Catalog, CatalogEntry, Schema
+from tap_google_sheets.streams import SheetsLoadData, get_projected_columns
+from tap_google_sheets.client import GoogleClient
+from tap_google_sheets import transform
+
+columns = [
+    {'columnIndex': 1, 'columnLetter': 'A', 'columnName': 'id', 'columnType': 'stringValue', 'columnSkipped': False},
+    {'columnIndex': 2, 'columnLetter': 'B', 'columnName': 'notes', 'columnType': 'stringValue', 'columnSkipped': False},
+    {'columnIndex': 3, 'columnLetter': 'C', 'columnName': 'name', 'columnType': 'stringValue', 'columnSkipped': False},
+    {'columnIndex': 4, 'columnLetter': 'D', 'columnName': 'comment', 'columnType': 'stringValue', 'columnSkipped': False}]
+sheets = [{"properties": {"sheetId": 1, "title": "Sheet1", "gridProperties": {"rowCount": 600, "columnCount": 4}}}]
+mdata = [
+    {'breadcrumb': [], 'metadata': {'selected': True}},
+    {'breadcrumb': ['properties', 'id'], 'metadata': {'inclusion': 'automatic', 'selected': False}},
+    {'breadcrumb': ['properties', 'notes'], 'metadata': {'inclusion': 'available', 'selected': False}},
+    {'breadcrumb': ['properties', 'name'], 'metadata': {'inclusion': 'available', 'selected': True}},
+    {'breadcrumb': ['properties', 'comment'], 'metadata': {'inclusion': 'available', 'selected': False}}]
+catalog = Catalog([CatalogEntry(stream="Sheet1", tap_stream_id="Sheet1", schema=Schema.from_dict({'type': 'object'}), metadata=mdata)])
+
+def batch_get(path, api, params, endpoint):
+    """Return the values of the columns A and C, the page of rows 201 to 400 is blank in these columns"""
+    value_ranges = []
+    for param in params.split('&'):
+        if param.startswith('ranges='):
+            block = param.split('!')[1]
+            if block.startswith('A201') or block.startswith('C201'):
+                value_ranges.append({})
+            else:
+                value_ranges.append({'values': [[block[0] + block[1:].split(':')[0]]]})
+    return {'valueRanges': value_ranges}
+
+class TestColumnProjection(unittest.TestCase):
+    def test_projected_columns(self):
+        """
+        Verify that the deselected columns are not projected, except the columns with automatic inclusion
+        """
+        projected_columns = get_projected_columns(catalog, "Sheet1", columns)
+        self.assertEqual([col['columnName'] for col in projected_columns], ['id', 'name'])
+
+    def test_transform_selected_columns(self):
+        """
+        Verify that only the selected columns are transformed
+        """
+        records, row_num = transform.transform_sheet_data("id", 1, "Sheet1", 2, columns, [['1', 'a', 'b', 'c']],
+                                                          [['1', 'a', 'b', 'c']], selected_columns={'id', 'name'})
+        self.assertEqual(records, [{'__sdc_spreadsheet_id': 'id', '__sdc_sheet_id': 1, '__sdc_row': 2, 'id': '1', 'name': 'b'}])
+        self.assertEqual(row_num, 3)
+
+    @mock.patch('tap_google_sheets.client.GoogleClient.get', side_effect = batch_get)
+    @mock.patch('tap_google_sheets.streams.schema.get_sheet_metadata', return_value = [{'type': 'object'}, columns])
+    @mock.patch('tap_google_sheets.streams.write_schema')
+    @mock.patch('tap_google_sheets.streams.GoogleSheets.process_records')
+    def test_request_selected_columns(self, mock_process_records, mock_write_schema, mocked_sheet_metadata, mocked_get):
+        """
+        Verify that only the selected columns are requested, and the pages after a blank page are requested
+        """
+        client = GoogleClient("dummy_client_id", "dummy_client_secret", "dummy_refresh_token", 300)
+        sheets_load_data = SheetsLoadData(client, "id", config={"fetch_mode": "column_plan"})
+        _, sheets_loaded = sheets_load_data.load_data(catalog, {}, ["Sheet1"], sheets, "time")
+
+        # 3 pages, formatted values only
+        self.assertEqual(mocked_get.call_count, 3)
+        self.assertIn("ranges='Sheet1'!A2:A200&ranges='Sheet1'!C2:C200", mocked_get.mock_calls[0].kwargs['params'])
+        records = [call.kwargs['records'] for call in mock_process_records.call_args_list]
+        self.assertEqual(records, [
+            [{'__sdc_spreadsheet_id': 'id', '__sdc_sheet_id': 1, '__sdc_row': 2, 'id': 'A2', 'name': 'C2'}],
+            [],
+            [{'__sdc_spreadsheet_id': 'id', '__sdc_sheet_id': 1, '__sdc_row': 401, 'id': 'A401', 'name': 'C401'}]])
+        self.assertEqual(sheets_loaded[0]['lastRowNumber'], 402)
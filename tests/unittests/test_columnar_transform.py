@@ -0,0 +1,80 @@
+import unittest
+from unittest import mock
+from tap_google_sheets import columnar, transform
+from tap_google_sheets.streams import SheetsLoadData
+
+columns = [{'columnIndex': 1, 'columnLetter': 'A', 'columnName': 'name', 'columnType': 'stringValue', 'columnSkipped': False},
+           {'columnIndex': 2, 'columnLetter': 'B', 'columnName': 'amount', 'columnType': 'numberType', 'columnSkipped': False},
+           {'columnIndex': 3, 'columnLetter': 'C', 'columnName': 'date', 'columnType': 'numberType.DATE_TIME', 'columnSkipped': False},
+           {'columnIndex': 4, 'columnLetter': 'D', 'columnName': 'time', 'columnType': 'numberType.TIME', 'columnSkipped': False},
+           {'columnIndex': 5, 'columnLetter': 'E', 'columnName': 'flag', 'columnType': 'boolValue', 'columnSkipped': False},
+           {'columnIndex': 6, 'columnLetter': 'F', 'columnName': '__sdc_skip_col_06', 'columnType': 'stringValue', 'columnSkipped': True},
+           {'columnIndex': 7, 'columnLetter': 'G', 'columnName': 'other', 'columnType': 'errorType', 'columnSkipped': False}]
+rows = [['a', '1,234.50', '2022-02-12 12:30:00', '12:30:00', 'TRUE', 'x', 'y'],
+        [],
+        ['b', '0.1234567890123456', '1/1/1', '1.5', 'maybe'],
+        ['c', '$12.00', 'after 9999', '-0.25', 'n'],
+        ['d', '7', '', '0.0000057870370370370', '0.00'],
+        ['e', 'abc', 'not a date', 'not a time', '1'],
+        ['f']]
+unformatted_rows = [['a', 1234.5, 44604.520833333336, 0.520833333333333, 'TRUE', 'x', 'y'],
+                    [],
+                    ['b', 0.1234567890123456, -693593, 1.5, 'maybe'],
+                    ['c', 12.0, 2958466, -0.25, 'n'],
+                    ['d', 7, '', 0.0000057870370370370, '0.00'],
+                    ['e', 'abc', 'not a date', 'not a time', '1'],
+                    ['f']]
+
+@unittest.skipIf(columnar.np is None, 'numpy is not installed')
+class TestColumnarTransform(unittest.TestCase):
+    def test_records_unchanged(self):
+        """
+        Verify that the records transformed by columns are the records transformed by rows
+        """
+        for selected_columns in (None, {'amount', 'time'}):
+            expected_records = transform.transform_sheet_data('id', 1, 'Sheet1', 2, columns, rows, unformatted_rows,
+                                                              selected_columns=selected_columns)
+            records = columnar.transform_sheet_data('id', 1, 'Sheet1', 2, columns, rows, unformatted_rows,
+                                                    selected_columns=selected_columns)
+            self.assertEqual(records, expected_records)
+            # same columns order in the records
+            self.assertEqual([list(record) for record in records[0]], [list(record) for record in expected_records[0]])
+
+    def test_converted_values(self):
+        """
+        Verify the values of the cells converted in batches and of the cells converted one by one
+        """
+        records, row_num = columnar.transform_sheet_data('id', 1, 'Sheet1', 2, columns, rows, unformatted_rows)
+        self.assertEqual(row_num, 9)
+        self.assertEqual([record['__sdc_row'] for record in records], [2, 4, 5, 6, 7, 8])
+        self.assertEqual([record.get('amount') for record in records], [1234.5, 0.123456789012346, '$12.00', 7, 'abc', None])
+        self.assertEqual([record.get('date') for record in records],
+                         ['2022-02-12T12:30:00.000000Z', '0001-01-01T00:00:00.000000Z', 'after 9999', None, 'not a date', None])
+        self.assertEqual([record.get('time') for record in records],
+                         ['12:30:00', '1 day, 12:00:00', '-1 day, 18:00:00', '0:00:00.500000', 'not a time', None])
+        self.assertEqual([record.get('flag') for record in records], [True, 'maybe', False, False, True, None])
+        self.assertNotIn('amount', records[-1])
+
+    def test_duplicate_key(self):
+        """
+        Verify that a duplicate key raises an error
+        """
+        with self.assertRaises(Exception) as err:
+            columnar.transform_sheet_data('id', 1, 'Sheet1', 2, columns, [['a'], ['a']], [['a'], ['a']], key_columns=['name'])
+        self.assertIn('DUPLICATE KEY ERROR', str(err.exception))
+        with self.assertRaises(Exception) as err:
+            columnar.transform_sheet_data('id', 1, 'Sheet1', 2, columns, [['a'], ['', 'x']], [['a'], ['', 'x']], key_columns=['name'])
+        self.assertIn('NULL KEY ERROR', str(err.exception))
+        self.assertIn('ROW: 3', str(err.exception))
+
+class TestTransformEngine(unittest.TestCase):
+    def test_numpy_transform_engine(self):
+        """
+        Verify that the "numpy" transform_engine transforms the pages by columns if numpy is installed
+        """
+        self.assertEqual(SheetsLoadData(None, "id").get_sheet_data_transform(), transform.transform_sheet_data)
+        sheets_load_data = SheetsLoadData(None, "id", config={"transform_engine": "numpy"})
+        if columnar.np is not None:
+            self.assertEqual(sheets_load_data.get_sheet_data_transform(), columnar.transform_sheet_data)
+        with mock.patch('tap_google_sheets.columnar.np', None):
+            self.assertEqual(sheets_load_data.get_sheet_data_transform(), transform.transform_sheet_data)
@@ -1,5 +1,5 @@
 import unittest
-from tap_google_sheets.transform import transform_sheet_datetime_data, excel_to_dttm_str
+from tap_google_sheets.transform import transform_sheet_datetime_data, excel_to_dttm_str, excel_to_utc_dttm_str
 
 class TestDateTimeTransform(unittest.TestCase):
     """Verify that the out of range dates does not throw any exception while converting"""
@@ -29,4 +29,23 @@ class TestDateTimeTransform(unittest.TestCase):
         """Verify that string date in a cell returns the result in same format without converting"""
         expected_datetime_str = '12/02/2022 00:00:00'
         return_dttm_str = transform_sheet_datetime_data(expected_datetime_str, expected_datetime_str, "test", "datetime", "A", 1, " numberType.DATE_TIME")
-        self.assertEqual(return_dttm_str, expected_datetime_str) # Verify that the ts is correctly transformed 
\ No newline at end of file
+        self.assertEqual(return_dttm_str, expected_datetime_str) # Verify that the ts is correctly transformed 
+
+    def test_datetime_range_limits(self):
+        """Verify the first and the last datetime in range, and the values just out of range"""
+        self.assertEqual(excel_to_dttm_str('first', -693593), ('0001-01-01T00:00:00.000000Z', False))
+        self.assertEqual(excel_to_dttm_str('before first', -693593.5), ('before first', True))
+        self.assertEqual(excel_to_dttm_str('last', 2958465.99999), ('9999-12-31T23:59:59.000000Z', False))
+        self.assertEqual(excel_to_dttm_str('after last', 2958466), ('after last', True))
+
+    def test_repeated_datetime_values(self):
+        """Verify that the repeated serial numbers return the memoized datetime string"""
+        excel_to_utc_dttm_str.cache_clear()
+        for _ in range(3):
+            self.assertEqual(excel_to_dttm_str('12/02/2022', 44604.520833333336), ("2022-02-12T12:30:00.000000Z", False))
+        self.assertEqual(excel_to_utc_dttm_str.cache_info().hits, 2)
+
+    def test_timezone_datetime_values(self):
+        """Verify that the datetime values of another timezone are converted to UTC"""
+        return_dttm_str, _ = excel_to_dttm_str('12/02/2022', 44604.520833333336, 'America/New_York')
+        self.assertEqual(return_dttm_str, "2022-02-12T17:30:00.000000Z")
@@ -0,0 +1,79 @@
+import unittest
+from unittest import mock
+from tap_google_sheets.streams import SheetsLoadData
+from tap_google_sheets.client import GoogleClient
+from tap_google_sheets import transform
+
+sheet_schema = {'type': 'object', 'additionalProperties': False, 'properties': {'__sdc_spreadsheet_id': {'type': ['null', 'string']}, '__sdc_sheet_id': {'type': ['null', 'integer']}, '__sdc_row': {'type': ['null', 'integer']}, 'name': {'type': ['null', 'string']}, 'value': {'anyOf': [{'type': ['null', 'string'], 'format': 'singer.decimal'}, {'type': ['null', 'string']}]}}}
+columns = [{'columnIndex': 1, 'columnLetter': 'A', 'columnName': 'name', 'columnType': 'stringValue', 'columnSkipped': False}, {'columnIndex': 2, 'columnLetter': 'B', 'columnName': 'value', 'columnType': 'numberType', 'columnSkipped': False}]
+sheets = [{
+    "properties": {
+        "sheetId": 1260142713,
+        "title": "Sheet13",
+        "index": 15,
+        "sheetType": "GRID",
+        "gridProperties": {
+            "rowCount": 100,
+            "columnCount": 5
+        }
+    }
+}]
+grid_data = {
+    "sheets": [{
+        "data": [{
+            "startRow": 1,
+            "rowData": [
+                {"values": [{"formattedValue": "a", "effectiveValue": {"stringValue": "a"}}, {"formattedValue": "1,234.50", "effectiveValue": {"numberValue": 1234.5}}]},
+                {},
+                {"values": [{"formattedValue": "b", "effectiveValue": {"stringValue": "b"}}, {}]},
+                {"values": [{}, {"formattedValue": "#DIV/0!", "effectiveValue": {"errorValue": {"type": "DIVIDE_BY_ZERO"}}}]},
+                {"values": [{}, {}]}
+            ]
+        }]
+    }]
+}
+
+class TestGridDataFetch(unittest.TestCase):
+    @mock.patch('tap_google_sheets.streams.get_key_properties', return_value = ['__sdc_row'])
+    @mock.patch('tap_google_sheets.streams.get_replication_method', return_value = 'FULL_TABLE')
+    @mock.patch('tap_google_sheets.client.GoogleClient.get', return_value = grid_data)
+    @mock.patch('tap_google_sheets.streams.schema.get_sheet_metadata', return_value = [sheet_schema, columns])
+    @mock.patch('tap_google_sheets.streams.get_selected_fields', return_value = [])
+    @mock.patch('tap_google_sheets.streams.write_schema')
+    @mock.patch('tap_google_sheets.streams.GoogleSheets.process_records')
+    def test_single_api_call(self, mock_process_records, mock_write_schema, mocked_get_selected_fields, mocked_sheet_metadata, mocked_get, mocked_replication_method, mocked_key_properties):
+        """
+        Verify that the "grid_data" fetch mode makes 1 API call for a single page of data
+        """
+        config = {
+            "spreadsheet_id": "id",
+            "start_date": "2019-01-01T00:00:00Z",
+            "fetch_mode": "grid_data"
+        }
+        client = GoogleClient("dummy_client_id", "dummy_client_secret", "dummy_refresh_token", 300)
+        sheets_load_data = SheetsLoadData(client, config.get("spreadsheet_id"), config.get("start_date"), config)
+        sheets_load_data.load_data({}, {}, ["Sheet13"], sheets, "time")
+        self.assertEqual(mocked_get.call_count, 1)
+        self.assertEqual(mock.call(api='sheets', endpoint='Sheet13', params="includeGridData=true&ranges='Sheet13'!A2:B100&fields=sheets.data(startRow,rowData.values(formattedValue,effectiveValue))", path="spreadsheets/id"), mocked_get.mock_calls[0])
+
+        # Verify the records are transformed from both the formatted and unformatted values
+        records = mock_process_records.call_args.kwargs['records']
+        self.assertEqual(records, [
+            {'__sdc_spreadsheet_id': 'id', '__sdc_sheet_id': 1260142713, '__sdc_row': 2, 'name': 'a', 'value': 1234.5},
+            {'__sdc_spreadsheet_id': 'id', '__sdc_sheet_id': 1260142713, '__sdc_row': 4, 'name': 'b'},
+            {'__sdc_spreadsheet_id': 'id', '__sdc_sheet_id': 1260142713, '__sdc_row': 5, 'name': None, 'value': '#DIV/0!'}
+        ])
+
+    def test_transform_grid_data_rows(self):
+        """
+        Verify that the grid data is converted to the rows returned by spreadsheets.values
+        """
+        sheet_data_rows, unformatted_rows = transform.transform_grid_data_rows(grid_data['sheets'][0]['data'][0])
+        self.assertEqual(sheet_data_rows, [['a', '1,234.50'], [], ['b'], ['', '#DIV/0!']])
+        self.assertEqual(unformatted_rows, [['a', 1234.5], [], ['b'], ['', '#DIV/0!']])
+
+    def test_transform_empty_grid_data(self):
+        """
+        Verify that an empty range is returned as a blank page
+        """
+        self.assertEqual(transform.transform_grid_data_rows({}), ([], []))
@@ -0,0 +1,88 @@
+import unittest
+from unittest import mock
+from tap_google_sheets.streams import SheetsLoadData, get_page_ranges
+from sheets_fixtures import sheet_schema, get_sheets, get_catalog, load_data
+
+sheets = get_sheets(1, 1000)
+mdata = [{'breadcrumb': [], 'metadata': {'selected': True, 'replication-method': 'INCREMENTAL'}}]
+catalog = get_catalog(sheets, sheet_schema, mdata)
+
+class TestIncrementalSheets(unittest.TestCase):
+    def setUp(self):
+        # values of the rows 2 to 301
+        self.rows = [['row {}'.format(row)] for row in range(2, 302)]
+        self.requested_ranges = []
+
+    def get_pages_data(self, sheet_title, sheet_last_col_letter, page_ranges, render_plan=None):
+        """Return the rows of each page"""
+        self.requested_ranges.extend(page_ranges)
+        pages = []
+        for from_row, to_row in page_ranges:
+            rows = self.rows[from_row - 2:to_row - 1]
+            pages.append((rows, rows))
+        return pages
+
+    def sync(self, state, sync_sheets=sheets):
+        self.requested_ranges = []
+        messages, _ = load_data(SheetsLoadData(None, "id"), catalog, state, sync_sheets, self.get_pages_data)
+        self.assertNotIn('ACTIVATE_VERSION', [message['type'] for message in messages])
+        return [message['record']['__sdc_row'] for message in messages if message['type'] == 'RECORD']
+
+    def test_resume_after_last_row(self):
+        """
+        Verify that the next sync only requests and writes the rows appended after the last row written
+        """
+        state = {}
+        self.assertEqual(self.sync(state), list(range(2, 302)))
+        self.assertEqual(state['last_rows']['Sheet1']['row'], 301)
+
+        self.rows.extend([['row 302'], ['row 303']])
+        self.assertEqual(self.sync(state), [302, 303])
+        # the last row of the last sync, then the rows after it
+        self.assertEqual(self.requested_ranges[:2], [(301, 301), (302, 400)])
+        self.assertEqual(state['last_rows']['Sheet1']['row'], 303)
+
+        self.assertEqual(self.sync(state), [])
+        self.assertEqual(state['last_rows']['Sheet1']['row'], 303)
+
+    def test_changed_last_row(self):
+        """
+        Verify that all the rows are synced again when the last row written changed
+        """
+        state = {}
+        self.sync(state)
+        self.rows[-1] = ['edited']
+        self.assertEqual(self.sync(state), list(range(2, 302)))
+
+    def test_last_row_of_the_grid(self):
+        """
+        Verify that a last row written at the end of the grid (rowCount) is not a changed row
+        """
+        full_sheets = get_sheets(1, 301)
+        state = {}
+        with mock.patch('tap_google_sheets.streams.LOGGER.warning') as mocked_warning:
+            self.assertEqual(self.sync(state, full_sheets), list(range(2, 302)))
+            self.assertEqual(state['last_rows']['Sheet1']['row'], 301)
+            self.assertEqual(self.sync(state, full_sheets), [])
+        self.assertEqual(self.requested_ranges, [(301, 301)])
+        self.assertEqual(state['last_rows']['Sheet1']['row'], 301)
+        mocked_warning.assert_not_called()
+
+    def test_page_ranges_from_row(self):
+        """
+        Verify the page ranges starting after a row
+        """
+        self.assertEqual(get_page_ranges(1000, from_row=302), [(302, 400), (401, 600), (601, 800), (801, 1000)])
+        self.assertEqual(get_page_ranges(1000)[:2], [(2, 200), (201, 400)])
+
+    def test_row_appended_at_the_grid_end(self):
+        """
+        Verify that a single row appended at the end of the grid (rowCount of the last row) is synced
+        """
+        appended_row = self.rows.pop()
+        state = {}
+        self.assertEqual(self.sync(state, get_sheets(1, 300)), list(range(2, 301)))
+        self.rows.append(appended_row)
+        self.assertEqual(self.sync(state, get_sheets(1, 301)), [301])
+        self.assertEqual(self.requested_ranges, [(300, 300), (301, 301)])
+        self.assertEqual(state['last_rows']['Sheet1']['row'], 301)
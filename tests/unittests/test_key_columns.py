@@ -0,0 +1,84 @@
+import unittest
+from unittest import mock
+from singer import metadata
+from tap_google_sheets.client import GoogleClient
+from tap_google_sheets.streams import SheetsLoadData, SpreadSheetMetadata
+from tap_google_sheets import transform
+import sheets_fixtures
+
+sheet_schema = sheets_fixtures.get_sheet_schema(['id', 'name'])
+columns = sheets_fixtures.get_columns(['id', 'name'])
+sheets = sheets_fixtures.get_sheets(1, 200, 2)
+
+def get_catalog(key_properties):
+    mdata = [{'breadcrumb': [], 'metadata': {'selected': True, 'table-key-properties': key_properties}}]
+    return sheets_fixtures.get_catalog(sheets, sheet_schema, mdata)
+
+class TestKeyColumns(unittest.TestCase):
+    def setUp(self):
+        self.rows = [['1', 'a'], ['2', 'b']]
+
+    def get_pages_data(self, sheet_title, sheet_last_col_letter, page_ranges, render_plan=None):
+        """Return the rows in a single page"""
+        return [(self.rows, self.rows)]
+
+    def sync(self, catalog):
+        messages, _ = sheets_fixtures.load_data(SheetsLoadData(None, "id"), catalog, {}, sheets, self.get_pages_data,
+                                                (sheet_schema, columns))
+        return messages
+
+    def test_schema_key_properties(self):
+        """
+        Verify that the key columns of the catalog metadata are the key properties of the schema
+        """
+        messages = self.sync(get_catalog(['id']))
+        schema_message = [message for message in messages if message['type'] == 'SCHEMA'][0]
+        self.assertEqual(schema_message['key_properties'], ['id'])
+
+    def test_duplicate_key(self):
+        """
+        Verify that a duplicate key raises an error, including in the rows of the next pages
+        """
+        self.rows = [['1', 'a'], ['1', 'b']]
+        with self.assertRaises(Exception) as err:
+            self.sync(get_catalog(['id']))
+        self.assertIn('DUPLICATE KEY ERROR', str(err.exception))
+
+        row_keys = set()
+        transform.transform_sheet_data("id", 1, "Sheet1", 2, columns, [['1', 'a']], [['1', 'a']], key_columns=['id'], row_keys=row_keys)
+        self.assertEqual(row_keys, {('1',)})
+        with self.assertRaises(Exception):
+            transform.transform_sheet_data("id", 1, "Sheet1", 202, columns, [['1', 'b']], [['1', 'b']], key_columns=['id'], row_keys=row_keys)
+
+    def test_blank_key(self):
+        """
+        Verify that a blank key raises an error naming the row
+        """
+        self.rows = [['1', 'a'], ['', 'b'], ['', 'c']]
+        with self.assertRaises(Exception) as err:
+            self.sync(get_catalog(['id']))
+        self.assertIn('NULL KEY ERROR', str(err.exception))
+        self.assertIn('ROW: 3', str(err.exception))
+
+    def test_key_column_not_found(self):
+        """
+        Verify that a key column not in the header row raises an error
+        """
+        with self.assertRaises(Exception) as err:
+            self.sync(get_catalog(['email']))
+        self.assertIn('KEY COLUMN NOT FOUND ERROR', str(err.exception))
+
+    @mock.patch('tap_google_sheets.client.GoogleClient.get')
+    def test_discovered_key_columns(self, mocked_get):
+        """
+        Verify that the discovery uses the key columns of the "key_columns" config as table-key-properties
+        """
+        sheet = {"properties": {"sheetId": 1, "title": "Sheet1", "gridProperties": {"rowCount": 100, "columnCount": 2}},
+                 "data": [{"rowData": [{"values": [{"formattedValue": "id"}, {"formattedValue": "name"}]},
+                                       {"values": [{"effectiveValue": {"stringValue": "1"}}, {"effectiveValue": {"stringValue": "a"}}]}]}]}
+        mocked_get.return_value = {"sheets": [sheet]}
+        client = GoogleClient("dummy_client_id", "dummy_client_secret", "dummy_refresh_token", 300)
+        _, field_metadata = SpreadSheetMetadata(client, "id", config={"key_columns": {"Sheet1": ["id"]}}).get_schemas()
+        mdata = metadata.to_map(field_metadata["Sheet1"])
+        self.assertEqual(metadata.get(mdata, (), 'table-key-properties'), ['id'])
+        self.assertEqual(metadata.get(mdata, ('properties', 'id'), 'inclusion'), 'automatic')
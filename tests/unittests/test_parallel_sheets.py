@@ -0,0 +1,67 @@
+import time
+import unittest
+from unittest import mock
+from tap_google_sheets.streams import SheetsLoadData
+from sheets_fixtures import sheet_schema, get_sheets, get_catalog, load_data
+
+sheets = get_sheets(3, 600)
+catalog = get_catalog(sheets, sheet_schema)
+
+def get_pages_data(sheet_title, sheet_last_col_letter, page_ranges, render_plan=None):
+    """Return a row for each page, the pages of the first sheets are the slowest to respond"""
+    from_row, _ = page_ranges[0]
+    time.sleep(0.01 * (4 - int(sheet_title[-1])))
+    return [([[sheet_title]], [[sheet_title]])]
+
+class TestParallelSheets(unittest.TestCase):
+    def test_messages_of_each_sheet_are_contiguous(self):
+        """
+        Verify that the messages of the sheets synced in parallel are written sheet by sheet, with the State updates
+        """
+        config = {"max_sheet_workers": 3}
+        state = {}
+        messages, sheets_loaded = load_data(SheetsLoadData(None, "id", config=config), catalog, state, sheets, get_pages_data)
+
+        expected_types = ['STATE', 'SCHEMA', 'ACTIVATE_VERSION', 'RECORD', 'RECORD', 'RECORD', 'ACTIVATE_VERSION', 'STATE', 'STATE'] * 3
+        self.assertEqual([message['type'] for message in messages], expected_types)
+        for i, title in enumerate(["Sheet1", "Sheet2", "Sheet3"]):
+            sheet_messages = messages[i * 9:(i + 1) * 9]
+            self.assertEqual(sheet_messages[0]['value']['currently_syncing'], title)
+            self.assertTrue(all(message['stream'] == title for message in sheet_messages[1:7]))
+            self.assertIn(title, sheet_messages[7]['value']['bookmarks'])
+            self.assertNotIn('currently_syncing', sheet_messages[8]['value'])
+        self.assertEqual([sheet_loaded['title'] for sheet_loaded in sheets_loaded], ["Sheet1", "Sheet2", "Sheet3"])
+
+    def test_worker_error_is_raised(self):
+        """
+        Verify that the error of a worker is raised and the sheet is not bookmarked
+        """
+        state = {}
+        sheets_load_data = SheetsLoadData(None, "id", config={"max_sheet_workers": 2})
+        with self.assertRaises(Exception) as err:
+            load_data(sheets_load_data, catalog, state, sheets, Exception('API error'))
+        self.assertEqual(str(err.exception), 'API error')
+        self.assertEqual(state, {'currently_syncing': 'Sheet1'})
+
+    @mock.patch('tap_google_sheets.streams.MAX_QUEUED_MESSAGES', 5)
+    def test_workers_stopped_on_error(self):
+        """
+        Verify that the workers buffer a bounded number of messages, and stop once a sheet failed
+        """
+        long_sheets = get_sheets(2, 20000)
+        requested_pages = {"Sheet1": 0, "Sheet2": 0}
+        def get_pages_data(sheet_title, sheet_last_col_letter, page_ranges, render_plan=None):
+            """Return a row for each page, the 3rd page of Sheet1 fails"""
+            requested_pages[sheet_title] += 1
+            if sheet_title == "Sheet1" and requested_pages[sheet_title] == 3:
+                time.sleep(0.2)
+                raise Exception('API error')
+            return [([[sheet_title]], [[sheet_title]])]
+
+        sheets_load_data = SheetsLoadData(None, "id", config={"max_sheet_workers": 2})
+        with self.assertRaises(Exception) as err:
+            load_data(sheets_load_data, catalog, {}, long_sheets, get_pages_data)
+        self.assertEqual(str(err.exception), 'API error')
+        # the worker of Sheet2 waited for its queue, then stopped
+        self.assertLess(requested_pages["Sheet2"], 10)
+        self.assertTrue(sheets_load_data.run_limits.is_reached())
@@ -0,0 +1,37 @@
+import time
+import unittest
+from unittest import mock
+from tap_google_sheets.streams import SheetsLoadData, get_page_ranges
+
+def get_pages_data(sheet_title, sheet_last_col_letter, page_ranges, render_plan=None):
+    """Return a row for each page until row 1000, the earlier pages are the slowest to respond"""
+    from_row, _ = page_ranges[0]
+    time.sleep(0.001 * max(0, 2000 - from_row) / 100)
+    if from_row > 1000:
+        return [([], [])]
+    return [([[str(from_row)]], [[from_row]])]
+
+class TestPrefetchPages(unittest.TestCase):
+    @mock.patch('tap_google_sheets.streams.SheetsLoadData.get_pages_data', side_effect = get_pages_data)
+    def test_pages_in_order(self, mocked_get_pages_data):
+        """
+        Verify that the prefetched pages are returned in order even if the later pages are received first
+        """
+        sheets_load_data = SheetsLoadData(None, "id", config={"prefetch_depth": 4})
+        pages = sheets_load_data.get_pages("Sheet1", "A", get_page_ranges(3000), 1)
+        from_rows = [from_row for from_row, _, _ in pages]
+        # the pages are returned until the first blank page (rows 1001 to 1200)
+        self.assertEqual(from_rows, [from_row for from_row, _ in get_page_ranges(3000) if from_row <= 1001])
+
+    @mock.patch('tap_google_sheets.streams.SheetsLoadData.get_pages_data', side_effect = get_pages_data)
+    def test_stop_at_blank_page(self, mocked_get_pages_data):
+        """
+        Verify that no more pages are requested than the in-flight depth after the loop stops at the blank page
+        """
+        sheets_load_data = SheetsLoadData(None, "id", config={"prefetch_depth": 3})
+        for from_row, sheet_data_rows, _ in sheets_load_data.get_pages("Sheet1", "A", get_page_ranges(5000), 1):
+            if not sheet_data_rows:
+                break
+        # the blank page starts at row 1001, the 6th page
+        self.assertEqual(from_row, 1001)
+        self.assertLessEqual(mocked_get_pages_data.call_count, 6 + 3)
@@ -0,0 +1,71 @@
+import os
+import json
+import tempfile
+import unittest
+from unittest import mock
+from tap_google_sheets.client import GoogleClient, SharedTokenBucket, TokenBucket
+
+class TestQuotaCoordination(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @mock.patch('tap_google_sheets.client.time.sleep')
+    @mock.patch('tap_google_sheets.client.time.time', return_value = 1000.0)
+    def test_buckets_share_the_tokens(self, mocked_time, mocked_sleep):
+        """
+        Verify that the buckets using the same quota file take their tokens from the same budget
+        """
+        path = os.path.join(self.tmp_dir.name, 'quota')
+        first_bucket = SharedTokenBucket(60, path)
+        second_bucket = SharedTokenBucket(60, path)
+        for _ in range(30):
+            first_bucket.acquire()
+            second_bucket.acquire()
+        self.assertEqual(first_bucket.level, 0)
+        self.assertEqual(second_bucket.level, 0)
+        with open(path) as file:
+            self.assertEqual(json.load(file), {'tokens': 0, 'updated_at': 1000.0})
+
+        # the next request waits for the refill of the shared bucket
+        mocked_time.side_effect = [1000.0, 1001.0]
+        second_bucket.acquire()
+        mocked_sleep.assert_called_once_with(1.0)
+
+    @mock.patch('tap_google_sheets.client.time.time', return_value = 1000.0)
+    def test_corrupted_quota_file(self, mocked_time):
+        """
+        Verify that a corrupted quota file is reset to a full bucket
+        """
+        path = os.path.join(self.tmp_dir.name, 'quota')
+        with open(path, 'w') as file:
+            file.write('{"tokens":')
+        bucket = SharedTokenBucket(60, path)
+        bucket.acquire()
+        self.assertEqual(bucket.level, 59)
+
+    def test_client_rate_limiter(self):
+        """
+        Verify that the clients with the same client_id share a quota file of the quota_coordination_dir
+        """
+        client = GoogleClient("dummy_client_id", "dummy_client_secret", "dummy_refresh_token", 300, None, 60, self.tmp_dir.name)
+        other_client = GoogleClient("dummy_client_id", "dummy_client_secret", "other_refresh_token", 300, None, 60, self.tmp_dir.name)
+        self.assertIsInstance(client.rate_limiter, SharedTokenBucket)
+        self.assertEqual(client.rate_limiter.path, other_client.rate_limiter.path)
+        self.assertEqual(os.path.dirname(client.rate_limiter.path), self.tmp_dir.name)
+
+        # the quota is not coordinated by default
+        client = GoogleClient("dummy_client_id", "dummy_client_secret", "dummy_refresh_token", 300)
+        self.assertNotIsInstance(client.rate_limiter, SharedTokenBucket)
+
+    @mock.patch('tap_google_sheets.client.fcntl', None)
+    @mock.patch('tap_google_sheets.client.LOGGER.warning')
+    def test_file_lock_not_supported(self, mocked_logger_warning):
+        """
+        Verify that the quota of the process is used if file locks are not supported
+        """
+        client = GoogleClient("dummy_client_id", "dummy_client_secret", "dummy_refresh_token", 300, None, 60, self.tmp_dir.name)
+        self.assertIs(type(client.rate_limiter), TokenBucket)
+        mocked_logger_warning.assert_called_once()
@@ -0,0 +1,61 @@
+import unittest
+from unittest import mock
+from tap_google_sheets.client import GoogleClient, TokenBucket
+
+class MockedClock:
+    """Clock advancing only when sleeping"""
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+class TestTokenBucket(unittest.TestCase):
+    def test_wait_when_bucket_is_empty(self):
+        """
+        Verify that the requests beyond the capacity of the bucket wait for the refill
+        """
+        clock = MockedClock()
+        with mock.patch('tap_google_sheets.client.time.monotonic', side_effect=clock.monotonic), \
+             mock.patch('tap_google_sheets.client.time.sleep', side_effect=clock.sleep):
+            bucket = TokenBucket(120)
+            for _ in range(120):
+                bucket.acquire()
+            # the burst of 120 requests is not throttled
+            self.assertEqual(clock.now, 1000.0)
+            self.assertEqual(bucket.level, 0)
+
+            # 2 tokens per second are refilled
+            for _ in range(10):
+                bucket.acquire()
+            self.assertAlmostEqual(clock.now, 1005.0)
+
+            clock.now += 30
+            self.assertAlmostEqual(bucket.level, 60)
+            clock.now += 60
+            self.assertAlmostEqual(bucket.level, 120)
+
+    def test_default_requests_per_minute(self):
+        """
+        Verify the default and configured quota of the rate limiter of the client
+        """
+        client = GoogleClient("dummy_client_id", "dummy_client_secret", "dummy_refresh_token", 300)
+        self.assertEqual(client.rate_limiter.capacity, 60)
+        client = GoogleClient("dummy_client_id", "dummy_client_secret", "dummy_refresh_token", 300, None, "300")
+        self.assertEqual(client.rate_limiter.capacity, 300)
+
+    @mock.patch('tap_google_sheets.client.TokenBucket.acquire')
+    @mock.patch('tap_google_sheets.client.requests.Session.request')
+    @mock.patch('tap_google_sheets.client.GoogleClient.get_access_token')
+    def test_request_acquires_token(self, mock_get_token, mock_request, mock_acquire):
+        """
+        Verify that each request takes a token of the rate limiter
+        """
+        mock_request.return_value.status_code = 200
+        client = GoogleClient("dummy_client_id", "dummy_client_secret", "dummy_refresh_token", 300)
+        client.request("GET", "dummy_path")
+        client.request("GET", "dummy_path")
+        self.assertEqual(mock_acquire.call_count, 2)
@@ -0,0 +1,77 @@
+import io
+import unittest
+from unittest import mock
+from singer.catalog import Catalog, CatalogEntry, Schema
+from tap_google_sheets import transform
+from tap_google_sheets.streams import SheetsLoadData, RECORD_WRITER
+
+def get_schema(col_format):
+    return {'anyOf': [{'type': ['null', 'string'], 'format': col_format}, {'type': ['null', 'string']}]}
+
+sheet_schema = {'type': 'object', 'additionalProperties': False, 'properties': {
+    '__sdc_spreadsheet_id': {'type': ['null', 'string']}, '__sdc_sheet_id': {'type': ['null', 'integer']},
+    '__sdc_row': {'type': ['null', 'integer']}, 'name': {'type': ['null', 'string']},
+    'flag': {'type': ['null', 'boolean', 'string']}, 'date': get_schema('date-time'), 'time': get_schema('time'),
+    'amount': get_schema('singer.decimal'), 'other': {'type': ['null', 'string']},
+    '_sdc_deleted_at': {'type': ['null', 'string'], 'format': 'date-time'}}}
+mdata = [{'breadcrumb': [], 'metadata': {'selected': True}},
+         {'breadcrumb': ['properties', 'other'], 'metadata': {'selected': False, 'inclusion': 'available'}},
+         {'breadcrumb': ['properties', '__sdc_row'], 'metadata': {'selected': False, 'inclusion': 'automatic'}}]
+catalog = Catalog([CatalogEntry(stream="Sheet1", tap_stream_id="Sheet1", key_properties=['__sdc_row'],
+                                schema=Schema.from_dict(sheet_schema), metadata=mdata)])
+records = [{'__sdc_spreadsheet_id': 'id', '__sdc_sheet_id': 1, '__sdc_row': 2, 'name': 'a', 'flag': True,
+            'date': '2022-02-12T12:30:00.000000Z', 'time': '12:30:00', 'amount': 1234.5, 'other': 'x', 'extra': 'y'},
+           {'__sdc_spreadsheet_id': 'id', '__sdc_sheet_id': 1, '__sdc_row': 3, 'name': None, 'flag': 'maybe',
+            'date': 'not a date', 'time': None, 'amount': '$12.00'},
+           {'__sdc_spreadsheet_id': 'id', '__sdc_sheet_id': 1, '__sdc_row': 4, 'flag': None,
+            'date': '2022-02-30T12:30:00.000000Z', 'amount': 1e-07, '_sdc_deleted_at': '2022-02-12T12:30:00.000000Z'}]
+
+class TestRecordProjector(unittest.TestCase):
+    def process_records(self, sheets_load_data, records):
+        """Return the messages written by process_records"""
+        with mock.patch('sys.stdout', new_callable=io.StringIO) as mocked_stdout:
+            sheets_load_data.process_records(catalog, "Sheet1", [dict(record) for record in records], None)
+            RECORD_WRITER.flush()
+        return mocked_stdout.getvalue()
+
+    def test_records_unchanged(self):
+        """
+        Verify that the projected records are the records transformed by the singer Transformer
+        """
+        sheets_load_data = SheetsLoadData(None, "id")
+        with mock.patch('tap_google_sheets.streams.SheetsLoadData.get_record_projector',
+                        return_value=transform.project_no_record):
+            expected_messages = self.process_records(sheets_load_data, records)
+        self.assertEqual(self.process_records(sheets_load_data, records), expected_messages)
+        self.assertIn('"amount": "1E-7"', expected_messages)
+        self.assertNotIn('"other"', expected_messages)
+        self.assertIn('"__sdc_row": 2', expected_messages)
+
+    def test_projector_compiled_once(self):
+        """
+        Verify that the projector of a stream is compiled once for all its pages
+        """
+        sheets_load_data = SheetsLoadData(None, "id")
+        with mock.patch('tap_google_sheets.transform.get_record_projector',
+                        side_effect=transform.get_record_projector) as mocked_get_record_projector:
+            self.process_records(sheets_load_data, records[:1])
+            self.process_records(sheets_load_data, records[:1])
+        self.assertEqual(mocked_get_record_projector.call_count, 1)
+
+    def test_records_not_projected(self):
+        """
+        Verify that the values not projected are transformed by the Transformer, and an invalid value raises an error
+        """
+        project_record = transform.get_record_projector(sheet_schema, {})
+        self.assertIs(project_record({'date': 'not a date'}), transform.NOT_PROJECTED)
+        self.assertEqual(project_record({'amount': 'abc', 'flag': 'maybe'}), {'amount': 'abc', 'flag': 'maybe'})
+        with self.assertRaises(RuntimeError):
+            self.process_records(SheetsLoadData(None, "id"), [{'_sdc_deleted_at': 'not a date'}])
+
+    def test_other_schemas(self):
+        """
+        Verify that the streams with a field schema not generated by the discovery are not projected
+        """
+        self.assertIsNone(transform.get_record_projector(
+            {'type': 'object', 'properties': {'count': {'type': ['null', 'number']}}}, {}))
+        self.assertIsNone(transform.get_record_projector({'type': 'object', 'properties': {}}, {}))
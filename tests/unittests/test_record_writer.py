@@ -0,0 +1,51 @@
+import io
+import decimal
+import datetime
+import unittest
+from unittest import mock
+import pytz
+from singer import messages
+from singer.messages import RecordMessage
+from tap_google_sheets.streams import RecordSerializer, RecordWriter, RECORD_WRITER, write_record, write_state
+
+time_extracted = datetime.datetime(2022, 2, 12, 12, 30, tzinfo=pytz.utc)
+record = {'__sdc_row': 2, 'name': 'é "a"', 'amount': decimal.Decimal('1.10'), 'flag': True, 'date': None}
+
+class TestRecordWriter(unittest.TestCase):
+    def test_serialized_records(self):
+        """
+        Verify that the serialized RECORD messages are the messages formatted by singer
+        """
+        for stream_name in ('Sheet1', 'Sheet "record": null'):
+            for version in (None, 1644669000000):
+                for extracted in (None, time_extracted):
+                    expected_message = messages.format_message(RecordMessage(
+                        stream=stream_name, record=record, version=version, time_extracted=extracted))
+                    serializer = RecordSerializer(stream_name, extracted, version)
+                    self.assertEqual(serializer.serialize(record), expected_message + '\n')
+
+    def test_buffered_records(self):
+        """
+        Verify that the records are written once the buffer_size is reached, and before the STATE messages
+        """
+        with mock.patch('sys.stdout', new_callable=io.StringIO) as mocked_stdout, \
+             mock.patch.object(RECORD_WRITER, 'buffer_size', 1000):
+            write_record('Sheet1', record, time_extracted, 1)
+            self.assertEqual(mocked_stdout.getvalue(), '')
+            for _ in range(10):
+                write_record('Sheet1', record, time_extracted, 1)
+            lines = mocked_stdout.getvalue().splitlines()
+            self.assertTrue(0 < len(lines) < 11)
+            write_state({'bookmarks': {'Sheet1': 1}})
+        lines = mocked_stdout.getvalue().splitlines()
+        self.assertEqual(len(lines), 12)
+        self.assertTrue(lines[-1].startswith('{"type": "STATE"'))
+
+    def test_unbuffered_records(self):
+        """
+        Verify that each record is written with a buffer_size of 0
+        """
+        record_writer = RecordWriter(buffer_size=0)
+        with mock.patch('sys.stdout', new_callable=io.StringIO) as mocked_stdout:
+            record_writer.write('{"type": "RECORD"}\n')
+            self.assertEqual(mocked_stdout.getvalue(), '{"type": "RECORD"}\n')
@@ -0,0 +1,86 @@
+import unittest
+from unittest import mock
+from singer.catalog import Catalog, CatalogEntry, Schema
+from tap_google_sheets.streams import SheetsLoadData, get_render_plan
+from tap_google_sheets.client import GoogleClient
+from tap_google_sheets import transform
+
+columns = [
+    {'columnIndex': 1, 'columnLetter': 'A', 'columnName': 'name', 'columnType': 'stringValue', 'columnSkipped': False},
+    {'columnIndex': 2, 'columnLetter': 'B', 'columnName': 'amount', 'columnType': 'numberType', 'columnSkipped': False},
+    {'columnIndex': 3, 'columnLetter': 'C', 'columnName': 'created', 'columnType': 'numberType.DATE_TIME', 'columnSkipped': False},
+    {'columnIndex': 4, 'columnLetter': 'D', 'columnName': 'duration', 'columnType': 'numberType.TIME', 'columnSkipped': False},
+    {'columnIndex': 5, 'columnLetter': 'E', 'columnName': 'active', 'columnType': 'boolValue', 'columnSkipped': False},
+    {'columnIndex': 6, 'columnLetter': 'F', 'columnName': '__sdc_skip_col_06', 'columnType': 'stringValue', 'columnSkipped': True}]
+sheets = [{"properties": {"sheetId": 1, "title": "Sheet1", "gridProperties": {"rowCount": 100, "columnCount": 6}}}]
+catalog = Catalog([CatalogEntry(stream="Sheet1", tap_stream_id="Sheet1", schema=Schema.from_dict({'type': 'object'}), metadata=[])])
+
+# rows returned by spreadsheets.values for A2:F100
+formatted_rows = [
+    ['a', '1,234.50', '1/1/2022 12:00:00', '6:00:00', 'TRUE'],
+    [],
+    ['b', '', '', '', 'FALSE', 'note'],
+    ['c', '#DIV/0!', 'text']]
+unformatted_rows = [
+    ['a', 1234.5, 44562.5, 0.25, True],
+    [],
+    ['b', '', '', '', False, 'note'],
+    ['c', '#DIV/0!', 'text']]
+
+def batch_get(path, api, params, endpoint):
+    """Return the column blocks of formatted_rows or unformatted_rows requested in the ranges"""
+    rows = formatted_rows if 'valueRenderOption=FORMATTED_VALUE' in params else unformatted_rows
+    ranges = {'A2:B100': (0, 2), 'E2:F100': (4, 6), 'B2:D100': (1, 4)}
+    value_ranges = []
+    for param in params.split('&'):
+        if param.startswith('ranges='):
+            first, last = ranges[param.split('!')[1]]
+            block_rows = [row[first:last] for row in rows]
+            # trailing empty cells and rows are not returned
+            block_rows = [row[:max([i + 1 for i, value in enumerate(row) if value != ''] or [0])] for row in block_rows]
+            while block_rows and block_rows[-1] == []:
+                block_rows.pop()
+            value_ranges.append({'values': block_rows} if block_rows else {})
+    return {'valueRanges': value_ranges}
+
+class TestRenderPlan(unittest.TestCase):
+    def test_render_plan(self):
+        """
+        Verify that the dates and times are only requested unformatted, and the strings and booleans only formatted
+        """
+        self.assertEqual(get_render_plan(columns), {
+            'FORMATTED_VALUE': [(1, 'A', 'B'), (5, 'E', 'F')],
+            'UNFORMATTED_VALUE': [(2, 'B', 'D')]})
+
+    def test_transform_column_blocks_rows(self):
+        """
+        Verify that the column blocks are merged into rows, the cells not requested taking the value of the other render option
+        """
+        sheet_data_rows, unformatted_sheet_data_rows = transform.transform_column_blocks_rows(
+            [(1, [['a', '1,234.50']]), (5, [['TRUE']])],
+            [(2, [[1234.5, 44562.5]])])
+        self.assertEqual(sheet_data_rows, [['a', '1,234.50', '44562.5', '', 'TRUE']])
+        self.assertEqual(unformatted_sheet_data_rows, [['a', 1234.5, 44562.5, '', 'TRUE']])
+
+    @mock.patch('tap_google_sheets.client.GoogleClient.get', side_effect = batch_get)
+    @mock.patch('tap_google_sheets.streams.schema.get_sheet_metadata', return_value = [{'type': 'object'}, columns])
+    @mock.patch('tap_google_sheets.streams.get_selected_fields', return_value = [])
+    @mock.patch('tap_google_sheets.streams.write_schema')
+    @mock.patch('tap_google_sheets.streams.GoogleSheets.process_records')
+    def test_same_records(self, mock_process_records, mock_write_schema, mocked_get_selected_fields, mocked_sheet_metadata, mocked_get):
+        """
+        Verify that the "column_plan" fetch mode requests only the planned column blocks, with the same records as
+            the formatted and unformatted rows of the whole range
+        """
+        client = GoogleClient("dummy_client_id", "dummy_client_secret", "dummy_refresh_token", 300)
+        sheets_load_data = SheetsLoadData(client, "id", config={"fetch_mode": "column_plan"})
+        sheets_load_data.load_data(catalog, {}, ["Sheet1"], sheets, "time")
+        self.assertEqual(mocked_get.call_count, 2)
+        self.assertIn("valueRenderOption=FORMATTED_VALUE&majorDimension=ROWS&ranges='Sheet1'!A2:B100&ranges='Sheet1'!E2:F100",
+                      mocked_get.mock_calls[0].kwargs['params'])
+        self.assertIn("valueRenderOption=UNFORMATTED_VALUE&majorDimension=ROWS&ranges='Sheet1'!B2:D100",
+                      mocked_get.mock_calls[1].kwargs['params'])
+
+        records = mock_process_records.call_args.kwargs['records']
+        expected_records, _ = transform.transform_sheet_data("id", 1, "Sheet1", 2, columns, formatted_rows, unformatted_rows)
+        self.assertEqual(records, expected_records)
@@ -0,0 +1,154 @@
+import time
+import threading
+import unittest
+from unittest import mock
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from tap_google_sheets.client import GoogleClient, TokenBucket, AdaptiveConcurrencyLimiter, Server429Error, \
+    SyncInterrupted, get_retry_after, retry_wait
+from tap_google_sheets.streams import SheetsLoadData, RunLimits, get_page_ranges
+
+def get_response(headers=None, json=None):
+    response = mock.Mock()
+    response.headers = headers or {}
+    response.json.return_value = json or {}
+    return response
+
+class TestRetryAfter(unittest.TestCase):
+    def test_retry_after_header(self):
+        """
+        Verify that the Retry-After header is read in seconds or as an HTTP date
+        """
+        self.assertEqual(get_retry_after(get_response({'Retry-After': '30'})), 30)
+        retry_date = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=120), usegmt=True)
+        self.assertAlmostEqual(get_retry_after(get_response({'Retry-After': retry_date})), 120, delta=2)
+
+    def test_retry_info_details(self):
+        """
+        Verify that the retryDelay of the RetryInfo error details is read
+        """
+        response = get_response(json={'error': {'code': 429, 'status': 'RESOURCE_EXHAUSTED', 'details': [
+            {'@type': 'type.googleapis.com/google.rpc.ErrorInfo', 'reason': 'RATE_LIMIT_EXCEEDED'},
+            {'@type': 'type.googleapis.com/google.rpc.RetryInfo', 'retryDelay': '12.5s'}]}})
+        self.assertEqual(get_retry_after(response), 12.5)
+        self.assertIsNone(get_retry_after(get_response(json={'error': {'code': 429}})))
+
+    def test_retry_wait(self):
+        """
+        Verify that the wait honors the retry_after of the error, else is a decorrelated jitter
+        """
+        wait_generator = retry_wait(base=10, cap=60)
+        wait_generator.send(None)
+        self.assertGreaterEqual(wait_generator.send(Server429Error(retry_after=30)), 30)
+        self.assertLessEqual(wait_generator.send(Server429Error(retry_after=30)), 33)
+        for _ in range(20):
+            wait = wait_generator.send(Server429Error())
+            self.assertGreaterEqual(wait, 10)
+            self.assertLessEqual(wait, 60)
+
+class TestRetryBudget(unittest.TestCase):
+    @mock.patch('tap_google_sheets.client.time.sleep')
+    @mock.patch('tap_google_sheets.client.requests.Session.request', side_effect = Server429Error(retry_after=50))
+    @mock.patch('tap_google_sheets.client.GoogleClient.get_access_token')
+    def test_request_gives_up(self, mock_get_token, mock_request, mock_sleep):
+        """
+        Verify that the request gives up when the next wait exceeds the retry budget
+        """
+        client = GoogleClient("dummy_client_id", "dummy_client_secret", "dummy_refresh_token", 300, None, None, None, None, None, 100)
+        with self.assertRaises(Server429Error):
+            client.request("GET", "dummy_path")
+        # waited once for the Retry-After delay (50 seconds + jitter), a second wait would exceed the budget
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertEqual(mock_sleep.call_count, 1)
+        self.assertGreaterEqual(mock_sleep.call_args.args[0], 50)
+
+    def test_run_retry_budget(self):
+        """
+        Verify that the waits of all the requests are limited by the retry budget of the run
+        """
+        client = GoogleClient("dummy_client_id", "dummy_client_secret", "dummy_refresh_token", 300, None, None, None, None, None, 100)
+        self.assertTrue(client.spend_retry_budget(0, 60))
+        self.assertTrue(client.spend_retry_budget(0, 40))
+        self.assertFalse(client.spend_retry_budget(0, 1))
+        self.assertEqual(client.retry_seconds, 100)
+        # the default retry budget of a request
+        self.assertFalse(client.spend_retry_budget(100, 30))
+
+class TestInterruptedWaits(unittest.TestCase):
+    def stop_later(self, run_limits):
+        """Stop the sync in 0.1 second"""
+        timer = threading.Timer(0.1, run_limits.stop, args=('SIGTERM received',))
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+    @mock.patch('tap_google_sheets.client.requests.Session.request', side_effect = Server429Error(retry_after=50))
+    @mock.patch('tap_google_sheets.client.GoogleClient.get_access_token')
+    def test_retry_wait_interrupted(self, mock_get_token, mock_request):
+        """
+        Verify that the wait before the retry of a request is interrupted by the stop of the sync
+        """
+        client = GoogleClient("dummy_client_id", "dummy_client_secret", "dummy_refresh_token", 300)
+        self.stop_later(RunLimits(client))
+        started_at = time.monotonic()
+        with self.assertRaises(SyncInterrupted):
+            client.request("GET", "dummy_path")
+        self.assertLess(time.monotonic() - started_at, 10)
+        self.assertEqual(mock_request.call_count, 1)
+
+    def test_rate_limit_wait_interrupted(self):
+        """
+        Verify that the wait for a token of the rate limiter is interrupted by the stop of the sync
+        """
+        client = GoogleClient("dummy_client_id", "dummy_client_secret", "dummy_refresh_token", 300)
+        self.stop_later(RunLimits(client))
+        bucket = TokenBucket(1)
+        bucket.acquire(client.wait)
+        started_at = time.monotonic()
+        with self.assertRaises(SyncInterrupted):
+            bucket.acquire(client.wait)
+        self.assertLess(time.monotonic() - started_at, 10)
+
+    def test_concurrency_wait_interrupted(self):
+        """
+        Verify that the wait for a concurrent request slot is interrupted by the stop of the sync
+        """
+        run_limits = RunLimits(None)
+        self.stop_later(run_limits)
+        limiter = AdaptiveConcurrencyLimiter(2)
+        limiter.acquire(run_limits.stop_event)
+        with self.assertRaises(SyncInterrupted):
+            limiter.acquire(run_limits.stop_event)
+        self.assertEqual(limiter.in_flight, 1)
+
+class TestDeferredRequests(unittest.TestCase):
+    def get_pages_data(self, sheet_title, sheet_last_col_letter, page_ranges, render_plan=None):
+        """Fail the first request of rows 201 to 400, the pages are blank after row 1000"""
+        from_row, _ = page_ranges[0]
+        if from_row == 201 and from_row not in self.failed_rows:
+            self.failed_rows.append(from_row)
+            raise Server429Error()
+        if from_row > 1000:
+            return [([], [])]
+        return [([[str(from_row)]], [[from_row]])]
+
+    def setUp(self):
+        self.failed_rows = []
+
+    def test_deferred_page_is_retried_last(self):
+        """
+        Verify that a page failing after its retries is retried after the other pages
+        """
+        with mock.patch('tap_google_sheets.streams.SheetsLoadData.get_pages_data', side_effect = self.get_pages_data):
+            sheets_load_data = SheetsLoadData(None, "id", config={"prefetch_depth": 3})
+            pages = list(sheets_load_data.get_pages("Sheet1", "A", get_page_ranges(3000), 1))
+        self.assertEqual([from_row for from_row, _, _ in pages], [2, 401, 601, 801, 1001, 201])
+        self.assertEqual(pages[-1][1], [['201']])
+
+    def test_max_deferred_requests(self):
+        """
+        Verify that the error is raised when more requests than "max_deferred_requests" fail
+        """
+        with mock.patch('tap_google_sheets.streams.SheetsLoadData.get_pages_data', side_effect = self.get_pages_data):
+            sheets_load_data = SheetsLoadData(None, "id", config={"max_deferred_requests": 0})
+            with self.assertRaises(Server429Error):
+                list(sheets_load_data.get_pages("Sheet1", "A", get_page_ranges(3000), 1))
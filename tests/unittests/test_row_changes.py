@@ -0,0 +1,94 @@
+import tempfile
+import unittest
+from unittest import mock
+from tap_google_sheets.streams import SheetsLoadData
+import sheets_fixtures
+
+sheet_schema = sheets_fixtures.get_sheet_schema(['id', 'name'])
+columns = sheets_fixtures.get_columns(['id', 'name'])
+sheets = sheets_fixtures.get_sheets(1, 200, 2)
+
+def get_catalog(key_properties):
+    mdata = [{'breadcrumb': [], 'metadata': {'selected': True, 'replication-method': 'LOG_BASED'}}]
+    return sheets_fixtures.get_catalog(sheets, sheet_schema, mdata, key_properties)
+
+class TestRowChanges(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.rows = [['1', 'a'], ['2', 'b'], ['3', 'c']]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def get_pages_data(self, sheet_title, sheet_last_col_letter, page_ranges, render_plan=None):
+        """Return the rows in a single page"""
+        return [(self.rows, self.rows)]
+
+    def sync(self, state, key_properties):
+        sheets_load_data = SheetsLoadData(None, "id", config={"row_index_dir": self.tmp_dir.name})
+        messages, _ = sheets_fixtures.load_data(sheets_load_data, get_catalog(key_properties), state, sheets,
+                                                self.get_pages_data, (sheet_schema, columns))
+        return messages
+
+    def get_records(self, messages):
+        return [{key: value for key, value in message['record'].items() if key in ('__sdc_row', 'id', 'name', '_sdc_deleted_at')}
+                for message in messages if message['type'] == 'RECORD']
+
+    def test_changed_rows(self):
+        """
+        Verify that only the inserted, changed and deleted rows are written, without ACTIVATE_VERSION messages
+        """
+        state = {}
+        messages = self.sync(state, ['__sdc_row'])
+        self.assertEqual(len(self.get_records(messages)), 3)
+        self.assertNotIn('ACTIVATE_VERSION', [message['type'] for message in messages])
+        schema_message = [message for message in messages if message['type'] == 'SCHEMA'][0]
+        self.assertIn('_sdc_deleted_at', schema_message['schema']['properties'])
+
+        self.rows = [['1', 'a'], ['2', 'x']]
+        records = self.get_records(self.sync(state, ['__sdc_row']))
+        self.assertEqual(records[0], {'__sdc_row': 3, 'id': '2', 'name': 'x'})
+        self.assertEqual(records[1]['__sdc_row'], 4)
+        self.assertIn('_sdc_deleted_at', records[1])
+        self.assertEqual(len(records), 2)
+
+        self.assertEqual(self.get_records(self.sync(state, ['__sdc_row'])), [])
+
+    def test_key_column(self):
+        """
+        Verify that the rows are identified by the key_properties of the stream
+        """
+        state = {}
+        self.sync(state, ['id'])
+        # insert a row at the top: the rows below, moved to the next row number, are unchanged
+        self.rows = [['0', 'z'], ['1', 'a'], ['2', 'b'], ['3', 'c']]
+        records = self.get_records(self.sync(state, ['id']))
+        self.assertEqual([record['id'] for record in records], ['0'])
+        # delete the row '2' and change the row '3'
+        self.rows = [['0', 'z'], ['1', 'a'], ['3', 'x']]
+        records = self.get_records(self.sync(state, ['id']))
+        self.assertEqual([(record['id'], '_sdc_deleted_at' in record) for record in records], [('3', False), ('2', True)])
+
+    def test_state_not_written(self):
+        """
+        Verify that the changes written before a failure of the State are written again by the next sync
+        """
+        state = {}
+        self.sync(state, ['__sdc_row'])
+        self.rows = [['1', 'a'], ['2', 'x']]
+        with mock.patch('tap_google_sheets.streams.write_bookmark', side_effect=OSError('broken pipe')):
+            with self.assertRaises(OSError):
+                self.sync(state, ['__sdc_row'])
+        records = self.get_records(self.sync(state, ['__sdc_row']))
+        self.assertEqual([(record['__sdc_row'], '_sdc_deleted_at' in record) for record in records], [(3, False), (4, True)])
+
+    def test_parallel_sheets(self):
+        """
+        Verify that the row index of a sheet synced by a worker thread is committed by the main thread
+        """
+        state = {}
+        sheets_load_data = SheetsLoadData(None, "id", config={"row_index_dir": self.tmp_dir.name, "max_sheet_workers": 2})
+        sheets_fixtures.load_data(sheets_load_data, get_catalog(['__sdc_row']), state, sheets, self.get_pages_data,
+                                  (sheet_schema, columns))
+        self.assertEqual(sheets_load_data.pending_row_indexes, {})
+        self.assertEqual(self.get_records(self.sync(state, ['__sdc_row'])), [])
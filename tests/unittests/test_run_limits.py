@@ -0,0 +1,92 @@
+import io
+import os
+import json
+import signal
+import unittest
+from unittest import mock
+from tap_google_sheets.streams import SheetsLoadData, RunLimits, SyncInterrupted
+from tap_google_sheets.sync import sync
+from sheets_fixtures import sheet_schema, get_sheets, get_catalog, load_data
+
+sheets = get_sheets(2, 1000)
+catalog = get_catalog(sheets, sheet_schema, [{'breadcrumb': [], 'metadata': {'selected': True}}])
+
+class MockClient:
+    def __init__(self):
+        self.request_count = 0
+
+class TestRunLimits(unittest.TestCase):
+    def setUp(self):
+        self.client = MockClient()
+
+    def get_pages_data(self, sheet_title, sheet_last_col_letter, page_ranges, render_plan=None):
+        """Return a row for each page, counting an API call"""
+        self.client.request_count += 1
+        from_row, _ = page_ranges[0]
+        return [([[str(from_row)]], [[str(from_row)]])]
+
+    def sync(self, state, run_limits):
+        sheets_load_data = SheetsLoadData(self.client, "id")
+        sheets_load_data.run_limits = run_limits
+        messages, _ = load_data(sheets_load_data, catalog, state, sheets, self.get_pages_data,
+                                expected_errors=SyncInterrupted)
+        return messages
+
+    def test_max_api_calls(self):
+        """
+        Verify that the sync stops at the max_api_calls with a checkpoint of the sheet, and the next sync resumes it
+        """
+        state = {}
+        messages = self.sync(state, RunLimits(self.client, max_api_calls=2))
+        self.assertEqual([message['record']['name'] for message in messages if message['type'] == 'RECORD'], ['2', '201'])
+        self.assertEqual(state["checkpoints"]["Sheet1"]["from_row"], 401)
+        self.assertEqual(messages[-1]['type'], 'STATE')
+
+        self.client.request_count = 0
+        messages = self.sync(state, RunLimits(self.client))
+        records = [(message['stream'], message['record']['name']) for message in messages if message['type'] == 'RECORD']
+        self.assertEqual(records[:3], [('Sheet1', '401'), ('Sheet1', '601'), ('Sheet1', '801')])
+        self.assertEqual(len(records), 8)
+        self.assertEqual(state["checkpoints"], {})
+
+    def test_sheet_not_started(self):
+        """
+        Verify that the next sheet is not started once the limits are reached, and the completed sheet is bookmarked
+        """
+        state = {}
+        messages = self.sync(state, RunLimits(self.client, max_api_calls=5))
+        self.assertEqual({message['stream'] for message in messages if message['type'] == 'RECORD'}, {'Sheet1'})
+        self.assertIn('Sheet1', state['bookmarks'])
+        self.assertNotIn('Sheet2', state['bookmarks'])
+
+    @mock.patch('tap_google_sheets.streams.time.monotonic')
+    def test_max_runtime(self, mocked_monotonic):
+        """
+        Verify that the runtime limit is reached before the max_runtime_seconds, keeping time to write the State
+        """
+        mocked_monotonic.return_value = 1000
+        run_limits = RunLimits(self.client, max_runtime_seconds=600)
+        mocked_monotonic.return_value = 1539
+        self.assertFalse(run_limits.is_reached())
+        mocked_monotonic.return_value = 1540
+        self.assertTrue(run_limits.is_reached())
+
+    @mock.patch('tap_google_sheets.streams.SpreadSheetMetadata.get_data', return_value = ({"sheets": sheets}, None))
+    @mock.patch('tap_google_sheets.streams.SheetsLoadData.load_data', autospec=True)
+    def test_sigterm(self, mocked_load_data, mocked_get_data):
+        """
+        Verify that a SIGTERM stops the sync and writes the State, and that the previous handler is restored
+        """
+        def load_data(sheets_load_data, catalog, state, selected_streams, sheets, spreadsheet_time_extracted):
+            os.kill(os.getpid(), signal.SIGTERM)
+            self.assertTrue(sheets_load_data.run_limits.is_reached())
+            raise SyncInterrupted('interrupted')
+        mocked_load_data.side_effect = load_data
+
+        previous_handler = signal.getsignal(signal.SIGTERM)
+        state = {"checkpoints": {"Sheet1": {"from_row": 401, "activate_version": 1}}}
+        with mock.patch('sys.stdout', new_callable=io.StringIO) as mocked_stdout:
+            sync(self.client, {"spreadsheet_id": "id"}, catalog, state)
+        messages = [json.loads(line) for line in mocked_stdout.getvalue().splitlines()]
+        self.assertEqual(messages[-1], {'type': 'STATE', 'value': state})
+        self.assertEqual(signal.getsignal(signal.SIGTERM), previous_handler)
@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from tap_google_sheets.client import GoogleClient
+from tap_google_sheets.discover import discover
+
+sheet = {
+    "properties": {"sheetId": 1, "title": "Sheet1", "gridProperties": {"rowCount": 100, "columnCount": 1}},
+    "data": [{"rowData": [{"values": [{"formattedValue": "name"}]}, {"values": [{"effectiveValue": {"stringValue": "a"}}]}]}]
+}
+
+class TestSchemaCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file_version = {"id": "id", "version": "10", "modifiedTime": "2022-01-01T00:00:00.000Z"}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def get(self, path, api, **kwargs):
+        """Return the Drive file metadata or the spreadsheet and sheet metadata"""
+        if api == "files":
+            return self.file_version
+        return {"sheets": [sheet]}
+
+    def discover(self):
+        with mock.patch('tap_google_sheets.client.GoogleClient.get', side_effect = self.get) as mocked_get:
+            client = GoogleClient("dummy_client_id", "dummy_client_secret", "dummy_refresh_token", 300)
+            catalog = discover(client, "id", {"schema_cache_dir": self.tmp_dir.name})
+        return catalog, [call.kwargs['api'] for call in mocked_get.mock_calls]
+
+    def test_unchanged_spreadsheet(self):
+        """
+        Verify that the discovery of an unchanged spreadsheet only requests the Drive file metadata
+        """
+        catalog, apis = self.discover()
+        self.assertEqual(apis, ["files", "sheets", "sheets"])
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir.name, "tap-google-sheets-id.json")))
+
+        cached_catalog, apis = self.discover()
+        self.assertEqual(apis, ["files"])
+        self.assertEqual(cached_catalog.to_dict(), catalog.to_dict())
+
+    def test_changed_spreadsheet(self):
+        """
+        Verify that the sheets are requested again when the version of the spreadsheet changed
+        """
+        self.discover()
+        self.file_version = {"id": "id", "version": "11", "modifiedTime": "2022-01-02T00:00:00.000Z"}
+        _, apis = self.discover()
+        self.assertEqual(apis, ["files", "sheets", "sheets"])
+
+    def test_corrupted_cache_file(self):
+        """
+        Verify that a corrupted cache file is ignored and rewritten
+        """
+        with open(os.path.join(self.tmp_dir.name, "tap-google-sheets-id.json"), "w") as file:
+            file.write('{"file_version":')
+        _, apis = self.discover()
+        self.assertEqual(apis, ["files", "sheets", "sheets"])
+        _, apis = self.discover()
+        self.assertEqual(apis, ["files"])
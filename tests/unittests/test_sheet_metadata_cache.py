@@ -0,0 +1,56 @@
+import unittest
+from unittest import mock
+from singer.catalog import Catalog, CatalogEntry, Schema
+from tap_google_sheets import schema
+from tap_google_sheets.client import GoogleClient
+from tap_google_sheets.streams import SheetsLoadData
+
+def get_sheet(sheet_id, title):
+    return {
+        "properties": {"sheetId": sheet_id, "title": title, "gridProperties": {"rowCount": 100, "columnCount": 3}},
+        "data": [{"rowData": [
+            {"values": [{"formattedValue": "name"}, {"formattedValue": "amount"}, {"formattedValue": "created"}]},
+            {"values": [{"effectiveValue": {"stringValue": "a"}},
+                        {"effectiveValue": {"numberValue": 1}},
+                        {"effectiveValue": {"numberValue": 44562}, "effectiveFormat": {"numberFormat": {"type": "DATE"}}}]}]}]
+    }
+
+sheets = [get_sheet(1, "Sheet1"), get_sheet(2, "Sheet2")]
+sheet_json_schema, columns = schema.get_sheet_schema_columns(sheets[0])
+catalog = Catalog([CatalogEntry(stream="Sheet1", tap_stream_id="Sheet1", schema=Schema.from_dict(sheet_json_schema), metadata=[])])
+
+class TestSheetMetadataCache(unittest.TestCase):
+    @mock.patch('tap_google_sheets.client.GoogleClient.get', return_value = {"sheets": sheets})
+    def test_discovered_sheets_not_requested(self, mocked_get):
+        """
+        Verify that the sheet metadata fetched by the discovery is not requested again by the sync
+        """
+        client = GoogleClient("dummy_client_id", "dummy_client_secret", "dummy_refresh_token", 300)
+        schema.get_sheets_metadata(sheets, "id", client)
+        self.assertEqual(mocked_get.call_count, 1)
+
+        self.assertEqual(schema.get_sheet_metadata(sheets[1], "id", client), (sheet_json_schema, columns))
+        schema.get_sheets_metadata(sheets, "id", client)
+        self.assertEqual(mocked_get.call_count, 1)
+
+    def test_catalog_columns(self):
+        """
+        Verify that the columns rebuilt from the catalog schema are the discovered columns
+        """
+        self.assertEqual(schema.get_catalog_columns(sheet_json_schema), columns)
+
+    @mock.patch('tap_google_sheets.streams.schema.get_sheet_metadata', return_value = (sheet_json_schema, columns))
+    @mock.patch('tap_google_sheets.streams.SheetsLoadData.sync_sheets', return_value = [])
+    def test_no_metadata_request(self, mocked_sync_sheets, mocked_sheet_metadata):
+        """
+        Verify that the sync requests no sheet metadata with the "catalog" sheet_columns, and the unselected sheets
+            are requested only for the "sheet_metadata" stream
+        """
+        sheets_load_data = SheetsLoadData(None, "id", config={"sheet_columns": "catalog"})
+        sheets_load_data.load_data(catalog, {}, ["Sheet1"], sheets, "time")
+        self.assertEqual(mocked_sheet_metadata.call_count, 0)
+        self.assertEqual(mocked_sync_sheets.call_args.args[1], [(sheets[0], columns)])
+
+        sheet_metadata, _ = sheets_load_data.load_data(catalog, {}, ["Sheet1", "sheet_metadata"], sheets, "time")
+        mocked_sheet_metadata.assert_called_once_with(sheets[1], "id", None)
+        self.assertEqual(len(sheet_metadata), 2)
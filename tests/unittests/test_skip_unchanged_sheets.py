@@ -0,0 +1,82 @@
+import unittest
+from unittest import mock
+from tempfile import SpooledTemporaryFile
+from tap_google_sheets.streams import SheetsLoadData, RunLimits, SyncInterrupted
+from sheets_fixtures import sheet_schema, get_sheets, get_catalog, load_data
+
+sheets = get_sheets(2, 400)
+catalog = get_catalog(sheets, sheet_schema)
+
+class TestSkipUnchangedSheets(unittest.TestCase):
+    def setUp(self):
+        self.values = {"Sheet1": "a", "Sheet2": "b"}
+
+    def get_pages_data(self, sheet_title, sheet_last_col_letter, page_ranges, render_plan=None):
+        """Return a row for each page"""
+        return [([[self.values[sheet_title]]], [[self.values[sheet_title]]]) for _ in page_ranges]
+
+    def sync(self, state):
+        sheets_load_data = SheetsLoadData(None, "id", config={"skip_unchanged_sheets": "true"})
+        messages, sheets_loaded = load_data(sheets_load_data, catalog, state, sheets, self.get_pages_data)
+        return [message for message in messages if message['type'] in ('RECORD', 'ACTIVATE_VERSION')], sheets_loaded
+
+    def test_unchanged_sheet_skipped(self):
+        """
+        Verify that no records and ACTIVATE_VERSION messages are written for the sheets with an unchanged fingerprint
+        """
+        state = {}
+        messages, sheets_loaded = self.sync(state)
+        self.assertEqual(len(messages), 8)
+        self.assertEqual(set(state['fingerprints']), {"Sheet1", "Sheet2"})
+        bookmarks = dict(state['bookmarks'])
+
+        self.values["Sheet2"] = "c"
+        messages, sheets_loaded = self.sync(state)
+        self.assertEqual({message['stream'] for message in messages}, {"Sheet2"})
+        self.assertEqual([message['record']['name'] for message in messages if message['type'] == 'RECORD'], ["c", "c"])
+        self.assertEqual([sheet_loaded['title'] for sheet_loaded in sheets_loaded], ["Sheet2"])
+        # the activate_version of the unchanged sheet is kept
+        self.assertEqual(state['bookmarks']["Sheet1"], bookmarks["Sheet1"])
+
+        messages, _ = self.sync(state)
+        self.assertEqual(messages, [])
+
+    def test_pages_spooled_to_file(self):
+        """
+        Verify that the pages compared to the fingerprint spill to a temporary file, closed once the records are written
+        """
+        state = {}
+        self.sync(state)
+        self.values["Sheet2"] = "c"
+        spooled_files = []
+        def spooled_file(**kwargs):
+            spooled_files.append(SpooledTemporaryFile(**kwargs))
+            return spooled_files[-1]
+        with mock.patch('tap_google_sheets.streams.MAX_SPOOLED_PAGES_SIZE', 1), \
+             mock.patch('tap_google_sheets.streams.tempfile.SpooledTemporaryFile', side_effect = spooled_file):
+            messages, _ = self.sync(state)
+        self.assertEqual([message['record']['name'] for message in messages if message['type'] == 'RECORD'], ["c", "c"])
+        self.assertEqual(len(spooled_files), 2)
+        self.assertTrue(all(spooled_file._rolled and spooled_file.closed for spooled_file in spooled_files))
+
+    def test_run_limits_while_spooling(self):
+        """
+        Verify that the sync stops at the max_api_calls while fetching the pages compared to the fingerprint
+        """
+        state = {}
+        self.sync(state)
+        fingerprints = dict(state['fingerprints'])
+        client = mock.Mock(request_count=0)
+        def get_pages_data(sheet_title, sheet_last_col_letter, page_ranges, render_plan=None):
+            client.request_count += 1
+            return self.get_pages_data(sheet_title, sheet_last_col_letter, page_ranges, render_plan)
+
+        self.values["Sheet1"] = "c"
+        sheets_load_data = SheetsLoadData(client, "id", config={"skip_unchanged_sheets": "true"})
+        sheets_load_data.run_limits = RunLimits(client, max_api_calls=1)
+        messages, sheets_loaded = load_data(sheets_load_data, catalog, state, sheets, get_pages_data,
+                                            expected_errors=SyncInterrupted)
+        self.assertIsNone(sheets_loaded)
+        self.assertEqual([message for message in messages if message['type'] == 'RECORD'], [])
+        self.assertEqual(state['fingerprints'], fingerprints)
+        self.assertEqual(state.get('checkpoints', {}), {})
@@ -0,0 +1,74 @@
+import unittest
+from unittest import mock
+from singer.catalog import Catalog, CatalogEntry, Schema
+from tap_google_sheets.sync import sync
+
+def get_catalog(selected):
+    mdata = [{'breadcrumb': [], 'metadata': {'selected': selected}}]
+    return Catalog([CatalogEntry(stream="Sheet1", tap_stream_id="Sheet1", schema=Schema.from_dict({'type': 'object'}), metadata=mdata),
+                    CatalogEntry(stream="Sheet2", tap_stream_id="Sheet2", schema=Schema.from_dict({'type': 'object'}), metadata=[])])
+
+class TestSkipUnchangedSpreadsheet(unittest.TestCase):
+    def setUp(self):
+        self.file_metadata = {"id": "id", "version": "10", "modifiedTime": "2022-01-01T00:00:00.000Z"}
+        self.config = {"spreadsheet_id": "id", "start_date": "2022-01-01T00:00:00Z", "skip_unchanged_spreadsheet": "true"}
+
+    def get_data(self, stream_name, range_rows=None):
+        """Return the Drive file metadata or the spreadsheet metadata"""
+        if stream_name == "file_metadata":
+            return self.file_metadata, None
+        return {"sheets": []}, None
+
+    def sync(self, state, catalog):
+        with mock.patch('tap_google_sheets.streams.GoogleSheets.get_data', side_effect = self.get_data), \
+             mock.patch('tap_google_sheets.sync.SheetsLoadData.load_data', return_value = ([], [])) as mocked_load_data, \
+             mock.patch('tap_google_sheets.streams.singer.write_state'), \
+             mock.patch('tap_google_sheets.sync.singer.write_state'):
+            sync(None, self.config, catalog, state)
+        return mocked_load_data.call_count
+
+    def test_unchanged_spreadsheet_skipped(self):
+        """
+        Verify that the sync of an unchanged spreadsheet is skipped, and not skipped when the version changed
+        """
+        state = {}
+        self.assertEqual(self.sync(state, get_catalog(True)), 1)
+        self.assertEqual(state["file_version"]["version"], "10")
+        self.assertEqual(self.sync(state, get_catalog(True)), 0)
+
+        self.file_metadata = {"id": "id", "version": "11", "modifiedTime": "2022-01-02T00:00:00.000Z"}
+        self.assertEqual(self.sync(state, get_catalog(True)), 1)
+        self.assertEqual(state["file_version"]["version"], "11")
+
+    def test_changed_selection_not_skipped(self):
+        """
+        Verify that the sync is not skipped when the selection of the catalog changed or the last sync was interrupted
+        """
+        state = {}
+        self.sync(state, get_catalog(True))
+        catalog = get_catalog(True)
+        catalog.get_stream("Sheet2").metadata = [{'breadcrumb': [], 'metadata': {'selected': True}}]
+        self.assertEqual(self.sync(state, catalog), 1)
+
+        state["currently_syncing"] = "Sheet1"
+        self.assertEqual(self.sync(state, catalog), 1)
+
+    def test_not_skipped_by_default(self):
+        """
+        Verify that the Drive file metadata is not requested without skip_unchanged_spreadsheet
+        """
+        del self.config["skip_unchanged_spreadsheet"]
+        state = {}
+        self.sync(state, get_catalog(True))
+        self.assertEqual(self.sync(state, get_catalog(True)), 1)
+        self.assertNotIn("file_version", state)
+
+    def test_sheet_named_file_metadata(self):
+        """
+        Verify that the file version is not written in the bookmark of a sheet named file_metadata
+        """
+        state = {"bookmarks": {"file_metadata": 1644669000000}}
+        self.sync(state, get_catalog(True))
+        self.assertEqual(state["bookmarks"]["file_metadata"], 1644669000000)
+        self.assertEqual(state["file_version"]["version"], "10")
+        self.assertEqual(self.sync(state, get_catalog(True)), 0)
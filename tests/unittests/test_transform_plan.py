@@ -0,0 +1,60 @@
+import unittest
+from tap_google_sheets import transform
+
+columns = [{'columnIndex': 2, 'columnLetter': 'B', 'columnName': 'amount', 'columnType': 'numberType', 'columnSkipped': False},
+           {'columnIndex': 1, 'columnLetter': 'A', 'columnName': 'name', 'columnType': 'stringValue', 'columnSkipped': False},
+           {'columnIndex': 3, 'columnLetter': 'C', 'columnName': 'date', 'columnType': 'numberType.DATE_TIME', 'columnSkipped': False},
+           {'columnIndex': 4, 'columnLetter': 'D', 'columnName': 'time', 'columnType': 'numberType.TIME', 'columnSkipped': False},
+           {'columnIndex': 5, 'columnLetter': 'E', 'columnName': 'flag', 'columnType': 'boolValue', 'columnSkipped': False},
+           {'columnIndex': 6, 'columnLetter': 'F', 'columnName': '__sdc_skip_col_06', 'columnType': 'stringValue', 'columnSkipped': True},
+           {'columnIndex': 7, 'columnLetter': 'G', 'columnName': 'other', 'columnType': 'errorType', 'columnSkipped': False}]
+rows = [['a', '1,234.50', '2022-02-12 12:30:00', '12:30:00', 'TRUE', 'x', 'y'],
+        [],
+        ['b', '', 'not a date', '0.5', 'maybe'],
+        ['c', 'abc', '', '', '']]
+unformatted_rows = [['a', 1234.5, 44604.520833333336, 0.520833333333333, True, 'x', 'y'],
+                    [],
+                    ['b', '', 'not a date', '0.5', 'maybe'],
+                    ['c', 'abc', '', '', '']]
+
+class TestTransformPlan(unittest.TestCase):
+    def get_expected_records(self, from_row, selected_columns=None):
+        """Transform the rows cell by cell with get_column_value"""
+        cols = sorted(columns, key=lambda i: i['columnIndex'])
+        records = []
+        for row_num, (row, unformatted_row) in enumerate(zip(rows, unformatted_rows), start=from_row):
+            if not row:
+                continue
+            record = {'__sdc_spreadsheet_id': 'id', '__sdc_sheet_id': 1, '__sdc_row': row_num}
+            for col, value, unformatted_value in zip(cols, row, unformatted_row):
+                if col['columnSkipped'] or (selected_columns is not None and col['columnName'] not in selected_columns):
+                    continue
+                record[col['columnName']] = transform.get_column_value(
+                    value, unformatted_value, 'Sheet1', col['columnName'], col['columnLetter'], row_num, col['columnType'], row)
+            records.append(record)
+        return records
+
+    def test_records_unchanged(self):
+        """
+        Verify that the records transformed with the plan of the sheet are the records transformed cell by cell
+        """
+        transform_plan = transform.get_transform_plan('Sheet1', columns)
+        for from_row in (2, 202):
+            records, row_num = transform.transform_sheet_data('id', 1, 'Sheet1', from_row, columns, rows, unformatted_rows,
+                                                              transform_plan=transform_plan)
+            self.assertEqual(records, self.get_expected_records(from_row))
+            self.assertEqual(row_num, from_row + len(rows))
+        self.assertEqual(records[0]['amount'], 1234.5)
+        self.assertEqual(records[0]['date'], '2022-02-12T12:30:00.000000Z')
+        self.assertIsNone(records[1]['amount'])
+
+    def test_selected_columns(self):
+        """
+        Verify that the plan skips the columns not selected
+        """
+        transform_plan = transform.get_transform_plan('Sheet1', columns, {'name', 'flag'})
+        self.assertEqual([col_plan[0] if col_plan else None for col_plan in transform_plan],
+                         ['name', None, None, None, 'flag', None, None])
+        records, _ = transform.transform_sheet_data('id', 1, 'Sheet1', 2, columns, rows, unformatted_rows,
+                                                    selected_columns={'name', 'flag'})
+        self.assertEqual(records, self.get_expected_records(2, {'name', 'flag'}))
@@ -7,12 +7,14 @@ sheet_schema = {'type': 'object', 'additionalProperties': False, 'properties': {
 columns = [{'columnIndex': 1, 'columnLetter': 'A', 'columnName': 'date', 'columnType': 'stringValue', 'columnSkipped': False}, {'columnIndex': 2, 'columnLetter': 'B', 'columnName': 'value', 'columnType': 'numberType.DATE', 'columnSkipped': False}]
 
 class TestUnsupportedFields(unittest.TestCase):
+    @mock.patch('tap_google_sheets.streams.get_key_properties', return_value = ['__sdc_row'])
+    @mock.patch('tap_google_sheets.streams.get_replication_method', return_value = 'FULL_TABLE')
     @mock.patch('tap_google_sheets.client.GoogleClient.get')
     @mock.patch('tap_google_sheets.streams.schema.get_sheet_metadata', return_value = [sheet_schema, columns])
     @mock.patch('tap_google_sheets.streams.get_selected_fields', return_value = [])
     @mock.patch('tap_google_sheets.streams.write_schema')
     @mock.patch('tap_google_sheets.streams.GoogleSheets.process_records')
-    def test_two_api_calls(self, mock_process_records, mock_write_schema, mocked_get_selected_fields, mocked_sheet_metadata, mocked_get):
+    def test_two_api_calls(self, mock_process_records, mock_write_schema, mocked_get_selected_fields, mocked_sheet_metadata, mocked_get, mocked_replication_method, mocked_key_properties):
         """
         Verify that we make 2 API calls instead of 1 for a single page of data
         """